@@ -0,0 +1,27 @@
+"""Helpers shared by the benchmark scripts."""
+import pathlib, sys, tempfile, time
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+# Stand-in compiler: writes {outdir}/{stem}.pdf ("%PDF " + the .tex bytes), so
+# compile timings measure process + I/O overhead only. Extra arguments are log
+# files that get one line (the .tex name) per run.
+STANDIN_TEX = ("import pathlib, sys; tex, outdir = map(pathlib.Path, sys.argv[1:3]); "
+               "(outdir / (tex.stem + '.pdf')).write_bytes(b'%PDF ' + tex.read_bytes()); "
+               "[open(log, 'a').write(tex.name + '\\n') for log in sys.argv[3:]]")
+STANDIN_COMPILER = (sys.executable, "-c", STANDIN_TEX, "{tex}", "{outdir}")
+
+
+def best(fn, repeat=3):
+    """Fastest of ``repeat`` timed calls of ``fn()``, in seconds."""
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return min(times)
+
+
+def fresh_dir(parent):
+    """New empty directory under ``parent`` (a compile per round must not find the last PDF)."""
+    return pathlib.Path(tempfile.mkdtemp(dir=parent))
@@ -0,0 +1,38 @@
+"""Per-figure compile time with and without the precompiled preamble format.
+
+Usage (needs a TeX installation with mylatexformat):
+  python -m benchmarks.bench_format [--repeat 3] examples/fig_encoder_block.tex ...
+"""
+import argparse, tempfile, time
+
+from plotnn_xt.buildcache import DEFAULT_COMPILER, compile_tex
+from plotnn_xt.texformat import FormatCache
+
+from ._util import ROOT, best, fresh_dir
+
+
+def _time(tex, compiler, repeat):
+    with tempfile.TemporaryDirectory() as out:
+        return best(lambda: compile_tex(tex, ROOT, compiler, fresh_dir(out)), repeat)
+
+
+def run(texs, repeat=3, plain=DEFAULT_COMPILER):
+    fmt = FormatCache(ROOT)
+    rows = []
+    for t in texs:
+        tex = (ROOT / t).resolve()
+        t0 = time.perf_counter()
+        fmt_cmd = fmt.compiler_for(tex)  # includes the one-off dump on first use
+        dump = time.perf_counter() - t0
+        rows.append((tex.name, _time(tex, plain, repeat), _time(tex, fmt_cmd, repeat), dump))
+    return rows
+
+
+if __name__ == "__main__":  # pragma: no cover
+    ap = argparse.ArgumentParser()
+    ap.add_argument("tex", nargs="+")
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+    print(f"{'figure':32s} {'plain':>8s} {'fmt':>8s} {'speedup':>8s} {'dump':>8s}")
+    for name, plain, fast, dump in run(args.tex, args.repeat):
+        print(f"{name:32s} {plain:8.2f} {fast:8.2f} {plain / fast:7.1f}x {dump:8.2f}")
@@ -0,0 +1,35 @@
+"""Compile time of a grouped N-block stack: precomputed box rectangle vs TikZ ``fit``.
+
+Usage (needs TeX unless --compiler points at a stand-in):
+  python -m benchmarks.bench_group_fit [--blocks 48] [--repeat 3] [--compiler "latexmk -pdf -outdir={outdir} {tex}"]
+"""
+import argparse, shlex, pathlib, tempfile
+
+from plotnn_xt.blocks import decoder_block_factory
+from plotnn_xt.buildcache import DEFAULT_COMPILER, compile_tex
+from plotnn_xt.export import export_tex
+from plotnn_xt.layout import group, repeat
+
+from ._util import ROOT, best, fresh_dir
+
+
+def run(blocks=48, repeat_n=3, compiler=DEFAULT_COMPILER):
+    nodes, edges = repeat(blocks, decoder_block_factory(include_cross=False), gap=2.0, dir="y")
+    res = {}
+    for mode, fit in (("rect", False), ("fit", True)):
+        g = group("stack", nodes, title=f"Decoder ×{blocks}", fit=fit)
+        with tempfile.TemporaryDirectory() as d:
+            tex = export_tex(nodes, edges, pathlib.Path(d) / f"stack_{mode}.tex", boxes=[g])
+            res[mode] = best(lambda: compile_tex(tex, ROOT, compiler, fresh_dir(d)), repeat_n)
+    return res
+
+
+if __name__ == "__main__":  # pragma: no cover
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--blocks", type=int, default=48)
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--compiler", default=None)
+    args = ap.parse_args()
+    cmd = tuple(shlex.split(args.compiler)) if args.compiler else DEFAULT_COMPILER
+    r = run(args.blocks, args.repeat, cmd)
+    print(f"{args.blocks} blocks: rect {r['rect']:.2f}s, fit {r['fit']:.2f}s ({r['fit'] / r['rect']:.2f}x)")
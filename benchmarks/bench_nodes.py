@@ -0,0 +1,39 @@
+"""Memory-per-node comparison: list of ``Node`` dataclasses vs ``NodeTable``.
+
+Usage:
+  python -m benchmarks.bench_nodes [n_blocks]
+"""
+import sys, tracemalloc
+
+from plotnn_xt.blocks import encoder_block_factory
+from plotnn_xt.layout import repeat
+from plotnn_xt.nodetable import NodeTable
+from plotnn_xt.primitives import Node
+
+
+def _names_and_rows(nodes):
+    # Build fresh name strings so both measurements pay for them equally.
+    return [("".join(n.name), n.x, n.y, n.w, n.h, n.kind, n.label) for n in nodes]
+
+
+def measure(n_blocks: int = 16_000):
+    nodes, _ = repeat(n_blocks, encoder_block_factory(), gap=2.0)
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    as_list = [Node(*r) for r in _names_and_rows(nodes)]
+    list_bytes = tracemalloc.get_traced_memory()[0] - base
+    del as_list
+    base = tracemalloc.get_traced_memory()[0]
+    table = NodeTable()
+    for r in _names_and_rows(nodes):
+        table.append(*r)
+    table_bytes = tracemalloc.get_traced_memory()[0] - base
+    tracemalloc.stop()
+    n = len(table)
+    return {"nodes": n, "list_bytes_per_node": list_bytes / n, "table_bytes_per_node": table_bytes / n}
+
+
+if __name__ == "__main__":  # pragma: no cover
+    res = measure(int(sys.argv[1]) if len(sys.argv) > 1 else 16_000)
+    print(f"{res['nodes']} nodes: Node list {res['list_bytes_per_node']:.0f} B/node, "
+          f"NodeTable {res['table_bytes_per_node']:.0f} B/node")
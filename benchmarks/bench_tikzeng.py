@@ -0,0 +1,64 @@
+"""Throughput of the legacy ``pycore.tikzeng`` emitter.
+
+Builds a conv/pool/skip chain of ``--layers`` layers with the classic ``to_*``
+helpers and times snippet formatting and ``to_generate`` with and without the
+stdout echo (echo goes to ``os.devnull``; a terminal is slower still).
+
+Usage:
+  python -m benchmarks.bench_tikzeng [--layers 100,10000,100000] [--repeat 3]
+"""
+import argparse, contextlib, os, tempfile
+
+from pycore import tikzeng as T
+
+from ._util import best
+
+LAYERS = (100, 10_000, 100_000)
+
+
+def iter_arch(layers):
+    """Yield the snippets of a ``layers``-deep chain (four helpers per step)."""
+    yield T.to_head("..")
+    yield T.to_cor()
+    yield T.to_begin()
+    yield T.to_input("cats.jpg")
+    prev = "c0"
+    yield T.to_ConvConvRelu(prev, s_filer=512, n_filer=(64, 64), width=(2, 2))
+    for i in range(1, layers):
+        name = f"c{i}"
+        if i % 2:
+            yield T.to_Pool(f"p{i}", offset="(0,0,0)", to=f"({prev}-east)", width=1, height=32, depth=32)
+            yield T.to_Conv(name, s_filer=256, n_filer=128, offset="(1,0,0)", to=f"(p{i}-east)", height=32, depth=32)
+        else:
+            yield T.to_UnPool(f"p{i}", offset="(1,0,0)", to=f"({prev}-east)", width=1, height=32, depth=32)
+            yield T.to_ConvRes(name, s_filer=256, n_filer=128, offset="(0,0,0)", to=f"(p{i}-east)", height=32, depth=32)
+            yield T.to_skip(of=f"c{i - 2}", to=name, pos=1.25)
+        yield T.to_connection(prev, name)
+        prev = name
+    yield T.to_SoftMax("soft", to=f"({prev}-east)")
+    yield T.to_end()
+
+
+def run(layers=LAYERS, repeat=3):
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp, open(os.devnull, "w") as null:
+        out = os.path.join(tmp, "arch.tex")
+        for n in layers:
+            arch = list(iter_arch(n))
+            build = best(lambda: list(iter_arch(n)), repeat)
+            with contextlib.redirect_stdout(null):
+                echo = best(lambda: T.to_generate(arch, out), repeat)
+            quiet = best(lambda: T.to_generate(arch, out, echo=False), repeat)
+            stream = best(lambda: T.to_generate(iter_arch(n), out, echo=False), repeat)
+            rows.append((n, os.path.getsize(out), build, echo, quiet, stream))
+    return rows
+
+
+if __name__ == "__main__":  # pragma: no cover
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--layers", default=",".join(map(str, LAYERS)))
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+    print(f"{'layers':>8s} {'MB':>7s} {'build':>8s} {'echo':>8s} {'no-echo':>8s} {'stream':>8s}")
+    for n, size, build, echo, quiet, stream in run([int(s) for s in args.layers.split(",")], args.repeat):
+        print(f"{n:8d} {size / 1e6:7.1f} {build:8.3f} {echo:8.3f} {quiet:8.3f} {stream:8.3f}")
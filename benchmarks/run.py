@@ -0,0 +1,128 @@
+"""Timing suite for the layout, export and compile stages.
+
+Each stage runs at diagram sizes from 10 to 100k nodes; the best of ``--repeat``
+runs is written to a JSON file. ``--baseline`` compares against a stored result
+and exits non-zero when a stage got slower than ``--threshold``.
+
+Stages:
+  repeat_encoder / repeat_decoder  ``layout.repeat`` + block factory
+  export_tex                       ``export.export_tex`` of the encoder stack
+  tikzeng                          ``pycore.tikzeng.to_generate`` of transformer blocks
+  compile                          ``buildcache.compile_tex`` with ``--compiler``
+                                   (default: ``_util.STANDIN_COMPILER``, no TeX)
+
+Usage:
+  python -m benchmarks.run [--sizes 10,1000] [--stages export_tex,compile]
+                             [--out bench.json] [--baseline old.json] [--threshold 0.25]
+"""
+import argparse, contextlib, io, json, platform, shlex, sys, pathlib, tempfile
+
+from plotnn_xt.blocks import decoder_block_factory, encoder_block_factory
+from plotnn_xt.buildcache import compile_tex
+from plotnn_xt.export import export_tex
+from plotnn_xt.layout import repeat
+from pycore import tikzeng
+
+from ._util import ROOT, STANDIN_COMPILER, best, fresh_dir
+
+SIZES = (10, 100, 1_000, 10_000, 100_000)
+STAGES = ("repeat_encoder", "repeat_decoder", "export_tex", "tikzeng", "compile")
+
+
+def _blocks(size, factory):
+    per_block = len(factory(0, 0.0, 0.0)[0])
+    return max(1, size // per_block)
+
+
+def _tikzeng_arch(size):
+    arch = [tikzeng.to_head(".."), tikzeng.to_cor(), tikzeng.to_begin()]
+    for i in range(max(1, size // 5)):  # five nodes per block
+        arch += tikzeng.to_transformer_block(f"b{i}", i * 17.0, 0.0)
+    arch.append(tikzeng.to_end())
+    return arch
+
+
+def run(sizes=SIZES, stages=STAGES, rounds=3, compiler=STANDIN_COMPILER):
+    """Return ``{stage: {size: seconds}}`` (sizes are node counts, as strings for JSON)."""
+    results = {s: {} for s in stages}
+    enc = encoder_block_factory()
+    dec = decoder_block_factory()
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = pathlib.Path(tmp)
+        for size in sizes:
+            key = str(size)
+            n_enc = _blocks(size, enc)
+            if "repeat_encoder" in stages:
+                results["repeat_encoder"][key] = best(lambda: repeat(n_enc, enc, gap=2.0), rounds)
+            if "repeat_decoder" in stages:
+                n_dec = _blocks(size, dec)
+                results["repeat_decoder"][key] = best(lambda: repeat(n_dec, dec, gap=2.0), rounds)
+            tex = tmp / f"bench_{size}.tex"
+            if "export_tex" in stages or "compile" in stages:
+                nodes, edges = repeat(n_enc, enc, gap=2.0)
+                t = best(lambda: export_tex(nodes, edges, tex), rounds)
+                if "export_tex" in stages:
+                    results["export_tex"][key] = t
+            if "tikzeng" in stages:
+                arch = _tikzeng_arch(size)
+                with contextlib.redirect_stdout(io.StringIO()):  # to_generate echoes every chunk
+                    results["tikzeng"][key] = best(lambda: tikzeng.to_generate(arch, str(tmp / "tikzeng.tex")), rounds)
+            if "compile" in stages:
+                results["compile"][key] = best(lambda: compile_tex(tex, ROOT, compiler, fresh_dir(tmp)), rounds)
+    return results
+
+
+def compare(results, baseline, threshold=0.25, floor=1e-3):
+    """Regressions as ``(stage, size, old, new)``: slower than ``old * (1 + threshold)``.
+
+    Timings under ``floor`` seconds in both runs are ignored as noise.
+    """
+    slower = []
+    for stage, by_size in results.items():
+        for size, new in by_size.items():
+            old = baseline.get(stage, {}).get(size)
+            if old is None or max(old, new) < floor:
+                continue
+            if new > old * (1 + threshold):
+                slower.append((stage, size, old, new))
+    return slower
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", default=",".join(map(str, SIZES)), help="comma-separated node counts")
+    ap.add_argument("--stages", default=",".join(STAGES), help="comma-separated subset of " + ", ".join(STAGES))
+    ap.add_argument("--repeat", type=int, default=3)
+    ap.add_argument("--compiler", default=None, help="compile command template ({tex}, {outdir}, {stem})")
+    ap.add_argument("--out", default="bench_results.json")
+    ap.add_argument("--baseline", default=None, help="stored result to compare against")
+    ap.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown")
+    args = ap.parse_args(argv)
+
+    stages = tuple(s for s in args.stages.split(",") if s)
+    unknown = set(stages) - set(STAGES)
+    if unknown:
+        ap.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+    sizes = tuple(int(s) for s in args.sizes.split(",") if s)
+    compiler = tuple(shlex.split(args.compiler)) if args.compiler else STANDIN_COMPILER
+    results = run(sizes, stages, args.repeat, compiler)
+
+    doc = {"python": platform.python_version(), "platform": platform.platform(), "results": results}
+    pathlib.Path(args.out).write_text(json.dumps(doc, indent=2) + "\n")
+    for stage, by_size in results.items():
+        print(f"{stage:16s} " + "  ".join(f"{s:>7}:{t * 1e3:9.2f}ms" for s, t in by_size.items()))
+    print(f"wrote {args.out}")
+
+    if args.baseline:
+        base = json.loads(pathlib.Path(args.baseline).read_text())["results"]
+        slower = compare(results, base, args.threshold)
+        for stage, size, old, new in slower:
+            print(f"REGRESSION {stage} @ {size}: {old * 1e3:.2f}ms -> {new * 1e3:.2f}ms ({new / old - 1:+.0%})")
+        if slower:
+            return 1
+        print(f"no regressions vs {args.baseline} (threshold {args.threshold:.0%})")
+    return 0
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -1,6 +1,7 @@
 """Encoder–Decoder overview figure.
 Builds N encoder blocks (vertical) feeding into M decoder blocks (vertical) with cross-attention edges from final encoder outputs to each decoder cross-attn node.
 Generates examples/fig_encdec_overview.tex
+(``--externalize``: each stack as a cached sub-picture under examples/fig_encdec_overview-parts/)
 """
 import sys, pathlib
 from typing import List, Tuple
@@ -11,10 +12,11 @@ if str(_ROOT) not in sys.path:
 
 from plotnn_xt.blocks import encoder_block_factory, decoder_block_factory  # type: ignore  # noqa: E402
 from plotnn_xt.layout import repeat, group, connect, elbow  # type: ignore  # noqa: E402
+from plotnn_xt.routing import route_edges  # type: ignore  # noqa: E402
 from plotnn_xt.export import export_tex  # type: ignore  # noqa: E402
 
 
-def build(n_enc: int = 3, n_dec: int = 2) -> str:
+def build(n_enc: int = 3, n_dec: int = 2, externalize: bool = False) -> str:
     enc_builder = encoder_block_factory()
     dec_builder = decoder_block_factory(include_cross=True)
 
@@ -37,10 +39,12 @@ def build(n_enc: int = 3, n_dec: int = 2) -> str:
             cross_edges.append(elbow(enc_out.anchors["R"], dn.anchors["L"], dx=2.0))
 
     nodes = enc_nodes + dec_nodes
+    # route cross-attention links around decoder blocks instead of straight through them
+    cross_edges = route_edges(cross_edges, nodes)
     edges = enc_edges + dec_edges + cross_edges
-    export_tex(nodes, edges, "examples/fig_encdec_overview.tex", boxes=[g_enc, g_dec])
+    export_tex(nodes, edges, "examples/fig_encdec_overview.tex", boxes=[g_enc, g_dec], externalize=externalize)
     return "examples/fig_encdec_overview.tex"
 
 
 if __name__ == "__main__":  # pragma: no cover
-    print("Wrote", build())
+    print("Wrote", build(externalize="--externalize" in sys.argv[1:]))
@@ -0,0 +1,37 @@
+"""Mixture-of-experts layer placed by the layered auto-layout (no hand-set coordinates).
+Tokens -> LayerNorm -> router -> 4 expert FFNs -> combine (+) -> residual add.
+Generates examples/fig_moe_autolayout.tex
+"""
+import sys, pathlib
+_ROOT = pathlib.Path(__file__).resolve().parents[1]
+if str(_ROOT) not in sys.path:
+    sys.path.insert(0, str(_ROOT))
+
+from plotnn_xt.autolayout import layered  # noqa: E402
+from plotnn_xt.export import export_tex  # noqa: E402
+from plotnn_xt.layout import group  # noqa: E402
+from plotnn_xt.primitives import Node, ffn, layernorm, residual_add  # noqa: E402
+
+
+def build(n_experts: int = 4) -> str:
+    tok = layernorm("tok", 0, 0, label="Tokens")
+    ln = layernorm("ln", 0, 0)
+    router = Node("router", 0, 0, 2.2, 0.6, "sblk", "Router (top-2)")
+    experts = [ffn(f"exp{i}", 0, 0, w=2.8, h=1.0) for i in range(n_experts)]
+    mix = residual_add("mix", 0, 0)
+    add = residual_add("add", 0, 0)
+
+    links = [("tok", "ln"), ("ln", "router")]
+    links += [("router", e, "dashconn") for e in experts]
+    links += [(e, "mix") for e in experts]
+    links += [("mix", "add"), ("tok", "add")]
+    nodes, edges = layered([tok, ln, router, *experts, mix, add], links, layer_gap=1.0, node_gap=0.5)
+
+    placed = {n.name: n for n in nodes}
+    g = group("experts", [placed[e.name] for e in experts], title=f"Experts ×{n_experts}")
+    export_tex(nodes, edges, "examples/fig_moe_autolayout.tex", boxes=[g], validate=True)
+    return "examples/fig_moe_autolayout.tex"
+
+
+if __name__ == "__main__":  # pragma: no cover
+    print("Wrote", build())
@@ -1,3 +1,54 @@
-from .primitives import *  # noqa
-from .layout import *  # noqa
-from .export import export_tex  # noqa
+"""PlotNeuralNet transformer extension.
+
+The package surface is lazy (PEP 562): ``import plotnn_xt`` loads nothing else,
+and each public name imports its module on first access. Jinja2 is only loaded
+when a template is first rendered.
+"""
+import importlib
+
+_LAZY = {
+    # primitives
+    "Node": "primitives", "anchor_map": "primitives", "class_token": "primitives", "cls_head": "primitives",
+    "cross_attn": "primitives", "dropout": "primitives", "ffn": "primitives", "layernorm": "primitives",
+    "mha": "primitives", "patch_embed": "primitives", "pos_enc": "primitives", "residual_add": "primitives",
+    # layout
+    "Box": "layout", "Edge": "layout", "bus": "layout", "connect": "layout", "elbow": "layout",
+    "group": "layout", "lane": "layout", "repeat": "layout", "stack_tag": "layout", "stack_x": "layout",
+    # geometry
+    "BOX_INNER_SEP": "geometry", "BBox": "geometry", "bboxes": "geometry", "expand": "geometry", "union": "geometry",
+    # export
+    "export_tex": "export", "stream_tex": "export", "export_batch": "export", "Figure": "export",
+    "NodeTable": "nodetable", "NodeRef": "nodetable",
+    "replicate": "replication", "BlockTemplate": "replication", "instance": "replication", "Instances": "replication",
+    "layered": "autolayout",
+    "check_overlaps": "spatial", "GridIndex": "spatial",
+    "resolve_edges": "resolve",
+    "validate": "checks", "DiagramError": "checks",
+    "export_externalized": "externalize",
+    "export_svg": "svg",
+    "export_png": "raster",
+}
+
+_SUBMODULES = {
+    "autolayout", "batch", "blocks", "buildcache", "checks", "cli", "export", "externalize", "fileio", "geometry", "gpt", "layout", "nodetable",
+    "pipeline", "primitives", "raster", "replication", "resolve", "routing", "scene", "serialize", "spatial", "svg",
+    "texformat", "trace", "watch",
+}
+
+
+def __getattr__(name):
+    mod = _LAZY.get(name)
+    if mod is not None:
+        value = getattr(importlib.import_module(f".{mod}", __name__), name)
+        globals()[name] = value  # later lookups skip __getattr__
+        return value
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY) | _SUBMODULES)
+
+
+__all__ = sorted(_LAZY)
@@ -0,0 +1,59 @@
+"""Compile many figures in one TeX run and split the result per figure.
+
+Each standalone job pays TeX start-up plus the full preamble. ``build_batch``
+writes all figures as pages of one document (``export.export_batch``), compiles
+it once (through ``BuildCache``, so an unchanged batch is not recompiled) and
+splits the PDF back into ``<out_dir>/<figure.name>.pdf``.
+
+The splitter is a command template (default poppler's ``pdfseparate``) with
+``{pdf}`` and ``{pattern}`` placeholders; ``{pattern}`` contains ``%d`` for the
+1-based page number.
+"""
+from __future__ import annotations
+import os
+from pathlib import Path
+from typing import Dict, Optional, Sequence
+
+from .buildcache import DEFAULT_COMPILER, BuildCache, BuildError, _fill, _run
+from .export import Figure, export_batch
+
+DEFAULT_SPLITTER = ("pdfseparate", "{pdf}", "{pattern}")
+
+
+def build_batch(figures: Sequence[Figure], out_dir: str | Path, root: str | Path = ".", name: str = "batch",
+                compiler: Sequence[str] = DEFAULT_COMPILER, splitter: Sequence[str] = DEFAULT_SPLITTER,
+                cache: Optional[BuildCache] = None) -> Dict[str, Path]:
+    """Export, compile and split ``figures``; returns ``{figure name: pdf path}``.
+
+    Args:
+      figures: figures to typeset; names must be unique (they become file stems).
+      out_dir: directory for the batch document and the per-figure PDFs.
+      root: project root (compiler runs here so style paths resolve).
+      name: stem of the combined document.
+      compiler / splitter: command templates.
+      cache: optional ``BuildCache`` to reuse (its compiler takes precedence).
+    """
+    names = [f.name for f in figures]
+    if len(set(names)) != len(names):
+        raise ValueError("figure names must be unique within a batch")
+    out = Path(out_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    tex = export_batch(figures, out / f"{name}.tex").resolve()
+    cache = cache or BuildCache(root, compiler=compiler)
+    cache.build(tex)
+    pdf = tex.with_suffix(".pdf")
+
+    pattern = out / f".{name}-page-%d.pdf"
+    _run(_fill(splitter, pdf=str(pdf), pattern=str(pattern)), tex, cache.root)
+    result: Dict[str, Path] = {}
+    for page, fig_name in enumerate(names, start=1):
+        part = Path(str(pattern).replace("%d", str(page)))
+        if not part.exists():
+            raise BuildError(tex, splitter, f"splitter did not produce page {page} ({fig_name})")
+        dest = out / f"{fig_name}.pdf"
+        os.replace(part, dest)
+        result[fig_name] = dest
+    return result
+
+
+__all__ = ["build_batch", "DEFAULT_SPLITTER"]
@@ -4,6 +4,7 @@ from __future__ import annotations
 from typing import List, Tuple
 from .primitives import layernorm, mha, ffn, residual_add, Node, cross_attn
 from .layout import connect, elbow, Edge
+from .trace import pair_counts, traced
 
 
 def encoder_block_factory(width_override: float | None = None, three_d: bool = False):
@@ -14,6 +15,7 @@ def encoder_block_factory(width_override: float | None = None, three_d: bool = F
     width is computed from last node's east minus first node's west.
     """
 
+    @traced("blocks.encoder", counts=pair_counts)
     def build(idx: int, x: float, y: float) -> Tuple[List[Node], List[Edge], float]:
         # Place a canonical encoder sub-sequence starting at (x,y)
         ln1 = layernorm(f"ln{idx}_1", x, y, three_d=three_d)
@@ -47,6 +49,7 @@ def decoder_block_factory(width_override: float | None = None, include_cross: bo
     For layout simplicity we keep linear left-to-right; residual elbows similar to encoder.
     """
 
+    @traced("blocks.decoder", counts=pair_counts)
     def build(idx: int, x: float, y: float):
         ln1 = layernorm(f"dln{idx}_1", x, y, three_d=three_d)
         mmha = mha(f"dmha{idx}", x + 3.2, y, masked=True, three_d=three_d)
@@ -0,0 +1,221 @@
+"""Content-hash build cache for emitted TikZ documents.
+
+``latexmk``/make decide on mtimes, so re-running an example script that emits
+byte-identical TeX still triggers a full recompile. ``BuildCache`` instead keys
+each build on a SHA-256 of the ``.tex`` bytes plus the shared style inputs
+(``transformer_tex/*.tex``, ``layers/*.sty``) and the compiler command. On a hit
+the previously built PDF (and SVG, when requested) is copied back and the
+compiler is not run.
+
+The compiler is a command template, so tests and CI can substitute a stand-in::
+
+    cache = BuildCache(root, compiler=("python", "fake_tex.py", "{tex}", "{outdir}"))
+    cache.build("examples/fig_encoder_block.tex")
+    print(cache.report.summary())
+
+Placeholders: ``{tex}`` (absolute .tex path), ``{outdir}``, ``{stem}``; the
+conversion command additionally gets ``{pdf}`` and ``{svg}``.
+
+CLI: ``python -m plotnn_xt.buildcache [--svg] examples/*.tex``
+"""
+from __future__ import annotations
+import hashlib
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+from . import trace
+
+DEFAULT_DEPS = ("transformer_tex/*.tex", "layers/*.sty")
+DEFAULT_COMPILER = ("latexmk", "-pdf", "-halt-on-error", "-quiet", "-outdir={outdir}", "{tex}")
+DEFAULT_SVG = ("pdf2svg", "{pdf}", "{svg}")
+
+
+class BuildError(RuntimeError):
+    """Compiler or converter exited non-zero (``output`` holds its log tail)."""
+
+    def __init__(self, tex: Path, cmd: Sequence[str], output: str):
+        super().__init__(f"build failed for {tex}: {' '.join(cmd)}\n{output}")
+        self.tex = tex
+        self.cmd = list(cmd)
+        self.output = output
+
+
+@dataclass
+class CacheReport:
+    hits: List[Path] = field(default_factory=list)
+    misses: List[Path] = field(default_factory=list)
+
+    def summary(self) -> str:
+        lines = [f"hit   {p}" for p in self.hits] + [f"miss  {p}" for p in self.misses]
+        lines.append(f"build cache: {len(self.hits)} hit(s), {len(self.misses)} miss(es)")
+        return "\n".join(lines)
+
+
+def deps_digest(root: Path, deps: Sequence[str] = DEFAULT_DEPS) -> bytes:
+    """SHA-256 over the paths and bytes of every file matched by ``deps`` under ``root``."""
+    h = hashlib.sha256()
+    for pattern in deps:
+        for p in sorted(root.glob(pattern)):
+            h.update(p.relative_to(root).as_posix().encode() + b"\0")
+            h.update(p.read_bytes())
+    return h.digest()
+
+
+def _copy(src: Path, dst: Path) -> None:
+    """Copy ``src`` to ``dst`` via a temp file + ``os.replace``: concurrent or
+    interrupted builds never leave a truncated artifact that reads as a hit."""
+    fd, tmp = tempfile.mkstemp(dir=dst.parent, prefix=f".{dst.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        shutil.copyfile(src, tmp)
+        shutil.copymode(src, tmp)  # mkstemp files are 0600
+        os.replace(tmp, dst)
+    except BaseException:
+        os.unlink(tmp)
+        raise
+
+
+def _fill(cmd: Sequence[str], **kw: str) -> List[str]:
+    return [c.format(**kw) for c in cmd]
+
+
+def _run(cmd: List[str], tex: Path, cwd: Path) -> None:
+    with trace.span("build.run", cmd=Path(cmd[0]).name, tex=tex.name):
+        try:
+            proc = subprocess.run(cmd, cwd=str(cwd), stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        except FileNotFoundError:
+            raise BuildError(tex, cmd, f"compiler not found: {cmd[0]}") from None
+        except OSError as e:
+            raise BuildError(tex, cmd, f"cannot run {cmd[0]}: {e}") from None
+    if proc.returncode != 0:
+        raise BuildError(tex, cmd, proc.stdout[-2000:])
+
+
+def compile_tex(tex: Path, root: Path, compiler: Sequence[str] = DEFAULT_COMPILER, outdir: Optional[Path] = None) -> Path:
+    """Run ``compiler`` for ``tex`` (no caching); returns the produced PDF path."""
+    out = outdir if outdir is not None else tex.parent
+    pdf = out / f"{tex.stem}.pdf"
+    _run(_fill(compiler, tex=str(tex), outdir=str(out), stem=tex.stem), tex, root)
+    if not pdf.exists():
+        raise BuildError(tex, compiler, f"compiler did not produce {pdf}")
+    return pdf
+
+
+def convert_svg(pdf: Path, svg: Path, root: Path, svg_cmd: Sequence[str] = DEFAULT_SVG) -> Path:
+    svg.parent.mkdir(parents=True, exist_ok=True)
+    _run(_fill(svg_cmd, pdf=str(pdf), svg=str(svg)), pdf, root)
+    return svg
+
+
+class BuildCache:
+    """Skip TeX compiles whose inputs hash to an already built artifact.
+
+    Args:
+      root: project root; compiler runs here and ``deps`` globs resolve here.
+      cache_dir: artifact store (default ``<root>/.plotnn_cache``).
+      deps: glob patterns of shared inputs folded into every key.
+      compiler: command template producing ``{outdir}/{stem}.pdf``.
+      svg_cmd: command template converting ``{pdf}`` to ``{svg}``.
+    """
+
+    def __init__(self, root: str | Path = ".", cache_dir: str | Path | None = None, deps: Sequence[str] = DEFAULT_DEPS,
+                 compiler: Sequence[str] = DEFAULT_COMPILER, svg_cmd: Sequence[str] = DEFAULT_SVG):
+        self.root = Path(root).resolve()
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else self.root / ".plotnn_cache"
+        self.deps = tuple(deps)
+        self.compiler = tuple(compiler)
+        self.svg_cmd = tuple(svg_cmd)
+        self.report = CacheReport()
+        self._deps_digest: Optional[bytes] = None
+
+    def deps_digest(self) -> bytes:
+        """Hash of all shared style inputs (computed once per cache instance)."""
+        if self._deps_digest is None:
+            self._deps_digest = deps_digest(self.root, self.deps)
+        return self._deps_digest
+
+    def key(self, tex: str | Path) -> str:
+        h = hashlib.sha256()
+        h.update(self.deps_digest())
+        h.update("\0".join(self.compiler).encode() + b"\0")
+        with open(tex, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _slot(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / key
+
+    def build(self, tex: str | Path, outdir: str | Path | None = None, svg: str | Path | None = None) -> bool:
+        """Build ``tex`` to ``<outdir>/<stem>.pdf`` (and ``svg`` if given).
+
+        Returns True on a cache hit (compiler skipped), False otherwise.
+        """
+        tex = Path(tex)
+        if not tex.is_absolute():
+            tex = self.root / tex
+        out = Path(outdir) if outdir is not None else tex.parent
+        pdf = out / f"{tex.stem}.pdf"
+        with trace.span("build.cache", tex=tex.name) as s:
+            with trace.span("build.key"):
+                slot = self._slot(self.key(tex))
+            cached_pdf = slot / "out.pdf"
+            cached_svg = slot / "out.svg"
+
+            hit = cached_pdf.exists()
+            s.set(hit=hit)
+            if hit:
+                out.mkdir(parents=True, exist_ok=True)
+                _copy(cached_pdf, pdf)
+                self.report.hits.append(tex)
+            else:
+                compile_tex(tex, self.root, self.compiler, out)
+                slot.mkdir(parents=True, exist_ok=True)
+                _copy(pdf, cached_pdf)
+                self.report.misses.append(tex)
+
+            if svg is not None:
+                svg = Path(svg)
+                if cached_svg.exists():
+                    svg.parent.mkdir(parents=True, exist_ok=True)
+                    _copy(cached_svg, svg)
+                else:
+                    convert_svg(pdf, svg, self.root, self.svg_cmd)
+                    _copy(svg, cached_svg)
+        return hit
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:  # pragma: no cover - thin CLI wrapper
+    import argparse
+
+    ap = argparse.ArgumentParser(prog="python -m plotnn_xt.buildcache", description=__doc__.splitlines()[0])
+    ap.add_argument("tex", nargs="+")
+    ap.add_argument("--root", default=".")
+    ap.add_argument("--cache-dir", default=None)
+    ap.add_argument("--svg-dir", default=None, help="also convert to <svg-dir>/<stem>.svg")
+    args = ap.parse_args(argv)
+
+    cache = BuildCache(args.root, cache_dir=args.cache_dir)
+    status = 0
+    for t in args.tex:
+        svg = Path(args.svg_dir) / f"{Path(t).stem}.svg" if args.svg_dir else None
+        try:
+            cache.build(t, svg=svg)
+        except BuildError as e:
+            print(e, file=sys.stderr)
+            status = 1
+    print(cache.report.summary())
+    return status
+
+
+__all__ = ["BuildCache", "BuildError", "CacheReport", "compile_tex", "convert_svg", "deps_digest", "DEFAULT_COMPILER", "DEFAULT_DEPS", "DEFAULT_SVG"]
+
+
+if __name__ == "__main__":  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Structural checks for a diagram before it is sent to TeX.
+
+Duplicate node names (easy to produce with a custom ``repeat`` builder), edges
+whose ``(name.anchor)`` endpoints name no node, and ``Box`` members missing from
+the exported node set only show up as a slow LaTeX failure or a silently wrong
+picture. ``validate`` finds all of them with hash lookups in O(nodes + edges):
+
+* duplicate names among nodes, instanced block nodes and boxes (they share one
+  TikZ namespace),
+* edge endpoints referring to an unknown node (coordinates are not checked),
+* box members that are not exported.
+
+    validate(nodes, edges, boxes=[g]).raise_if_failed()
+    export_tex(nodes, edges, "fig.tex", boxes=[g], validate=True)  # same, raises DiagramError
+"""
+from __future__ import annotations
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from .geometry import node_ref
+
+
+class DiagramError(ValueError):
+    """Diagram failed ``validate`` (``report`` lists every problem)."""
+
+    def __init__(self, report: "ValidationReport"):
+        super().__init__(report.summary())
+        self.report = report
+
+
+@dataclass
+class ValidationReport:
+    duplicates: List[Tuple[str, int]] = field(default_factory=list)  # (name, occurrences)
+    dangling: List[Tuple[int, str, str]] = field(default_factory=list)  # (edge index, endpoint, missing node)
+    stray_members: List[Tuple[str, str]] = field(default_factory=list)  # (box, member)
+
+    @property
+    def ok(self) -> bool:
+        return not (self.duplicates or self.dangling or self.stray_members)
+
+    def summary(self) -> str:
+        lines = [f"duplicate {n} ({c}x)" for n, c in self.duplicates]
+        lines += [f"dangling  edge {i}: {expr} (no node {n})" for i, expr, n in self.dangling]
+        lines += [f"stray     {m} in box {b} is not exported" for b, m in self.stray_members]
+        lines.append(f"{len(self.duplicates)} duplicate name(s), {len(self.dangling)} dangling endpoint(s), "
+                     f"{len(self.stray_members)} stray box member(s)")
+        return "\n".join(lines)
+
+    def raise_if_failed(self) -> "ValidationReport":
+        if not self.ok:
+            raise DiagramError(self)
+        return self
+
+
+def _names(nodes: Iterable) -> List[str]:
+    names = getattr(nodes, "names", None)  # NodeTable / serialize.MappedNodes column
+    return list(names) if names is not None else [n.name for n in nodes]
+
+
+def validate(nodes: Iterable, edges: Iterable = (), boxes: Optional[Iterable] = None,
+             instances: Optional[Sequence] = None) -> ValidationReport:
+    """Check names and references of a diagram; never raises (see ``raise_if_failed``).
+
+    Args:
+      nodes: node-like objects or a ``NodeTable``.
+      edges: ``layout.Edge`` objects (consumed once); endpoints are checked,
+        waypoints are not.
+      boxes: optional ``layout.Box`` groups (their names are valid endpoints).
+      instances: optional ``replication.Instances``; inner block nodes count as nodes.
+    """
+    report = ValidationReport()
+    boxes = list(boxes or ())
+    names = _names(nodes)
+    for s in instances or ():
+        names += _names(s.nodes)
+    exported = set(names)
+    box_names = [b.name for b in boxes]
+    known = exported.union(box_names)
+    if len(known) != len(names) + len(box_names):
+        report.duplicates = sorted((n, c) for n, c in Counter(names + box_names).items() if c > 1)
+
+    for i, e in enumerate(edges):
+        for expr in (e.src, e.dst):
+            # ``(name.anchor)`` / ``(name)`` slice straight to a known name; only
+            # the rest (coordinates, dotted names, typos) goes through the parser.
+            if expr[1:expr.rfind(".")] in known:
+                continue
+            ref = node_ref(expr)
+            if ref is not None and ref not in known:
+                report.dangling.append((i, expr, ref))
+
+    for b in boxes:
+        report.stray_members += [(b.name, m) for m in _names(b.nodes) if m not in exported]
+    return report
+
+
+__all__ = ["DiagramError", "ValidationReport", "validate"]
@@ -0,0 +1,229 @@
+"""Command-line entry point: ``plotnn-tx build`` / ``plotnn-tx watch``.
+
+Discovers figure scripts (``fig_*.py``) under ``examples/`` (or the given
+paths), runs each to emit its ``.tex`` and compiles it through the content-hash
+``BuildCache`` — all on a bounded process pool. Unlike the Makefile, failures are
+reported per figure and make the command exit non-zero.
+
+``watch`` keeps one interpreter alive and rebuilds only the figures affected by
+an edit (see ``plotnn_xt.watch``).
+
+Usage:
+  python -m plotnn_xt.cli build [PATHS...] [-j N] [--svg] [--fmt] [--no-compile] [--trace out.json]
+  python -m plotnn_xt.cli watch [PATHS...] [--interval 0.5] [--compile]
+"""
+from __future__ import annotations
+import os
+import shlex
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+import click
+
+from . import trace
+from .buildcache import DEFAULT_COMPILER, BuildCache, BuildError, compile_tex, convert_svg
+from .texformat import FormatCache
+
+
+@dataclass
+class FigureResult:
+    script: Path
+    tex: Optional[Path] = None
+    ok: bool = True
+    cached: Optional[bool] = None  # None when compilation was skipped
+    gen_s: float = 0.0
+    compile_s: float = 0.0
+    error: str = ""
+    events: Optional[List[Dict[str, Any]]] = None  # trace spans (``--trace``)
+
+
+def discover(root: Path, paths: Iterable[str | Path] = ("examples",)) -> List[Path]:
+    """Figure scripts under ``paths`` (directories searched recursively for ``fig_*.py``)."""
+    found: List[Path] = []
+    for p in paths:
+        p = Path(p)
+        if not p.is_absolute():
+            p = root / p
+        if p.is_dir():
+            found.extend(sorted(p.rglob("fig_*.py")))
+        elif p.suffix == ".py":
+            found.append(p)
+    return list(dict.fromkeys(found))
+
+
+def build_figure(script: Path, root: Path, compile: bool = True, compiler: Sequence[str] = DEFAULT_COMPILER,
+                 svg_dir: Optional[Path] = None, use_cache: bool = True, timeout: Optional[float] = None,
+                 use_fmt: bool = False, traced: bool = False) -> FigureResult:
+    """Run one figure script and (optionally) compile its ``.tex``. Worker entry point.
+
+    With ``traced`` the script runs with ``PLOTNN_TRACE`` set and its spans, plus
+    this worker's generate / compile spans, are returned in ``events``.
+    """
+    if not traced:
+        return _build_figure(script, root, compile, compiler, svg_dir, use_cache, timeout, use_fmt, None)
+    trace.reset()
+    trace.enable()
+    with tempfile.TemporaryDirectory() as tmp:
+        child = Path(tmp) / "trace.json"
+        try:
+            with trace.span("figure", script=script.name):
+                res = _build_figure(script, root, compile, compiler, svg_dir, use_cache, timeout, use_fmt, child)
+        finally:
+            trace.disable()
+        if child.exists():
+            trace.load(child)
+    res.events = trace.events()
+    trace.reset()
+    return res
+
+
+def _build_figure(script, root, compile, compiler, svg_dir, use_cache, timeout, use_fmt, trace_out) -> FigureResult:
+    res = FigureResult(script)
+    env = None
+    if trace_out is not None:
+        env = {**os.environ, "PLOTNN_TRACE": str(trace_out)}
+    t0 = time.perf_counter()
+    try:
+        with trace.span("figure.generate"):
+            proc = subprocess.run([sys.executable, str(script)], cwd=str(root), stdout=subprocess.PIPE,
+                                  stderr=subprocess.STDOUT, text=True, timeout=timeout, env=env)
+    except subprocess.TimeoutExpired:
+        return FigureResult(script, ok=False, gen_s=time.perf_counter() - t0, error="script timed out")
+    res.gen_s = time.perf_counter() - t0
+    if proc.returncode != 0:
+        res.ok = False
+        res.error = proc.stdout.strip()[-2000:]
+        return res
+    tex = script.with_suffix(".tex")
+    if not tex.exists():
+        res.ok = False
+        res.error = f"script did not write {tex.name}"
+        return res
+    res.tex = tex
+    if not compile:
+        return res
+
+    svg = (svg_dir / f"{tex.stem}.svg") if svg_dir else None
+    t1 = time.perf_counter()
+    try:
+        with trace.span("figure.compile"):
+            if use_fmt:
+                compiler = FormatCache(root).compiler_for(tex, fallback=compiler)
+            if use_cache:
+                res.cached = BuildCache(root, compiler=compiler).build(tex, svg=svg)
+            else:
+                pdf = compile_tex(tex, root, compiler)
+                if svg is not None:
+                    convert_svg(pdf, svg, root)
+                res.cached = False
+    except BuildError as e:
+        res.ok = False
+        res.error = e.output.strip() or str(e)
+    except OSError as e:  # svg converter / format dump missing, unwritable cache, ...
+        res.ok = False
+        res.error = f"compile failed: {e}"
+    res.compile_s = time.perf_counter() - t1
+    return res
+
+
+def _fmt(res: FigureResult, root: Path) -> str:
+    try:
+        name = res.script.relative_to(root)
+    except ValueError:
+        name = res.script
+    status = "ok  " if res.ok else "FAIL"
+    compiled = ""
+    if res.cached is not None:
+        compiled = f"  compile {res.compile_s:6.2f}s{' (cached)' if res.cached else ''}"
+    return f"{status} {name}  gen {res.gen_s:6.2f}s{compiled}"
+
+
+@click.group(name="plotnn-tx")
+def cli():
+    """PlotNeuralNet transformer extension tools."""
+
+
+@cli.command()
+@click.argument("paths", nargs=-1, type=click.Path(exists=True))
+@click.option("--root", default=".", type=click.Path(exists=True, file_okay=False), help="Project root (scripts run here).")
+@click.option("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count).")
+@click.option("--compile/--no-compile", "do_compile", default=True, help="Compile emitted .tex to PDF.")
+@click.option("--compiler", default=None, help="Compiler command template, e.g. 'latexmk -pdf -outdir={outdir} {tex}'.")
+@click.option("--svg", "svg", is_flag=True, help="Also convert PDFs to SVG under --svg-dir.")
+@click.option("--svg-dir", default="examples/assets", show_default=True)
+@click.option("--no-cache", is_flag=True, help="Always recompile (ignore the content-hash cache).")
+@click.option("--timeout", type=float, default=None, help="Per-script timeout in seconds.")
+@click.option("--fmt", "use_fmt", is_flag=True, help="Compile against a cached precompiled preamble format (overrides --compiler).")
+@click.option("--trace", "trace_out", default=None, type=click.Path(dir_okay=False),
+              help="Write per-stage spans as Chrome trace JSON and print a summary table.")
+def build(paths, root, jobs, do_compile, compiler, svg, svg_dir, no_cache, timeout, use_fmt, trace_out):
+    """Generate and compile figure scripts in parallel."""
+    root_p = Path(root).resolve()
+    scripts = discover(root_p, paths or ("examples",))
+    if not scripts:
+        raise click.ClickException("no figure scripts found")
+    cmd = tuple(shlex.split(compiler)) if compiler else DEFAULT_COMPILER
+    svg_p = (root_p / svg_dir) if svg else None
+    jobs = max(1, jobs or os.cpu_count() or 1)
+
+    t0 = time.perf_counter()
+    results: List[FigureResult] = []
+    with ProcessPoolExecutor(max_workers=min(jobs, len(scripts))) as pool:
+        futs = {pool.submit(build_figure, s, root_p, do_compile, cmd, svg_p, not no_cache, timeout, use_fmt,
+                            trace_out is not None): s for s in scripts}
+        for fut in as_completed(futs):
+            try:
+                res = fut.result()
+            except Exception as e:  # crashed worker: report it, keep collecting the rest
+                res = FigureResult(futs[fut], ok=False, error=f"worker crashed: {type(e).__name__}: {e}")
+            results.append(res)
+            click.echo(_fmt(res, root_p))
+            if not res.ok and res.error:
+                click.echo("    " + res.error.replace("\n", "\n    "), err=True)
+
+    failed = [r for r in results if not r.ok]
+    hits = sum(1 for r in results if r.cached)
+    click.echo(f"{len(results)} figure(s), {len(failed)} failed, {hits} cache hit(s) "
+               f"in {time.perf_counter() - t0:.2f}s with {jobs} worker(s)")
+    if trace_out:
+        evts = [e for r in results for e in (r.events or ())]
+        trace.write_chrome(trace_out, evts)
+        click.echo(trace.summary(evts))
+        click.echo(f"trace written to {trace_out}")
+    if failed:
+        sys.exit(1)
+
+
+@cli.command()
+@click.argument("paths", nargs=-1, type=click.Path(exists=True))
+@click.option("--root", default=".", type=click.Path(exists=True, file_okay=False), help="Project root (scripts run here).")
+@click.option("--interval", type=float, default=0.5, show_default=True, help="Polling interval in seconds.")
+@click.option("--compile/--no-compile", "do_compile", default=False, help="Also compile rebuilt figures (content-hash cached).")
+@click.option("--compiler", default=None, help="Compiler command template, e.g. 'latexmk -pdf -outdir={outdir} {tex}'.")
+def watch(paths, root, interval, do_compile, compiler):
+    """Rebuild figures on change, reloading edited modules in-process."""
+    from .watch import Watcher
+
+    root_p = Path(root).resolve()
+    scripts = discover(root_p, paths or ("examples",))
+    if not scripts:
+        raise click.ClickException("no figure scripts found")
+    cmd = tuple(shlex.split(compiler)) if compiler else DEFAULT_COMPILER
+    Watcher(root_p, scripts, compile=do_compile, compiler=cmd, echo=click.echo).run(interval)
+
+
+def main() -> None:  # pragma: no cover
+    cli()
+
+
+__all__ = ["cli", "build_figure", "discover", "FigureResult"]
+
+
+if __name__ == "__main__":  # pragma: no cover
+    main()
@@ -1,49 +1,177 @@
 """Export utilities (Jinja -> standalone TikZ).
 
-Enhancements:
-  * Support rendering of grouping / lane boxes (``layout.Box``) using TikZ ``fit``.
-  * Boxes are drawn on the background layer so they appear behind primitives.
+Boxes are drawn on the background layer so they appear behind primitives; options
+are documented on ``export_tex``.
 """
 from __future__ import annotations
+import itertools
+import os
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
-from jinja2 import Template
-from typing import Sequence, Optional
+from typing import TYPE_CHECKING, Iterable, List, Sequence, Optional
+
+from .fileio import WriteReport
+from .geometry import BOX_INNER_SEP
+from .resolve import resolve_edges
+from .checks import validate as check
+from . import fileio, trace
+
+if TYPE_CHECKING:  # pragma: no cover
+  from jinja2 import Environment, Template
 
 try:  # circular-safe import (only needed for type hints / template attrs)
-  from .layout import Box  # type: ignore
+  from .layout import Box, Edge  # type: ignore
 except Exception:  # pragma: no cover
-  Box = None  # type: ignore
+  Box = Edge = None  # type: ignore
 
-TPL = r"""
+_HEAD = r"""
 \documentclass[tikz,border=2pt]{standalone}
 \input{transformer_tex/transformer_styles.tex}
 \begin{document}
-\begin{tikzpicture}
+"""
+
+# Per-item lines (loop variables ``n`` / ``b`` / ``e``), shared by every template.
+_NODE = r"""  \node[{{n.kind}}={{'%.2f'%n.w}}cm/{{'%.2f'%n.h}}cm] ({{n.name}}) at ({{'%.2f'%n.x}}cm,{{'%.2f'%n.y}}cm) { {{n.label}} };"""
+_BOX = r"""  {% if b.fit %}\node[{{b.kind}}{% if b.title %},label=above:{{b.title}}{% endif %},fit={{b.tikz_fit_expr()}}] ({{b.name}}) {};{% else %}{% set r = b.bounds() %}\node[{{b.kind}}{% if b.title %},label=above:{{b.title}}{% endif %},minimum width={{'%.2f'%(r[2]-r[0]+2*sep)}}cm,minimum height={{'%.2f'%(r[3]-r[1]+2*sep)}}cm] ({{b.name}}) at ({{'%.2f'%((r[0]+r[2])/2)}}cm,{{'%.2f'%((r[1]+r[3])/2)}}cm) {};{% endif %}"""
+_EDGE = r"""  {% if e.path %}\path[{{e.style}}] {{e.src}}{% for p in e.path %} -- ({{'%.2f'%p[0]}}cm,{{'%.2f'%p[1]}}cm){% endfor %} -- {{e.dst}};{% elif e.via %}\path[{{e.style}}] {{e.src}} -- ++({{'%.2f'%e.via[0]}}cm,{{'%.2f'%e.via[1]}}cm) |- {{e.dst}};{% else %}
+  \path[{{e.style}}] {{e.src}} -- {{e.dst}};{% endif %}"""
+
+# Instanced blocks (``replication.Instances``): each distinct template once as a
+# pic taking the block index as ``#1``, then one placement line per block. The
+# pic body must not contain blank lines (``\par`` would end ``\tikzset``'s argument).
+_PICS = r"""{% if pics %}
+% --- Block templates (pic argument #1 = block index) ------------------------
+{% for s in pics %}\tikzset{ {{s.pic}}/.pic={
+{% for n in s.pic_nodes %}""" + _NODE + r"""
+{% endfor %}{% for e in s.pic_edges %}""" + _EDGE.replace("{% else %}\n  ", "{% else %}") + r"""
+{% endfor %}}}
+{% endfor %}
+% --- Block instances -------------------------------------------------------
+{% for s in instances %}{% for x, y, i in s.placements %}  \pic at ({{'%.2f'%x}}cm,{{'%.2f'%y}}cm) { {{s.pic}}={{i}} };
+{% endfor %}{% endfor %}{% endif %}"""
+
+# One tikzpicture; shared by the single-figure and batch documents.
+_PICTURE = r"""\begin{tikzpicture}""" + _PICS + r"""
 % --- Primitive nodes -------------------------------------------------------
 {% for n in nodes %}
-  \node[{{n.kind}}={{'%.2f'%n.w}}cm/{{'%.2f'%n.h}}cm] ({{n.name}}) at ({{'%.2f'%n.x}}cm,{{'%.2f'%n.y}}cm) { {{n.label}} };
+""" + _NODE + r"""
 {% endfor %}
 
 % --- Group / lane boxes (background layer) --------------------------------
-{% if boxes and boxes|length > 0 %}
+{% if boxes %}
 \begin{scope}[on background layer]
 {% for b in boxes %}
-  \node[{{b.kind}}{% if b.title %},label=above:{{b.title}}{% endif %},fit={{b.tikz_fit_expr()}}] ({{b.name}}) {};
+""" + _BOX + r"""
 {% endfor %}
 \end{scope}
 {% endif %}
 
 % --- Edges -----------------------------------------------------------------
 {% for e in edges %}
-  {% if e.via %}\path[{{e.style}}] {{e.src}} -- ++({{'%.2f'%e.via[0]}}cm,{{'%.2f'%e.via[1]}}cm) |- {{e.dst}};{% else %}
-  \path[{{e.style}}] {{e.src}} -- {{e.dst}};{% endif %}
+""" + _EDGE + r"""
 {% endfor %}
 \end{tikzpicture}
-\end{document}
 """
 
+# Interleaved item stream (see ``stream_items``): each item is written as it arrives.
+_ITEMS = r"""\begin{tikzpicture}
+{% for tag, n in items %}{% if tag == "n" %}
+""" + _NODE + r"""{% elif tag == "e" %}{% with e = n %}
+""" + _EDGE + r"""{% endwith %}{% else %}{% with b = n %}
+\begin{scope}[on background layer]
+""" + _BOX + r"""
+\end{scope}{% endwith %}{% endif %}{% endfor %}
+\end{tikzpicture}
+"""
+
+_FOOT = r"""\end{document}
+"""
+
+TPL = _HEAD + _PICTURE + _FOOT
+ITEMS_TPL = _HEAD + _ITEMS + _FOOT
+
+# Multi-page document: standalone's ``tikz`` option puts every tikzpicture on its own page.
+BATCH_TPL = (_HEAD
+             + "{% for fig in figures %}{% with nodes=fig.nodes, edges=fig.edges, boxes=fig.boxes %}"
+             + "% === figure {{loop.index}}: {{fig.name}} ===\n"
+             + _PICTURE
+             + "{% endwith %}{% endfor %}"
+             + _FOOT)
+
+
+@dataclass
+class Figure:
+  """One picture of a batch document (``name`` becomes the split PDF's stem)."""
+  name: str
+  nodes: Sequence
+  edges: Sequence
+  boxes: Optional[Sequence] = None
+
+
+JINJA_CACHE_ENV = "PLOTNN_JINJA_CACHE"
+_TEMPLATES = {TPL: "figure.tex", BATCH_TPL: "batch.tex", ITEMS_TPL: "items.tex"}
+
+
+@lru_cache(maxsize=None)
+def _environment() -> Environment:
+  """Jinja2 is imported here, on first render; ``PLOTNN_JINJA_CACHE`` names a
+  directory for compiled templates so short-lived interpreters skip compiling them."""
+  from jinja2 import DictLoader, Environment, FileSystemBytecodeCache
+
+  bcc = None
+  cache_dir = os.environ.get(JINJA_CACHE_ENV)
+  if cache_dir:
+    Path(cache_dir).mkdir(parents=True, exist_ok=True)
+    bcc = FileSystemBytecodeCache(cache_dir)
+  env = Environment(loader=DictLoader({name: src for src, name in _TEMPLATES.items()}), bytecode_cache=bcc)
+  env.globals["sep"] = BOX_INNER_SEP
+  return env
+
+
+@lru_cache(maxsize=None)
+def _template(src: str = TPL) -> Template:
+  """Compile ``src`` once per process (``Template(src)`` re-parses on every call)."""
+  if src in _TEMPLATES:
+    return _environment().get_template(_TEMPLATES[src])
+  return _environment().from_string(src)
+
+
+def _nonempty(items: Optional[Iterable]) -> Optional[Iterable]:
+  """Return ``items`` if it yields at least one element, else None.
+
+  Lets the template's ``{% if boxes %}`` guard work for generators too, without
+  materializing them: the peeked element is chained back in front.
+  """
+  if items is None:
+    return None
+  if isinstance(items, Sequence):
+    return items or None
+  it = iter(items)
+  for first in it:
+    return itertools.chain((first,), it)
+  return None
+
 
-def export_tex(nodes: Sequence, edges: Sequence, out_tex: str | Path, boxes: Optional[Sequence] = None) -> Path:
+def _report(rep: WriteReport, sink: Optional[List[WriteReport]], span) -> None:
+  span.set(written=rep.written)
+  if sink is not None:
+    sink.append(rep)
+
+
+def _pics(instances: Sequence) -> list:
+  """Distinct pic definitions among ``instances`` (stacks of one block share one)."""
+  pics = {}
+  for s in instances:
+    seen = pics.setdefault(s.pic, s)
+    if seen is not s and (seen.pic_nodes, seen.pic_edges) != (s.pic_nodes, s.pic_edges):
+      raise ValueError(f"two different block templates share the pic name {s.pic!r}")
+  return list(pics.values())
+
+
+def export_tex(nodes: Sequence, edges: Sequence, out_tex: str | Path, boxes: Optional[Sequence] = None, numeric: bool = False,
+               instances: Optional[Sequence] = None, report: Optional[List[WriteReport]] = None,
+               externalize: bool | Iterable[str] = False, validate: bool = False) -> Path:
   """Render a standalone TikZ document.
 
   Args:
@@ -51,7 +179,108 @@ def export_tex(nodes: Sequence, edges: Sequence, out_tex: str | Path, boxes: Opt
     edges: sequence of Edge objects.
     out_tex: destination .tex path.
     boxes: optional sequence of Box (group / lane) objects.
+    numeric: emit edge endpoints and elbow corners as absolute coordinates
+      resolved in Python (``plotnn_xt.resolve``) instead of TikZ anchor arithmetic.
+    instances: optional ``replication.Instances`` stacks, emitted as one TikZ pic
+      per distinct block plus a placement line per block. ``nodes`` / ``edges``
+      hold everything else and may address the inner nodes by name.
+    report: optional list; a ``fileio.WriteReport`` (written or unchanged) is
+      appended. An unchanged file is not rewritten, so its mtime is kept.
+    externalize: True (every box) or box names; each such group is written as a
+      separately compiled, content-hashed sub-picture included from its PDF
+      (``plotnn_xt.externalize.export_externalized``).
+    validate: check names and references first (``plotnn_xt.checks``) and raise
+      ``checks.DiagramError`` listing every problem instead of writing a
+      document TeX would reject.
+  """
+  if validate:
+    with trace.span("export.validate"):
+      check(nodes, edges, boxes, instances).raise_if_failed()
+  if externalize:
+    from .externalize import export_externalized
+    return export_externalized(nodes, edges, out_tex, boxes or [], None if externalize is True else externalize,
+                               numeric=numeric, instances=instances, report=report)
+  out = Path(out_tex)
+  instances = instances or []
+  with trace.span("export.export_tex", nodes=trace.count(nodes), edges=trace.count(edges)):
+    if numeric:
+      with trace.span("export.resolve"):
+        inner = [n for s in instances for n in s.nodes]
+        edges = resolve_edges(edges, list(nodes) + inner if inner else nodes)
+    with trace.span("export.render"):
+      text = _template().render(nodes=nodes, edges=edges, boxes=boxes or [], pics=_pics(instances),
+                                instances=instances)
+    with trace.span("export.write", bytes=len(text)) as s:
+      _report(fileio.write_text(out, text), report, s)
+  return out
+
+
+def stream_tex(nodes: Iterable, edges: Iterable, out_tex: str | Path, boxes: Optional[Iterable] = None, buffer_size: int = 1 << 16,
+               report: Optional[List[WriteReport]] = None) -> Path:
+  """Streaming variant of ``export_tex`` for very large diagrams.
+
+  ``nodes``, ``edges`` and ``boxes`` may be any iterables (including generators);
+  each is consumed exactly once. The rendered document is written chunk by chunk
+  through a buffered file instead of being assembled as one string, so peak memory
+  does not grow with diagram size. Output is byte-identical to ``export_tex``.
+
+  Args:
+    nodes: iterable of primitive Node objects.
+    edges: iterable of Edge objects.
+    out_tex: destination .tex path.
+    boxes: optional iterable of Box (group / lane) objects.
+    buffer_size: write buffer size in bytes.
+    report: optional list receiving the ``fileio.WriteReport`` (as ``export_tex``).
+  """
+  out = Path(out_tex)
+  with trace.span("export.stream_tex", nodes=trace.count(nodes), edges=trace.count(edges)) as s:
+    chunks = _template().generate(nodes=nodes, edges=edges, boxes=_nonempty(boxes))
+    with fileio.atomic_open(out, buffering=buffer_size) as f:
+      for chunk in chunks:
+        f.write(chunk)
+    _report(f.report, report, s)
+  return out
+
+
+def export_batch(figures: Iterable[Figure], out_tex: str | Path, buffer_size: int = 1 << 16,
+                 report: Optional[List[WriteReport]] = None) -> Path:
+  """Render many figures into one multi-page standalone document.
+
+  Page ``i`` holds ``figures[i]``; every figure is a separate ``tikzpicture``
+  sharing a single preamble, so one TeX run typesets the whole batch.
+  """
+  out = Path(out_tex)
+  figs = (Figure(f.name, f.nodes, f.edges, _nonempty(f.boxes)) for f in figures)
+  with trace.span("export.export_batch") as s:
+    with fileio.atomic_open(out, buffering=buffer_size) as fh:
+      for chunk in _template(BATCH_TPL).generate(figures=figs):
+        fh.write(chunk)
+    _report(fh.report, report, s)
+  return out
+
+
+def _tagged(items: Iterable):
+  for it in items:
+    if isinstance(it, Edge):
+      yield "e", it
+    elif isinstance(it, Box):
+      yield "b", it
+    else:
+      yield "n", it
+
+
+def stream_items(items: Iterable, out_tex: str | Path, buffer_size: int = 1 << 16,
+                 report: Optional[List[WriteReport]] = None) -> Path:
+  """Render one interleaved stream of nodes, edges and boxes (see ``plotnn_xt.pipeline``).
+
+  Items are written in arrival order, so edges must follow the nodes they
+  reference; each box gets its own background-layer scope. The stream is consumed
+  exactly once and never materialized.
   """
   out = Path(out_tex)
-  out.write_text(Template(TPL).render(nodes=nodes, edges=edges, boxes=boxes or []))
+  with trace.span("export.stream_items") as s:
+    with fileio.atomic_open(out, buffering=buffer_size) as f:
+      for chunk in _template(ITEMS_TPL).generate(items=_tagged(items)):
+        f.write(chunk)
+    _report(f.report, report, s)
   return out
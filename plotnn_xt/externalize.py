@@ -0,0 +1,173 @@
+"""Per-group externalization: typeset each ``layout.Box`` group once, reuse its PDF.
+
+A big composite figure is re-typeset from scratch whenever any group changes.
+``export_externalized`` instead writes every selected group (its member nodes,
+the edges between them and the box itself) as a standalone sub-document
+``<stem>-parts/<box>-<hash>.tex``, where ``hash`` is a SHA-256 of that part's
+content. The main document places each part's PDF with ``\\includegraphics`` at
+its exact position and keeps invisible anchor nodes of the same size under the
+original names, so edges into and out of the group still attach correctly.
+
+An unchanged group keeps its file name (and file, see ``plotnn_xt.fileio``), so
+``BuildCache`` serves its PDF without running TeX; only edited groups and the
+now lightweight main document are compiled::
+
+    cache = BuildCache(".")
+    export_externalized(nodes, edges, "examples/fig.tex", boxes=[g_enc, g_dec],
+                        groups=["dec_stack"], cache=cache)
+
+Compile the main document from the project root, as for ``export_tex`` output
+(``\\includegraphics`` paths are relative to it, like the style ``\\input``).
+"""
+from __future__ import annotations
+import hashlib
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Iterable, List, Optional, Sequence
+
+from .export import _HEAD, _PICTURE, _FOOT, _pics, _report, _template
+from .fileio import WriteReport
+from .geometry import expand, node_ref
+from .resolve import anchor_table, resolve_edges
+from . import fileio, trace
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .buildcache import BuildCache
+
+PAD = 0.6  # cm of margin around a part's box frame (box title, 3D faces, elbows)
+KEY_LEN = 12  # hex digits of the content hash kept in part file names
+
+# A part is a full standalone document with a fixed bounding box (no border), so
+# its PDF maps 1:1 onto the rectangle recorded in the main document.
+PART_TPL = (_HEAD.replace("border=2pt", "border=0pt")
+            + _PICTURE.replace(r"\begin{tikzpicture}", r"\begin{tikzpicture}" + "\n"
+                               + r"\useasboundingbox ({{'%.2f'%clip[0]}}cm,{{'%.2f'%clip[1]}}cm) rectangle "
+                               + r"({{'%.2f'%clip[2]}}cm,{{'%.2f'%clip[3]}}cm);", 1)
+            + _FOOT)
+
+# Invisible stand-in with the original style size (3D faces dropped), so anchors
+# such as ``(name.east)`` resolve exactly as on the real node.
+_ANCHOR = r"""  \node[{{n.kind|replace('3d','')}}={{'%.2f'%n.w}}cm/{{'%.2f'%n.h}}cm,draw=none,fill=none,text opacity=0] ({{n.name}}) at ({{'%.2f'%n.x}}cm,{{'%.2f'%n.y}}cm) { {{n.label}} };"""
+_PARTS = r"""{% for p in parts %}
+% --- Externalized group {{p.box.name}} ({{p.tex.name}}) ---
+  \node[inner sep=0pt,outer sep=0pt,anchor=south west] at ({{'%.2f'%p.clip[0]}}cm,{{'%.2f'%p.clip[1]}}cm) {\includegraphics{{ '{' ~ p.graphic ~ '}' }}};
+{% for n in p.nodes %}""" + _ANCHOR + r"""
+{% endfor %}{% set r = p.box.bounds() %}  \node[{{p.box.kind}},draw=none,minimum width={{'%.2f'%(r[2]-r[0]+2*sep)}}cm,minimum height={{'%.2f'%(r[3]-r[1]+2*sep)}}cm] ({{p.box.name}}) at ({{'%.2f'%((r[0]+r[2])/2)}}cm,{{'%.2f'%((r[1]+r[3])/2)}}cm) {};
+{% endfor %}"""
+
+MAIN_TPL = (_HEAD.replace(r"\begin{document}", "\\usepackage{graphicx}\n\\begin{document}")
+            + _PICTURE.replace(r"\begin{tikzpicture}", r"\begin{tikzpicture}" + _PARTS, 1)
+            + _FOOT)
+
+
+@dataclass
+class Part:
+    """One externalized group: its sub-document and where the PDF goes."""
+    box: object
+    nodes: list
+    edges: list
+    clip: tuple  # (x0, y0, x1, y1) bounding box of the part picture, cm
+    key: str = ""
+    tex: Path = Path()
+
+    @property
+    def pdf(self) -> Path:
+        return self.tex.with_suffix(".pdf")
+
+    @property
+    def graphic(self) -> str:
+        return self.pdf.as_posix()
+
+
+def split_groups(nodes: Sequence, edges: Sequence, boxes: Sequence, groups: Optional[Iterable[str]] = None, pad: float = PAD):
+    """Partition a diagram into externalized ``Part`` s and what stays in the main picture.
+
+    Returns ``(parts, nodes, edges, boxes)``. An edge moves into a part only when
+    both ends name members of that group. Every node belongs to at most one part
+    (the first selected box listing it).
+    """
+    by_name = {b.name: b for b in boxes}
+    chosen = list(by_name) if groups is None else list(groups)
+    missing = [g for g in chosen if g not in by_name]
+    if missing:
+        raise ValueError(f"no box named {', '.join(map(repr, missing))} to externalize")
+
+    owner = {}
+    parts = []
+    for name in chosen:
+        b = by_name[name]
+        part = Part(b, [], [], expand(b.frame(), pad))
+        for n in b.nodes:
+            if owner.setdefault(n.name, part) is part:
+                part.nodes.append(n)
+        parts.append(part)
+
+    rest_edges = []
+    for e in edges:
+        a, z = node_ref(e.src), node_ref(e.dst)
+        part = owner.get(a)
+        if part is not None and owner.get(z) is part:
+            part.edges.append(e)
+        else:
+            rest_edges.append(e)
+    rest_nodes = [n for n in nodes if n.name not in owner]
+    rest_boxes = [b for b in boxes if b.name not in chosen]
+    return parts, rest_nodes, rest_edges, rest_boxes
+
+
+def _prune(parts_dir: Path, part: Part) -> None:
+    """Remove superseded sub-documents (and PDFs) of ``part``'s group."""
+    stale = re.compile(re.escape(part.box.name) + r"-[0-9a-f]{%d}\.(tex|pdf)" % KEY_LEN)
+    for p in parts_dir.glob(f"{part.box.name}-*"):
+        if stale.fullmatch(p.name) and p.stem != part.tex.stem:
+            p.unlink()
+
+
+def export_externalized(nodes: Sequence, edges: Sequence, out_tex: str | Path, boxes: Sequence, groups: Optional[Iterable[str]] = None,
+                        numeric: bool = False, instances: Optional[Sequence] = None, pad: float = PAD,
+                        cache: Optional["BuildCache"] = None, report: Optional[List[WriteReport]] = None) -> Path:
+    """``export_tex`` with each selected box typeset as a separate, cached sub-picture.
+
+    Args:
+      nodes, edges, out_tex, boxes, numeric, instances: as for ``export.export_tex``.
+      groups: names of the boxes to externalize (default: every box).
+      pad: margin (cm) around each box frame included in its part picture.
+      cache: optional ``buildcache.BuildCache``; every part is built through it
+        (unchanged parts are cache hits), the main document is left to the caller.
+      report: optional list receiving a ``fileio.WriteReport`` per written file
+        (parts first, then the main document).
+    """
+    out = Path(out_tex)
+    parts_dir = out.parent / f"{out.stem}-parts"
+    instances = instances or []
+    with trace.span("externalize.export", nodes=trace.count(nodes), edges=trace.count(edges)) as s:
+        parts, rest_nodes, rest_edges, rest_boxes = split_groups(nodes, edges, boxes, groups, pad)
+        s.set(parts=len(parts))
+        if numeric:  # after the split: resolved endpoints no longer name their nodes
+            with trace.span("export.resolve"):
+                inner = [n for i in instances for n in i.nodes]
+                table = anchor_table(list(nodes) + inner)
+                rest_edges = resolve_edges(rest_edges, table)
+                for part in parts:
+                    part.edges = resolve_edges(part.edges, table)
+        parts_dir.mkdir(parents=True, exist_ok=True)
+        for part in parts:
+            with trace.span("externalize.part", box=part.box.name, nodes=len(part.nodes)) as ps:
+                text = _template(PART_TPL).render(nodes=part.nodes, edges=part.edges, boxes=[part.box], clip=part.clip,
+                                                  pics=[], instances=[])
+                part.key = hashlib.sha256(text.encode()).hexdigest()[:KEY_LEN]
+                part.tex = parts_dir / f"{part.box.name}-{part.key}.tex"
+                _report(fileio.write_text(part.tex, text), report, ps)
+                _prune(parts_dir, part)
+                if cache is not None:
+                    ps.set(hit=cache.build(part.tex.resolve()))
+        with trace.span("export.render"):
+            text = _template(MAIN_TPL).render(parts=parts, nodes=rest_nodes, edges=rest_edges, boxes=rest_boxes,
+                                              pics=_pics(instances), instances=instances)
+        with trace.span("export.write", bytes=len(text)) as ws:
+            _report(fileio.write_text(out, text), report, ws)
+    return out
+
+
+__all__ = ["Part", "export_externalized", "split_groups", "MAIN_TPL", "PART_TPL", "PAD"]
@@ -0,0 +1,164 @@
+"""Write-if-changed, atomic output files for the exporters.
+
+Re-running a figure script used to rewrite its ``.tex`` unconditionally, which
+bumps the mtime and makes ``latexmk`` / make recompile unchanged figures. The
+helpers here leave a file untouched when its content is already identical
+(size check first, then a chunked byte comparison) and otherwise replace it
+atomically (temp file in the same directory + ``os.replace``), so concurrent
+builds never read a half-written file. Each call yields a ``WriteReport``.
+
+    rep = write_text("fig.tex", text)           # whole document in memory
+    with atomic_open("fig.tex") as f:           # streamed output
+        f.write(chunk)
+    f.report.written                            # False: content was unchanged
+"""
+from __future__ import annotations
+import locale
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import IO, Optional
+
+CHUNK = 1 << 16
+
+
+@dataclass(frozen=True)
+class WriteReport:
+    """Outcome of one exporter write."""
+    path: Path
+    written: bool  # False: identical content was already on disk (mtime kept)
+    size: int
+
+    def __str__(self) -> str:
+        return f"{'wrote' if self.written else 'unchanged'} {self.path} ({self.size} bytes)"
+
+
+def same_content(a: str | Path, b: str | Path, chunk: int = CHUNK) -> bool:
+    """True if both files exist and hold the same bytes."""
+    try:
+        if os.path.getsize(a) != os.path.getsize(b):
+            return False
+        with open(a, "rb") as fa, open(b, "rb") as fb:
+            while True:
+                x = fa.read(chunk)
+                if x != fb.read(chunk):
+                    return False
+                if not x:
+                    return True
+    except FileNotFoundError:
+        return False
+
+
+def _file_mode(path: Path) -> int:
+    """Mode for the new ``path``: the one it has, else what ``open`` would create.
+
+    mkstemp makes 0600 files; a new file should get 0666 less the umask. The
+    umask cannot be read without setting it, so probe it with a scratch file.
+    """
+    try:
+        return os.stat(path).st_mode & 0o7777
+    except FileNotFoundError:
+        pass
+    fd, probe = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".mode")
+    os.close(fd)
+    os.unlink(probe)
+    try:
+        os.close(os.open(probe, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666))
+    except OSError:  # name taken meanwhile
+        return 0o644
+    try:
+        return os.stat(probe).st_mode & 0o7777
+    finally:
+        os.unlink(probe)
+
+
+class AtomicWriter:
+    """Context manager writing to a temp file next to ``path``.
+
+    On a clean exit the temp file replaces ``path`` unless the content is
+    identical, in which case it is discarded; on an exception ``path`` is left
+    as it was. ``report`` is set after exit.
+    """
+
+    def __init__(self, path: str | Path, mode: str = "w", buffering: int = -1, encoding: Optional[str] = None,
+                 newline: Optional[str] = None):
+        self.path = Path(path)
+        self.mode = mode
+        self.buffering = buffering
+        self.encoding = encoding
+        self.newline = newline
+        self.report: Optional[WriteReport] = None
+        self._tmp: Optional[str] = None
+        self._file: Optional[IO] = None
+
+    def __enter__(self) -> "AtomicWriter":
+        fd, self._tmp = tempfile.mkstemp(dir=self.path.parent, prefix=f".{self.path.name}.", suffix=".tmp")
+        self._file = os.fdopen(fd, self.mode, self.buffering, self.encoding, newline=self.newline)
+        return self
+
+    # file-like surface, so ``with atomic_open(p) as f: f.write(...)`` works
+    def write(self, s):
+        return self._file.write(s)
+
+    def writelines(self, lines) -> None:
+        self._file.writelines(lines)
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self._file.close()
+        if exc_type is not None:
+            os.unlink(self._tmp)
+            return False
+        size = os.path.getsize(self._tmp)
+        written = not same_content(self._tmp, self.path)
+        try:
+            if written:
+                os.chmod(self._tmp, _file_mode(self.path))
+                os.replace(self._tmp, self.path)
+        finally:
+            if os.path.exists(self._tmp):
+                os.unlink(self._tmp)
+        self.report = WriteReport(self.path, written, size)
+        return False
+
+
+def atomic_open(path: str | Path, mode: str = "w", buffering: int = -1, encoding: Optional[str] = None,
+                newline: Optional[str] = None) -> AtomicWriter:
+    """Open ``path`` for write-if-changed, atomic output (see ``AtomicWriter``)."""
+    return AtomicWriter(path, mode, buffering, encoding, newline)
+
+
+def _holds(path: Path, data: bytes, chunk: int = CHUNK) -> bool:
+    """True if ``path`` exists and holds exactly ``data`` (size check, then chunked compare)."""
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        view = memoryview(data)
+        with open(path, "rb") as f:
+            for pos in range(0, len(data), chunk):
+                if f.read(chunk) != view[pos:pos + chunk]:
+                    return False
+        return True
+    except FileNotFoundError:
+        return False
+
+
+def write_bytes(path: str | Path, data: bytes) -> WriteReport:
+    """Write ``data`` to ``path`` unless the file already holds exactly ``data``."""
+    path = Path(path)
+    if _holds(path, data):
+        return WriteReport(path, False, len(data))
+    with atomic_open(path, "wb") as f:
+        f.write(data)
+    return f.report
+
+
+def write_text(path: str | Path, text: str, encoding: Optional[str] = None) -> WriteReport:
+    """Text counterpart of ``write_bytes``; encodes like ``Path.write_text`` (locale
+    encoding by default, ``os.linesep`` newlines)."""
+    if os.linesep != "\n":
+        text = text.replace("\n", os.linesep)
+    return write_bytes(path, text.encode(encoding or locale.getpreferredencoding(False)))
+
+
+__all__ = ["WriteReport", "AtomicWriter", "atomic_open", "write_bytes", "write_text", "same_content"]
@@ -0,0 +1,120 @@
+"""Node geometry helpers shared by layout checks, routing and renderers.
+
+TikZ places a node's ``center`` at ``(x, y)`` and ``w``/``h`` are its minimum
+width/height, so the nominal bounding box is ``x ± w/2``, ``y ± h/2``. 3D kinds
+(``blk3d`` ...) add the pseudo-extrusion drawn by ``transformer_styles.tex``.
+"""
+from __future__ import annotations
+from typing import Iterable, List, Optional, Tuple
+
+from .nodetable import NodeTable
+
+BBox = Tuple[float, float, float, float]  # (x0, y0, x1, y1)
+Point = Tuple[float, float]
+
+# TikZ anchor name -> (dx, dy) in half-extents from the center; also the
+# outward direction used when routing away from the node.
+ANCHOR_DIRS = {
+    "west": (-1.0, 0.0),
+    "east": (1.0, 0.0),
+    "north": (0.0, 1.0),
+    "south": (0.0, -1.0),
+    "center": (0.0, 0.0),
+}
+
+# Must match threeDShift / threeDUp in transformer_tex/transformer_styles.tex
+THREE_D_SHIFT = 0.35
+THREE_D_UP = 0.25
+# gbox / lane ``inner sep=6pt`` in cm
+BOX_INNER_SEP = 6 / 72.27 * 2.54
+
+
+def is_3d(kind: str) -> bool:
+    return kind.endswith("3d")
+
+
+def bbox(node) -> BBox:
+    """Nominal bounding box of a node-like object (``x, y, w, h, kind``)."""
+    hw = node.w / 2.0
+    hh = node.h / 2.0
+    x0, y0, x1, y1 = node.x - hw, node.y - hh, node.x + hw, node.y + hh
+    if is_3d(getattr(node, "kind", "")):
+        x1 += THREE_D_SHIFT
+        y1 += THREE_D_UP
+    return x0, y0, x1, y1
+
+
+def parse_anchor(expr: str) -> Optional[Tuple[str, str]]:
+    """Split ``"(name.anchor)"`` into ``(name, anchor)``; None for other expressions."""
+    if len(expr) < 3 or expr[0] != "(" or expr[-1] != ")":
+        return None
+    name, dot, anchor = expr[1:-1].rpartition(".")
+    if not dot or not name or anchor not in ANCHOR_DIRS:
+        return None
+    return name, anchor
+
+
+def node_ref(expr: str) -> Optional[str]:
+    """Node name an endpoint such as ``(name.anchor)`` or ``(name)`` refers to;
+    None for coordinates and calc expressions."""
+    parsed = parse_anchor(expr)
+    if parsed is not None:
+        return parsed[0]
+    if len(expr) < 3 or expr[0] != "(" or expr[-1] != ")":
+        return None
+    inner = expr[1:-1].strip()
+    if not inner or any(c in inner for c in ",:$+"):
+        return None
+    return inner.partition(".")[0]
+
+
+def anchor_point(node, anchor: str) -> Point:
+    """Coordinates of ``anchor`` on the node's nominal (front-face) border."""
+    dx, dy = ANCHOR_DIRS[anchor]
+    return node.x + dx * node.w / 2.0, node.y + dy * node.h / 2.0
+
+
+def bboxes(nodes: Iterable) -> List[BBox]:
+    """``bbox`` for every node; reads column storage (``NodeTable``,
+    ``serialize.MappedNodes``) directly."""
+    if isinstance(nodes, NodeTable) or hasattr(nodes, "kinds"):
+        out = []
+        for x, y, w, h, kind in zip(nodes.x, nodes.y, nodes.w, nodes.h, nodes.kinds):
+            hw, hh = w / 2.0, h / 2.0
+            if kind.endswith("3d"):
+                out.append((x - hw, y - hh, x + hw + THREE_D_SHIFT, y + hh + THREE_D_UP))
+            else:
+                out.append((x - hw, y - hh, x + hw, y + hh))
+        return out
+    return [bbox(n) for n in nodes]
+
+
+def union(boxes: Iterable[BBox]) -> BBox:
+    """Smallest box containing all ``boxes`` (raises ValueError if empty)."""
+    it = iter(boxes)
+    try:
+        x0, y0, x1, y1 = next(it)
+    except StopIteration:
+        raise ValueError("union of empty box sequence") from None
+    for a0, b0, a1, b1 in it:
+        if a0 < x0:
+            x0 = a0
+        if b0 < y0:
+            y0 = b0
+        if a1 > x1:
+            x1 = a1
+        if b1 > y1:
+            y1 = b1
+    return x0, y0, x1, y1
+
+
+def expand(b: BBox, margin: float) -> BBox:
+    return b[0] - margin, b[1] - margin, b[2] + margin, b[3] + margin
+
+
+def intersects(a: BBox, b: BBox, tol: float = 0.0) -> bool:
+    """True if ``a`` and ``b`` overlap by more than ``tol`` on both axes."""
+    return min(a[2], b[2]) - max(a[0], b[0]) > tol and min(a[3], b[3]) - max(a[1], b[1]) > tol
+
+
+__all__ = ["BBox", "Point", "ANCHOR_DIRS", "parse_anchor", "node_ref", "anchor_point", "bbox", "bboxes", "union", "expand", "intersects", "is_3d", "THREE_D_SHIFT", "THREE_D_UP", "BOX_INNER_SEP"]
@@ -6,7 +6,8 @@ from __future__ import annotations
 from typing import Tuple, List
 from .blocks import decoder_block_factory
 from .layout import repeat, group, stack_tag
-from .export import export_tex
+from .export import export_tex, stream_items
+from .pipeline import iter_repeat, iter_group, iter_tag
 
 
 def build_gpt_stack(n: int = 3, three_d: bool = False, include_cross: bool = False, out_tex: str | None = None):
@@ -29,4 +30,19 @@ def build_gpt_stack(n: int = 3, three_d: bool = False, include_cross: bool = Fal
         export_tex(all_nodes, edges, out_tex, boxes=[g])
     return out_tex, all_nodes, edges
 
-__all__ = ["build_gpt_stack"]
+
+def iter_gpt_stack(n: int = 3, three_d: bool = False, include_cross: bool = False, out_tex: str | None = None):
+    """Lazy ``build_gpt_stack``: the same figure as one generator of nodes, edges and boxes.
+
+    Blocks are built one at a time as the stream is consumed; with ``out_tex`` the
+    stream is written straight through ``stream_items`` and the path is returned.
+    """
+    builder = decoder_block_factory(include_cross=include_cross, three_d=three_d)
+    items = iter_repeat(n, builder, start=(0.0, 0.0), gap=2.0, dir="x")
+    items = iter_group(items, "gpt_stack_box", title=f"Decoder ×{n}{' + Cross' if include_cross else ''}{' (3D)' if three_d else ''}")
+    items = iter_tag(items, "gpt_tag_box", text=f"$\\times {n}$")
+    if out_tex:
+        return stream_items(items, out_tex)
+    return items
+
+__all__ = ["build_gpt_stack", "iter_gpt_stack"]
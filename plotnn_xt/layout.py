@@ -3,6 +3,9 @@ from __future__ import annotations
 from dataclasses import dataclass
 from typing import Optional, Tuple, Iterable, List, Sequence, Callable, Any
 
+from .geometry import BOX_INNER_SEP, BBox, bboxes, expand, union
+from .trace import pair_counts, traced
+
 
 @dataclass
 class Edge:
@@ -10,6 +13,7 @@ class Edge:
     dst: str
     style: str = "conn"
     via: Optional[Tuple[float, float]] = None  # (dx, dy) waypoint relative from src
+    path: Optional[Tuple[Tuple[float, float], ...]] = None  # absolute waypoints (cm); overrides via
 
 
 @dataclass
@@ -18,11 +22,23 @@ class Box:
     nodes: Sequence
     kind: str = "gbox"  # style for group box
     title: str | None = None
+    fit: bool = False  # True: let TikZ ``fit`` over every member (slow for big groups)
+    rect: Optional[BBox] = None  # precomputed member bounds; overrides ``nodes`` geometry
 
     def tikz_fit_expr(self) -> str:
         names = " ".join([f"({n.name})" for n in self.nodes])
         return names
 
+    def bounds(self) -> BBox:
+        """Union of member bounding boxes (``rect`` if given)."""
+        if self.rect is not None:
+            return self.rect
+        return union(bboxes(self.nodes))
+
+    def frame(self) -> BBox:
+        """Outer rectangle of the drawn box (member bounds plus the style's inner sep)."""
+        return expand(self.bounds(), BOX_INNER_SEP)
+
 
 def connect(a: str, b: str, style: str = "conn") -> Edge:
     return Edge(a, b, style)
@@ -34,6 +50,7 @@ def elbow(a: str, b: str, dx: float = 0.8, dy: Optional[float] = None, style: st
 
 # Simple horizontal stacking ------------------------------------------------
 
+@traced("layout.stack_x", counts=lambda r: {"nodes": len(r)})
 def stack_x(nodes: Iterable, start=(0.0, 0.0), gap: float = 0.8) -> List:
     x, y = start
     placed = []
@@ -46,15 +63,16 @@ def stack_x(nodes: Iterable, start=(0.0, 0.0), gap: float = 0.8) -> List:
 
 
 # Group / lane convenience -------------------------------------------------
-def group(name: str, nodes: Sequence, title: str | None = None) -> Box:
-    return Box(name=name, nodes=nodes, title=title, kind="gbox")
+def group(name: str, nodes: Sequence, title: str | None = None, fit: bool = False) -> Box:
+    return Box(name=name, nodes=nodes, title=title, kind="gbox", fit=fit)
 
 
-def lane(name: str, nodes: Sequence, title: str | None = None) -> Box:
-    return Box(name=name, nodes=nodes, title=title, kind="lane")
+def lane(name: str, nodes: Sequence, title: str | None = None, fit: bool = False) -> Box:
+    return Box(name=name, nodes=nodes, title=title, kind="lane", fit=fit)
 
 
 # Bus / fan-out -------------------------------------------------------------
+@traced("layout.bus", counts=lambda r: {"edges": len(r)})
 def bus(src_anchor: str, dst_anchors: Sequence[str], style: str = "conn", stub: float = 0.6, junction: bool = True) -> List[Edge]:
     """Improved fan-out (bus) helper.
 
@@ -79,6 +97,7 @@ def bus(src_anchor: str, dst_anchors: Sequence[str], style: str = "conn", stub:
 
 
 # Repeat / stacks ----------------------------------------------------------
+@traced("layout.repeat", counts=pair_counts)
 def repeat(n: int, block_fn: Callable[[int, float, float], Tuple[List[Any], List[Edge], float]], start=(0.0, 0.0), gap: float = 1.0, dir: str = "x") -> Tuple[List[Any], List[Edge]]:
     """Repeat a block builder n times along an axis.
 
@@ -103,6 +122,24 @@ def repeat(n: int, block_fn: Callable[[int, float, float], Tuple[List[Any], List
 
 
 # Stack tag helper ---------------------------------------------------------
+class _Tag:
+    def __init__(self, name: str, x: float, y: float, text: str):
+        self.name = name
+        self.x = x
+        self.y = y
+        self.w = 1.0
+        self.h = 0.5
+        self.kind = "tagnode"  # use dedicated style
+        self.label = text
+
+
+def _tag_at(name: str, first: Any, last: Any, y_top: float, text: str) -> Any:
+    """Tag centred over ``first``..``last`` (naive: assume ordered left->right), above ``y_top``."""
+    x_center = (first.x + last.x + getattr(last, "w", 0)) / 2.0
+    return _Tag(name, x_center - 0.5, y_top + 0.9, text)
+
+
+@traced("layout.stack_tag")
 def stack_tag(name: str, nodes: Sequence, text: str) -> Any:
     """Return a tiny label node (using same shape semantics as primitives) positioned
     just above the horizontal extent of provided nodes.
@@ -112,22 +149,5 @@ def stack_tag(name: str, nodes: Sequence, text: str) -> Any:
     """
     if not nodes:
         raise ValueError("nodes sequence empty for stack_tag")
-    first = nodes[0]
-    last = nodes[-1]
-    # Determine bounding box extremes (naive: assume ordered left->right)
-    x_center = (first.x + last.x + getattr(last, "w", 0)) / 2.0
     y_top = max(getattr(n, "y", 0) + getattr(n, "h", 0) / 2.0 for n in nodes)
-    # Place tag slightly above
-    class _Tag:
-        def __init__(self, name: str, x: float, y: float, text: str):
-            self.name = name
-            self.x = x
-            self.y = y
-            self.w = 1.0
-            self.h = 0.5
-            self.kind = "tagnode"  # use dedicated style
-            self.label = text
-            @property
-            def anchors(self):  # pragma: no cover - not used currently
-                return {"C": f"({self.name}.center)"}
-    return _Tag(name, x_center - 0.5, y_top + 0.9, text)
+    return _tag_at(name, nodes[0], nodes[-1], y_top, text)
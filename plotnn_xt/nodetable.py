@@ -0,0 +1,175 @@
+"""Compact struct-of-arrays storage for large node collections.
+
+``NodeTable`` keeps geometry in ``array('d')`` columns and shares repeated
+kind/label strings, handing out lightweight ``NodeRef`` row views that expose
+the same attributes as ``primitives.Node`` (``name, x, y, w, h, kind, label``
+and ``anchors``). A table can therefore be passed wherever a node sequence is
+expected: ``export_tex``, ``layout.group`` and ``layout.stack_tag`` work unchanged.
+
+Measured with ``benchmarks/bench_nodes.py`` (CPython 3.11, 96k encoder-block
+nodes, name strings included): ~212 bytes/node for a list of ``Node``
+dataclasses vs ~114 bytes/node for a ``NodeTable``.
+"""
+from __future__ import annotations
+from array import array
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, overload
+
+from .primitives import Node, anchor_map
+
+
+class NodeRef:
+    """Row view into a ``NodeTable`` (no per-node ``__dict__``)."""
+
+    __slots__ = ("_t", "_i")
+
+    def __init__(self, table: "NodeTable", i: int):
+        self._t = table
+        self._i = i
+
+    @property
+    def name(self) -> str:
+        return self._t.names[self._i]
+
+    @property
+    def x(self) -> float:
+        return self._t.x[self._i]
+
+    @property
+    def y(self) -> float:
+        return self._t.y[self._i]
+
+    @property
+    def w(self) -> float:
+        return self._t.w[self._i]
+
+    @property
+    def h(self) -> float:
+        return self._t.h[self._i]
+
+    @property
+    def kind(self) -> str:
+        return self._t.kinds[self._i]
+
+    @property
+    def label(self) -> str:
+        return self._t.labels[self._i]
+
+    @property
+    def anchors(self):
+        cache = self._t._anchors
+        a = cache.get(self._i)
+        if a is None:
+            a = cache[self._i] = anchor_map(self._t.names[self._i])
+        return a
+
+    def to_node(self) -> Node:
+        return Node(self.name, self.x, self.y, self.w, self.h, self.kind, self.label)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (NodeRef, Node)):
+            return (self.name, self.x, self.y, self.w, self.h, self.kind, self.label) == (
+                other.name, other.x, other.y, other.w, other.h, other.kind, other.label)
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return (f"NodeRef(name={self.name!r}, x={self.x!r}, y={self.y!r}, w={self.w!r}, "
+                f"h={self.h!r}, kind={self.kind!r}, label={self.label!r})")
+
+
+class NodeTable(Sequence):
+    """Struct-of-arrays node store.
+
+    Columns: ``names`` (list), ``x/y/w/h`` (``array('d')``), ``kinds`` / ``labels``
+    (lists of shared string objects). Use ``append``/``extend`` to populate and
+    index or iterate to get ``NodeRef`` views.
+    """
+
+    __slots__ = ("names", "x", "y", "w", "h", "kinds", "labels", "_strings", "_index", "_anchors")
+
+    def __init__(self, nodes: Optional[Iterable] = None):
+        self.names: List[str] = []
+        self.x = array("d")
+        self.y = array("d")
+        self.w = array("d")
+        self.h = array("d")
+        self.kinds: List[str] = []
+        self.labels: List[str] = []
+        self._strings: Dict[str, str] = {}
+        self._index: Optional[Dict[str, int]] = None
+        self._anchors: Dict[int, Mapping[str, str]] = {}  # row -> anchors, filled on access
+        if nodes is not None:
+            self.extend(nodes)
+
+    def __getstate__(self):
+        return None, {k: getattr(self, k) for k in self.__slots__ if k != "_anchors"}
+
+    def __setstate__(self, state):
+        for k, v in state[1].items():
+            setattr(self, k, v)
+        self._anchors = {}
+
+    def _share(self, s: str) -> str:
+        return self._strings.setdefault(s, s)
+
+    def append(self, name: str, x: float, y: float, w: float, h: float, kind: str, label: str = "") -> NodeRef:
+        i = len(self.names)
+        self.names.append(name)
+        self.x.append(x)
+        self.y.append(y)
+        self.w.append(w)
+        self.h.append(h)
+        self.kinds.append(self._share(kind))
+        self.labels.append(self._share(label))
+        if self._index is not None:
+            self._index[name] = i
+        return NodeRef(self, i)
+
+    def add(self, node) -> NodeRef:
+        """Append any node-like object (``Node``, ``NodeRef``, tag nodes)."""
+        return self.append(node.name, node.x, node.y, node.w, node.h, node.kind, getattr(node, "label", ""))
+
+    def extend(self, nodes: Iterable) -> None:
+        for n in nodes:
+            self.add(n)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    @overload
+    def __getitem__(self, i: int) -> NodeRef: ...
+    @overload
+    def __getitem__(self, i: slice) -> List[NodeRef]: ...
+
+    def __getitem__(self, i):
+        n = len(self.names)
+        if isinstance(i, slice):
+            return [NodeRef(self, j) for j in range(*i.indices(n))]
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("NodeTable index out of range")
+        return NodeRef(self, i)
+
+    def __iter__(self) -> Iterator[NodeRef]:
+        for i in range(len(self.names)):
+            yield NodeRef(self, i)
+
+    def __add__(self, other) -> List:
+        return list(self) + list(other)
+
+    def __radd__(self, other) -> List:
+        return list(other) + list(self)
+
+    def find(self, name: str) -> NodeRef:
+        """Look a row up by node name (index built lazily on first call)."""
+        if self._index is None:
+            self._index = {n: i for i, n in enumerate(self.names)}
+        return NodeRef(self, self._index[name])
+
+    def to_nodes(self) -> List[Node]:
+        return [r.to_node() for r in self]
+
+
+__all__ = ["NodeTable", "NodeRef"]
@@ -0,0 +1,80 @@
+"""Lazy (generator-based) diagram construction.
+
+Every stage takes and yields a single interleaved stream of items: nodes,
+``Edge`` objects and ``Box`` objects. Stages compose without intermediate lists,
+e.g. ``iter_tag(iter_group(iter_repeat(...)))``, and only the exporter
+(``export.stream_items``) consumes the stream, so peak memory tracks one block
+rather than the whole diagram.
+
+Ordering contract: a block's nodes are yielded before its edges, and group boxes
+and tags (which need the bounds of everything before them) come last.
+"""
+from __future__ import annotations
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
+
+from .geometry import bbox
+from .layout import Box, Edge, _tag_at
+
+
+def _is_node(item: Any) -> bool:
+    return not isinstance(item, (Edge, Box))
+
+
+def iter_repeat(n: int, block_fn: Callable[[int, float, float], Tuple[List[Any], List[Edge], float]], start=(0.0, 0.0), gap: float = 1.0, dir: str = "x") -> Iterator[Any]:
+    """Lazy ``layout.repeat``: call ``block_fn`` one block at a time, yielding its nodes then edges."""
+    assert dir in {"x", "y"}
+    ox, oy = start
+    for i in range(n):
+        nodes, edges, span = block_fn(i, ox, oy)
+        yield from nodes
+        yield from edges
+        if dir == "x":
+            ox += span + gap
+        else:
+            oy -= span + gap  # vertical stacking downward by default
+
+
+def iter_stack_x(nodes: Iterable, start=(0.0, 0.0), gap: float = 0.8) -> Iterator[Any]:
+    """Lazy ``layout.stack_x``."""
+    x, y = start
+    for n in nodes:
+        yield n.__class__(**{**n.__dict__, "x": x, "y": y})  # type: ignore[arg-type]
+        x += getattr(n, "w", 1.0) + gap
+
+
+def iter_group(items: Iterable, name: str, title: str | None = None, kind: str = "gbox") -> Iterator[Any]:
+    """Pass ``items`` through, then yield a ``Box`` around every node seen.
+
+    Bounds are accumulated on the fly, so the box carries a precomputed ``rect``
+    and no member list (it cannot use TikZ ``fit``).
+    """
+    x0 = y0 = float("inf")
+    x1 = y1 = float("-inf")
+    for item in items:
+        if _is_node(item):
+            a0, b0, a1, b1 = bbox(item)
+            x0, y0 = min(x0, a0), min(y0, b0)
+            x1, y1 = max(x1, a1), max(y1, b1)
+        yield item
+    if x0 > x1:
+        raise ValueError(f"no nodes to group for {name!r}")
+    yield Box(name=name, nodes=(), kind=kind, title=title, rect=(x0, y0, x1, y1))
+
+
+def iter_tag(items: Iterable, name: str, text: str) -> Iterator[Any]:
+    """Pass ``items`` through, then yield a ``layout.stack_tag`` over the nodes seen."""
+    first = last = None
+    y_top = float("-inf")
+    for item in items:
+        if _is_node(item):
+            if first is None:
+                first = item
+            last = item
+            y_top = max(y_top, getattr(item, "y", 0) + getattr(item, "h", 0) / 2.0)
+        yield item
+    if first is None:
+        raise ValueError("nodes sequence empty for stack_tag")
+    yield _tag_at(name, first, last, y_top, text)
+
+
+__all__ = ["iter_repeat", "iter_stack_x", "iter_group", "iter_tag"]
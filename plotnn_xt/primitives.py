@@ -3,11 +3,31 @@ Initial bootstrap version.
 """
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict
+from types import MappingProxyType
+from typing import Mapping
+
+
+def anchor_map(name: str) -> Mapping[str, str]:
+    """Port name -> TikZ anchor expression for node ``name`` (read-only).
+
+    Not cached here: ``Node.anchors`` / ``NodeRef.anchors`` keep the map on the
+    node, so it lives exactly as long as the node does.
+    """
+    return MappingProxyType({
+        "L": f"({name}.west)",
+        "R": f"({name}.east)",
+        "T": f"({name}.north)",
+        "B": f"({name}.south)",
+        "C": f"({name}.center)",
+    })
 
 
 @dataclass
 class Node:
+    # ``_anchors`` is a real slot next to ``__dict__``: copies made from
+    # ``n.__dict__`` (``stack_x``), ``repr`` and ``==`` never see the cache.
+    __slots__ = ("_anchors", "__dict__", "__weakref__")
+
     name: str
     x: float
     y: float
@@ -17,14 +37,15 @@ class Node:
     label: str = ""
 
     @property
-    def anchors(self) -> Dict[str, str]:
-        return {
-            "L": f"({self.name}.west)",
-            "R": f"({self.name}.east)",
-            "T": f"({self.name}.north)",
-            "B": f"({self.name}.south)",
-            "C": f"({self.name}.center)",
-        }
+    def anchors(self) -> Mapping[str, str]:
+        """Port -> anchor expression, built on first access and kept on the node."""
+        cached = getattr(self, "_anchors", None)
+        if cached is None or cached[0] != self.name:  # renamed since: rebuild
+            cached = self._anchors = (self.name, anchor_map(self.name))
+        return cached[1]
+
+    def __getstate__(self):
+        return self.__dict__  # without the anchor cache (rebuilt on access)
 
 
 # Core transformer pieces --------------------------------------------------
@@ -0,0 +1,149 @@
+"""Pillow rasterizer for diagram thumbnails and render-regression tests.
+
+Draws the same ``plotnn_xt.scene`` shapes as the SVG backend straight into a
+PNG, in milliseconds and without TeX. Labels are optional (``labels=False`` by
+default) since font availability differs between machines; geometry alone is
+enough to catch layout regressions.
+
+    export_png(nodes, edges, "thumb.png", boxes=[g], scale=30)
+"""
+from __future__ import annotations
+import math
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from PIL import Image, ImageChops, ImageDraw, ImageFont
+
+from .scene import FONT, LEADING, Circle, Poly, Rect, Scene, Text, Theme, build_scene, text_height
+
+Point = Tuple[float, float]
+DEFAULT_SCALE = 40.0  # pixels per cm
+FONTS = ("DejaVuSerif.ttf", "DejaVuSans.ttf")  # tried in order; Pillow's built-in font as fallback
+
+
+@lru_cache(maxsize=64)
+def _font(size: float) -> ImageFont.FreeTypeFont:
+    for name in FONTS:
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            continue
+    return ImageFont.load_default(size=size)
+
+
+def _dashes(points: Sequence[Point], on: float, off: float) -> Iterator[List[Point]]:
+    """Split a polyline into dash segments (pixel units)."""
+    period = on + off
+    pos = 0.0  # distance along the dash pattern
+    for (ax, ay), (bx, by) in zip(points, points[1:]):
+        seg = math.hypot(bx - ax, by - ay)
+        t = 0.0
+        while t < seg:
+            phase = pos % period
+            step = min((on - phase) if phase < on else (period - phase), seg - t)
+            if phase < on:
+                u0, u1 = t / seg, (t + step) / seg
+                yield [(ax + (bx - ax) * u0, ay + (by - ay) * u0), (ax + (bx - ax) * u1, ay + (by - ay) * u1)]
+            t += step
+            pos += step
+
+
+def render_image(scene: Scene, scale: float = DEFAULT_SCALE, supersample: int = 2) -> Image.Image:
+    """Rasterize ``scene`` to an RGB image (``scale`` px per cm)."""
+    s = scale * supersample
+    size = (max(1, round(scene.width * s)), max(1, round(scene.height * s)))
+    img = Image.new("RGB", size, scene.background or "#ffffff")
+    draw = ImageDraw.Draw(img)
+
+    def px(x: float, y: float) -> Point:
+        return (x - scene.x0) * s, (scene.y1 - y) * s
+
+    def lw(width: float) -> int:
+        return max(1, round(width * s))
+
+    for sh in scene.shapes:
+        if isinstance(sh, Rect):
+            (x0, y0), (x1, y1) = px(sh.x0, sh.y1), px(sh.x1, sh.y0)
+            if sh.dashed:
+                if sh.fill:
+                    draw.rectangle((x0, y0, x1, y1), fill=sh.fill)
+                corners = [(x0, y0), (x1, y0), (x1, y1), (x0, y1), (x0, y0)]
+                w = lw(sh.width)
+                for seg in _dashes(corners, 4 * w, 4 * w):
+                    draw.line(seg, fill=sh.stroke, width=w)
+            else:
+                draw.rounded_rectangle((x0, y0, x1, y1), radius=sh.radius * s, fill=sh.fill,
+                                       outline=sh.stroke, width=lw(sh.width) if sh.stroke else 0)
+        elif isinstance(sh, Circle):
+            cx, cy = px(sh.cx, sh.cy)
+            r = sh.r * s
+            draw.ellipse((cx - r, cy - r, cx + r, cy + r), fill=sh.fill, outline=sh.stroke,
+                         width=lw(sh.width) if sh.stroke else 0)
+        elif isinstance(sh, Poly):
+            pts = [px(x, y) for x, y in sh.points]
+            if sh.closed:
+                draw.polygon(pts, fill=sh.fill, outline=sh.stroke, width=lw(sh.width) if sh.stroke else 0)
+            elif sh.dashed:
+                w = lw(sh.width)
+                for seg in _dashes(pts, 4 * w, 4 * w):
+                    draw.line(seg, fill=sh.stroke, width=w)
+            else:
+                draw.line(pts, fill=sh.stroke, width=lw(sh.width), joint="curve")
+        elif isinstance(sh, Text):
+            _text(draw, sh, px, s)
+    if supersample > 1:
+        img = img.resize((max(1, round(scene.width * scale)), max(1, round(scene.height * scale))), Image.LANCZOS)
+    return img
+
+
+def _text(draw: ImageDraw.ImageDraw, t: Text, px, s: float) -> None:
+    cx, top = px(t.x, t.y + text_height(t.lines) / 2)
+    y = top
+    for line in t.lines:
+        size = FONT[line.size] * s
+        font = _font(round(size))
+        small = _font(round(size * 0.7))
+        runs = [(r, small if r.shift else font) for r in line.runs]
+        width = sum(draw.textlength(r.text, font=f) for r, f in runs)
+        x = cx - width / 2
+        mid = y + LEADING[line.size] * s / 2
+        for r, f in runs:
+            draw.text((x, mid - r.shift * size * 0.3), r.text, fill=t.color, font=f, anchor="lm")
+            x += draw.textlength(r.text, font=f)
+        y += LEADING[line.size] * s
+
+
+def render_png(nodes: Sequence, edges: Iterable = (), boxes: Optional[Iterable] = None,
+               theme: str | Theme = "paper", labels: bool = False, scale: float = DEFAULT_SCALE,
+               max_px: Optional[int] = None) -> Image.Image:
+    """Diagram -> ``PIL.Image`` (``max_px`` caps the longer side, e.g. for thumbnails)."""
+    img = render_image(build_scene(nodes, edges, boxes, theme, labels), scale)
+    if max_px is not None:
+        img.thumbnail((max_px, max_px), Image.LANCZOS)
+    return img
+
+
+def export_png(nodes: Sequence, edges: Iterable, out_png: str | Path, boxes: Optional[Iterable] = None,
+               theme: str | Theme = "paper", labels: bool = False, scale: float = DEFAULT_SCALE,
+               max_px: Optional[int] = None) -> Path:
+    """Render a diagram straight to a PNG file."""
+    out = Path(out_png)
+    render_png(nodes, edges, boxes, theme, labels, scale, max_px).save(out, optimize=True)
+    return out
+
+
+def image_diff(a: Image.Image, b: Image.Image, threshold: int = 48) -> Tuple[float, Image.Image]:
+    """Fraction of pixels whose max channel difference exceeds ``threshold``, and the diff mask.
+
+    Images of different size count as fully different.
+    """
+    if a.size != b.size:
+        return 1.0, Image.new("L", a.size, 255)
+    r, g, bl = ImageChops.difference(a.convert("RGB"), b.convert("RGB")).split()
+    mask = ImageChops.lighter(ImageChops.lighter(r, g), bl).point(lambda v: 255 if v > threshold else 0)
+    changed = mask.histogram()[255]
+    return changed / (a.size[0] * a.size[1]), mask
+
+
+__all__ = ["render_image", "render_png", "export_png", "image_diff", "DEFAULT_SCALE"]
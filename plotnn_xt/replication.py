@@ -0,0 +1,270 @@
+"""Batched block replication (fast path for ``layout.repeat``).
+
+``repeat`` calls the block builder once per block, re-creating every ``Node``,
+``Edge`` and anchor string. Blocks produced by ``encoder_block_factory`` /
+``decoder_block_factory`` are translations of one template, so ``replicate``
+builds the block once at the origin with a placeholder index, then stamps out
+all copies column-wise into a ``NodeTable`` (offsets added per column, names
+re-joined around the index placeholder).
+
+The template is checked against real builder calls at the first, second and
+last index before stamping; builders that are not pure translations there
+(index-dependent geometry, a special last block, ``%d`` formatting, ...)
+transparently fall back to ``repeat``.
+
+``instance`` keeps the stack symbolic instead (``Instances``): ``export_tex``
+then writes the block once as a TikZ ``pic`` plus one placement line per
+block, so output size no longer grows with the block size.
+"""
+from __future__ import annotations
+import hashlib
+import math
+from array import array
+from typing import Any, Callable, Iterator, List, Optional, Sequence, Tuple
+
+from .layout import Edge, repeat
+from .nodetable import NodeTable
+from .primitives import Node
+
+_TOKEN = "\x00"
+
+
+class _Idx(int):
+    """Index placeholder: behaves as ``0`` in arithmetic, formats as a token."""
+
+    def __format__(self, spec: str) -> str:
+        return _TOKEN if not spec else int.__format__(0, spec)
+
+    def __str__(self) -> str:
+        return _TOKEN
+
+
+def _stamp_edge(row, i: str, ox: float, oy: float) -> Edge:
+    s, d, style, via, path = row
+    if path is not None:
+        path = tuple((ox + px, oy + py) for px, py in path)
+    return Edge(i.join(s), i.join(d), style, via, path)
+
+
+class StampedEdges(Sequence):
+    """Lazy edge list for stamped blocks.
+
+    Stores the template edges once plus the block indices and origins; ``Edge``
+    objects (and their anchor strings, translated waypoints) are produced on
+    access, so building a stack does not pay for every edge up front.
+    """
+
+    __slots__ = ("_rows", "_idx", "_offsets")
+
+    def __init__(self, rows: Sequence[Tuple[List[str], List[str], str, Any, Any]], idx: Sequence[str],
+                 offsets: Sequence[Tuple[float, float]]):
+        self._rows = rows
+        self._idx = idx
+        self._offsets = offsets
+
+    def __len__(self) -> int:
+        return len(self._rows) * len(self._idx)
+
+    def _edge(self, k: int) -> Edge:
+        b, r = divmod(k, len(self._rows))
+        return _stamp_edge(self._rows[r], self._idx[b], *self._offsets[b])
+
+    def __getitem__(self, k):
+        n = len(self)
+        if isinstance(k, slice):
+            return [self._edge(j) for j in range(*k.indices(n))]
+        if k < 0:
+            k += n
+        if not 0 <= k < n:
+            raise IndexError("StampedEdges index out of range")
+        return self._edge(k)
+
+    def __iter__(self) -> Iterator[Edge]:
+        for i, (ox, oy) in zip(self._idx, self._offsets):
+            for row in self._rows:
+                yield _stamp_edge(row, i, ox, oy)
+
+    def __add__(self, other) -> List[Edge]:
+        return list(self) + list(other)
+
+    def __radd__(self, other) -> List[Edge]:
+        return list(other) + list(self)
+
+
+class BlockTemplate:
+    """A block builder captured once at the origin.
+
+    Attributes:
+      span: advance along the repeat axis reported by the builder.
+      nodes: rows ``(name_parts, x, y, w, h, kind, label_parts)`` where the
+        ``*_parts`` are split around the index placeholder.
+      edges: rows ``(src_parts, dst_parts, style, via, path)``; ``path``
+        waypoints are relative to the block origin.
+    """
+
+    def __init__(self, block_fn: Callable[[int, float, float], Tuple[List[Any], List[Edge], float]]):
+        nodes, edges, span = block_fn(_Idx(), 0.0, 0.0)
+        self.block_fn = block_fn
+        self.span = span
+        self.nodes = [(n.name.split(_TOKEN), n.x, n.y, n.w, n.h, n.kind, getattr(n, "label", "").split(_TOKEN)) for n in nodes]
+        self.edges = [(e.src.split(_TOKEN), e.dst.split(_TOKEN), e.style, e.via, e.path) for e in edges]
+
+    def offsets(self, n: int, start=(0.0, 0.0), gap: float = 1.0, dir: str = "x") -> List[Tuple[float, float]]:
+        """Block origins, accumulated exactly as ``repeat`` does."""
+        assert dir in {"x", "y"}
+        ox, oy = start
+        out = []
+        step = self.span + gap
+        for _ in range(n):
+            out.append((ox, oy))
+            if dir == "x":
+                ox += step
+            else:
+                oy -= step
+        return out
+
+    def stamp(self, offsets: Sequence[Tuple[float, float]], first_index: int = 0) -> Tuple[NodeTable, StampedEdges]:
+        """Translate the template to every origin in ``offsets``."""
+        idx = [str(first_index + i) for i in range(len(offsets))]
+        table = NodeTable()
+        rows = self.nodes
+        table.names = [i.join(r[0]) for i in idx for r in rows]
+        table.x = array("d", [ox + r[1] for ox, _ in offsets for r in rows])
+        table.y = array("d", [oy + r[2] for _, oy in offsets for r in rows])
+        table.w = array("d", [r[3] for r in rows]) * len(offsets)
+        table.h = array("d", [r[4] for r in rows]) * len(offsets)
+        kinds = [table._share(r[5]) for r in rows]
+        table.kinds = kinds * len(offsets)
+        if all(len(r[6]) == 1 for r in rows):
+            table.labels = [table._share(r[6][0]) for r in rows] * len(offsets)
+        else:
+            table.labels = [table._share(i.join(r[6])) for i in idx for r in rows]
+        return table, StampedEdges(self.edges, idx, list(offsets))
+
+    def matches(self, idx: int, x: float, y: float) -> bool:
+        """True if stamping reproduces a real builder call at ``(idx, x, y)``."""
+        nodes, edges, span = self.block_fn(idx, x, y)
+        table, stamped = self.stamp([(x, y)], first_index=idx)
+        if len(nodes) != len(table) or len(edges) != len(stamped):
+            return False
+        close = lambda a, b: math.isclose(a, b, rel_tol=1e-9, abs_tol=1e-9)  # noqa: E731
+        if not close(span, self.span):
+            return False
+        for n, t in zip(nodes, table):
+            if (n.name, n.kind, getattr(n, "label", "")) != (t.name, t.kind, t.label):
+                return False
+            if not all(close(a, b) for a, b in ((n.x, t.x), (n.y, t.y), (n.w, t.w), (n.h, t.h))):
+                return False
+        for e, s in zip(edges, stamped):
+            if (e.src, e.dst, e.style) != (s.src, s.dst, s.style):
+                return False
+            if (e.via is None) != (s.via is None):
+                return False
+            if e.via is not None and not all(close(a, b) for a, b in zip(e.via, s.via)):
+                return False
+            if (e.path is None) != (s.path is None):
+                return False
+            if e.path is not None and (len(e.path) != len(s.path) or not all(
+                    close(a, b) for p, q in zip(e.path, s.path) for a, b in zip(p, q))):
+                return False
+        return True
+
+    def translates(self, offsets: Sequence[Tuple[float, float]]) -> bool:
+        """``matches`` at the first, second and last of ``offsets`` (the indices
+        builders most often special-case)."""
+        return all(self.matches(i, *offsets[i]) for i in sorted({0, 1, len(offsets) - 1}) if 0 <= i < len(offsets))
+
+
+def replicate(n: int, block_fn: Callable[[int, float, float], Tuple[List[Any], List[Edge], float]], start=(0.0, 0.0), gap: float = 1.0, dir: str = "x") -> Tuple[NodeTable, Sequence[Edge]]:
+    """Batched equivalent of ``layout.repeat``.
+
+    Same arguments and node/edge order as ``repeat``; returns a ``NodeTable``
+    and a lazy edge sequence (both concatenate with ``+`` into plain lists).
+    Coordinates agree with ``repeat`` up to float rounding, i.e. the exported
+    TikZ is identical.
+    """
+    assert dir in {"x", "y"}
+    if n <= 0:
+        return NodeTable(), []
+    tpl = BlockTemplate(block_fn)
+    offsets = tpl.offsets(n, start, gap, dir)
+    if not tpl.translates(offsets):
+        nodes, edges = repeat(n, block_fn, start=start, gap=gap, dir=dir)
+        return NodeTable(nodes), edges
+    return tpl.stamp(offsets)
+
+
+class Instances:
+    """``n`` placements of one block template, for instanced export.
+
+    ``export_tex(..., instances=[stack])`` defines the template once as a TikZ
+    ``pic`` whose node names carry the block index as the pic argument ``#1``
+    and emits one ``\\pic`` placement line per block. Inner nodes keep their usual
+    global names (``ln3_1``), so external edges, stack tags and group boxes can
+    address them; ``nodes`` / ``edges`` give the expanded geometry for that.
+
+    Attributes:
+      template: the captured ``BlockTemplate``.
+      offsets: block origins.
+      first_index: index of the first block.
+      pic: TikZ pic name (content hash of the template unless given).
+    """
+
+    def __init__(self, template: BlockTemplate, offsets: Sequence[Tuple[float, float]], first_index: int = 0,
+                 pic: Optional[str] = None):
+        self.template = template
+        self.offsets = list(offsets)
+        self.first_index = first_index
+        self.pic_nodes = [Node(_pic_text(r[0]), r[1], r[2], r[3], r[4], r[5], _pic_text(r[6]))
+                          for r in template.nodes]
+        # pic coordinates are relative to the placement, like the template's
+        self.pic_edges = [Edge(_pic_text(s), _pic_text(d), style, via, path) for s, d, style, via, path in template.edges]
+        if pic is None:
+            digest = hashlib.sha1(repr((self.pic_nodes, self.pic_edges)).encode("utf-8")).hexdigest()
+            pic = f"block-{digest[:10]}"
+        self.pic = pic
+        self._stamped: Optional[Tuple[NodeTable, StampedEdges]] = None
+
+    def _stamp(self) -> Tuple[NodeTable, StampedEdges]:
+        if self._stamped is None:
+            self._stamped = self.template.stamp(self.offsets, self.first_index)
+        return self._stamped
+
+    @property
+    def nodes(self) -> NodeTable:
+        """Every inner node at its placed position (stamped on first access)."""
+        return self._stamp()[0]
+
+    @property
+    def edges(self) -> StampedEdges:
+        return self._stamp()[1]
+
+    @property
+    def placements(self) -> List[Tuple[float, float, int]]:
+        """``(x, y, index)`` per block."""
+        return [(x, y, self.first_index + i) for i, (x, y) in enumerate(self.offsets)]
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+
+def _pic_text(parts: List[str]) -> str:
+    """Join template ``parts`` around the pic argument, escaping literal ``#``."""
+    return "#1".join(p.replace("#", "##") for p in parts)
+
+
+def instance(n: int, block_fn: Callable[[int, float, float], Tuple[List[Any], List[Edge], float]], start=(0.0, 0.0), gap: float = 1.0, dir: str = "x", pic: Optional[str] = None) -> Instances:
+    """Instanced equivalent of ``replicate`` (same arguments, block order and names).
+
+    Raises ValueError for builders that are not pure translations of one
+    template; use ``repeat`` / ``replicate`` for those.
+    """
+    assert dir in {"x", "y"}
+    tpl = BlockTemplate(block_fn)
+    offsets = tpl.offsets(max(n, 0), start, gap, dir)
+    if not tpl.translates(offsets):
+        raise ValueError("block builder is not a pure translation of one template; use repeat/replicate")
+    return Instances(tpl, offsets, pic=pic)
+
+
+__all__ = ["BlockTemplate", "StampedEdges", "Instances", "instance", "replicate"]
@@ -0,0 +1,94 @@
+"""Resolve edge anchors to absolute coordinates before emission.
+
+``connect`` / ``elbow`` edges reference anchors such as ``(ln1.west)`` and elbows
+use ``-- ++(dx,dy) |-`` path arithmetic, all of which TeX evaluates at compile
+time. Node geometry is already known in Python, so ``resolve_edges`` rewrites
+every endpoint it can to ``(x cm,y cm)`` and turns elbows into explicit
+waypoints; ``export_tex(..., numeric=True)`` applies it.
+
+An endpoint stays symbolic when its geometry is not known exactly: the
+expression is not a plain ``(name.anchor)``, the node is not in ``nodes``, or its
+label is estimated to overflow the declared size (TikZ would grow the node).
+``addnode`` circles always grow around their "+" glyph, so they are resolved at
+their rendered diameter instead.
+"""
+from __future__ import annotations
+from dataclasses import replace
+from typing import Dict, Iterable, List, Optional
+
+from .geometry import ANCHOR_DIRS, Point, parse_anchor
+from .layout import Edge
+from .nodetable import NodeTable
+from .spatial import ADD_DIAMETER, label_extent
+
+# TikZ ``outer sep`` defaults to half the line width: anchors sit outside the stroke.
+_PT = 2.54 / 72.27
+OUTER_SEP = 0.4 * _PT  # ``thick`` (0.8pt) node styles
+THIN_KINDS = {"tagnode"}  # ``thin`` (0.4pt)
+
+
+def _outer_sep(kind: str) -> float:
+    return OUTER_SEP / 2 if kind in THIN_KINDS else OUTER_SEP
+
+
+def _known(kind: str, label: str, w: float, h: float) -> bool:
+    lw, lh = label_extent(label, kind)
+    return lw <= w + 1e-6 and lh <= h + 1e-6
+
+
+def anchor_table(nodes: Iterable, exact: bool = True) -> Dict[str, tuple]:
+    """``name -> (x, y, half_w, half_h)`` for every node whose geometry is exact.
+
+    With ``exact=False`` every node is included at its declared size (previews).
+    """
+    if isinstance(nodes, NodeTable):
+        rows = zip(nodes.names, nodes.x, nodes.y, nodes.w, nodes.h, nodes.kinds, nodes.labels)
+    else:
+        rows = ((n.name, n.x, n.y, n.w, n.h, n.kind, getattr(n, "label", "")) for n in nodes)
+    table = {}
+    for name, x, y, w, h, kind, label in rows:
+        if kind.startswith("addnode"):  # known, at the size TikZ draws it
+            w = h = max(w, ADD_DIAMETER)
+        if not exact or _known(kind, label, w, h):
+            sep = _outer_sep(kind)
+            table[name] = (x, y, w / 2.0 + sep, h / 2.0 + sep)
+    return table
+
+
+def resolve_point(expr: str, table: Dict[str, tuple]) -> Optional[Point]:
+    """Absolute position of an ``(name.anchor)`` expression, or None if unknown."""
+    parsed = parse_anchor(expr)
+    if parsed is None or parsed[0] not in table:
+        return None
+    x, y, hw, hh = table[parsed[0]]
+    dx, dy = ANCHOR_DIRS[parsed[1]]
+    return x + dx * hw, y + dy * hh
+
+
+def _coord(p: Point) -> str:
+    return f"({p[0]:.2f}cm,{p[1]:.2f}cm)"
+
+
+def resolve_edges(edges: Iterable[Edge], nodes: Iterable) -> List[Edge]:
+    """Return ``edges`` with known anchors replaced by absolute coordinates.
+
+    Elbows (``via``) whose both ends resolve become explicit ``path`` waypoints
+    ``src + via`` and the ``|-`` corner; otherwise only the resolved end is
+    replaced and TikZ still does the arithmetic.
+    """
+    table = nodes if isinstance(nodes, dict) else anchor_table(nodes)
+    out = []
+    for e in edges:
+        p0 = resolve_point(e.src, table)
+        p1 = resolve_point(e.dst, table)
+        src = _coord(p0) if p0 else e.src
+        dst = _coord(p1) if p1 else e.dst
+        if e.via is not None and e.path is None and p0 and p1:
+            q = (p0[0] + e.via[0], p0[1] + e.via[1])
+            out.append(replace(e, src=src, dst=dst, via=None, path=(q, (q[0], p1[1]))))
+        else:
+            out.append(replace(e, src=src, dst=dst))
+    return out
+
+
+__all__ = ["anchor_table", "resolve_point", "resolve_edges"]
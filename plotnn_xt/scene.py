@@ -0,0 +1,312 @@
+"""Backend-neutral drawing list for previews without LaTeX.
+
+``build_scene`` turns the ``Node`` / ``Edge`` / ``Box`` model into flat shapes
+(rectangles, circles, polygons, polylines, text) in centimetres with y up,
+approximating ``transformer_tex/transformer_styles.tex``: style sizes, rounded
+corners, line widths, the 3D pseudo-extrusion and ``Latex`` arrow tips. The SVG
+(``plotnn_xt.svg``) and raster (``plotnn_xt.raster``) renderers only map these
+shapes to their output format.
+
+Theme colours mirror the TeX colour macros (``paper`` = the style defaults,
+``dark`` = ``theme_dark.tex``); ``xcolor`` tints such as ``gray!10`` are mixed
+against white.
+"""
+from __future__ import annotations
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from .geometry import ANCHOR_DIRS, THREE_D_SHIFT, THREE_D_UP, Point, is_3d, parse_anchor
+from .resolve import anchor_table
+from .spatial import ADD_DIAMETER, SMALL_KINDS
+
+PT = 2.54 / 72.27  # TeX point in cm
+THICK = 0.8 * PT
+THIN = 0.4 * PT
+FONT = {"normal": 10 * PT, "script": 7 * PT}  # font size (cm)
+LEADING = {"normal": 12 * PT, "script": 8 * PT}  # baselineskip (cm)
+ARROW_LEN = 0.2  # ``Latex[length=2mm]``
+ARROW_WIDTH = 0.75 * ARROW_LEN
+BORDER = 2 * PT  # ``standalone`` border
+
+
+def mix(color: str, pct: float, base: str = "#ffffff") -> str:
+    """xcolor ``color!pct``: ``pct`` % of ``color`` over ``base``."""
+    a = [int(color[i:i + 2], 16) for i in (1, 3, 5)]
+    b = [int(base[i:i + 2], 16) for i in (1, 3, 5)]
+    return "#" + "".join(f"{round(x * pct / 100 + y * (1 - pct / 100)):02x}" for x, y in zip(a, b))
+
+
+@dataclass(frozen=True)
+class Theme:
+    block: str
+    small_block: str
+    add: str
+    tag: str
+    stroke: str
+    edge: str  # ``conn`` uses the default draw colour
+    box: str
+    background: Optional[str] = None  # None: transparent
+
+
+THEMES: Dict[str, Theme] = {
+    "paper": Theme(block=mix("#000000", 10), small_block=mix("#000000", 5), add="#ffffff",
+                   tag=mix("#ffff00", 15), stroke="#000000", edge="#000000", box="#000000"),
+    # TeX keeps black edges / boxes on a white page; previews use a dark canvas.
+    "dark": Theme(block=mix("#000000", 70), small_block=mix("#000000", 60), add=mix("#000000", 20),
+                  tag=mix("#ff8000", 40), stroke="#ffffff", edge="#ffffff", box="#ffffff",
+                  background="#1e1e1e"),
+}
+
+
+# -- shapes (cm, y up) --------------------------------------------------------
+@dataclass
+class Rect:
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+    fill: Optional[str]
+    stroke: Optional[str]
+    width: float
+    radius: float = 0.0
+    dashed: bool = False
+
+
+@dataclass
+class Circle:
+    cx: float
+    cy: float
+    r: float
+    fill: Optional[str]
+    stroke: Optional[str]
+    width: float
+
+
+@dataclass
+class Poly:
+    points: List[Point]
+    fill: Optional[str]
+    stroke: Optional[str]
+    width: float
+    closed: bool = True
+    dashed: bool = False
+
+
+@dataclass
+class Run:
+    text: str
+    shift: int = 0  # -1 subscript, +1 superscript
+
+
+@dataclass
+class TextLine:
+    runs: List[Run]
+    size: str  # FONT / LEADING key
+
+
+@dataclass
+class Text:
+    x: float
+    y: float  # centre of the text block
+    lines: List[TextLine]
+    color: str
+
+
+Shape = Union[Rect, Circle, Poly, Text]
+
+
+@dataclass
+class Scene:
+    x0: float
+    y0: float
+    x1: float
+    y1: float
+    shapes: List[Shape] = field(default_factory=list)
+    background: Optional[str] = None
+    skipped: List[Tuple[str, str]] = field(default_factory=list)  # edges with unresolvable ends
+
+    @property
+    def width(self) -> float:
+        return self.x1 - self.x0
+
+    @property
+    def height(self) -> float:
+        return self.y1 - self.y0
+
+
+# -- labels -------------------------------------------------------------------
+_SYMBOLS = {"times": "×", "cdot": "·", "to": "→", "rightarrow": "→", "alpha": "α", "beta": "β",
+            "mu": "μ", "sigma": "σ", "ldots": "…", "dots": "…"}
+_TOKEN = re.compile(r"\\([a-zA-Z]+)\*?\s?|([_^])(\{[^{}]*\}|.)|([{}$])|([^\\_^{}$]+)")
+
+
+def label_lines(label: str, kind: str) -> List[TextLine]:
+    """Split a TeX node label into lines of plain-text runs.
+
+    Handles ``\\\\`` line breaks, ``\\scriptsize`` / ``\\footnotesize`` (which stay
+    in effect for later lines, as in TeX), math-mode sub/superscripts and a few
+    symbols; other macros, braces and ``$`` are dropped.
+    """
+    size = "script" if kind in SMALL_KINDS else "normal"
+    out: List[TextLine] = []
+    for raw in label.split("\\\\"):
+        runs: List[Run] = []
+        for cmd, op, arg, skip, text in _TOKEN.findall(raw):
+            if cmd:
+                if cmd in ("scriptsize", "footnotesize", "tiny", "small"):
+                    size = "script"
+                elif cmd in _SYMBOLS:
+                    runs.append(Run(_SYMBOLS[cmd]))
+            elif op:
+                runs.append(Run(arg.strip("{}"), -1 if op == "_" else 1))
+            elif text:
+                runs.append(Run(text))
+        merged: List[Run] = []
+        for r in runs:
+            if merged and merged[-1].shift == r.shift:
+                merged[-1] = Run(merged[-1].text + r.text, r.shift)
+            else:
+                merged.append(r)
+        if merged and merged[0].shift == 0:
+            merged[0] = Run(merged[0].text.lstrip(), 0)
+        if merged and merged[-1].shift == 0:
+            merged[-1] = Run(merged[-1].text.rstrip(), 0)
+        out.append(TextLine([r for r in merged if r.text], size))
+    return out
+
+
+def text_height(lines: Sequence[TextLine]) -> float:
+    return sum(LEADING[ln.size] for ln in lines)
+
+
+# -- geometry ------------------------------------------------------------------
+_COORD = re.compile(r"^\(\s*(-?[\d.]+)\s*(?:cm)?\s*,\s*(-?[\d.]+)\s*(?:cm)?\s*\)$")
+
+
+def _point(expr: str, table: Dict[str, tuple]) -> Optional[Point]:
+    parsed = parse_anchor(expr)
+    if parsed is not None:
+        geo = table.get(parsed[0])
+        if geo is None:
+            return None
+        x, y, hw, hh = geo
+        dx, dy = ANCHOR_DIRS[parsed[1]]
+        return x + dx * hw, y + dy * hh
+    m = _COORD.match(expr)  # absolute coordinates (``export_tex(numeric=True)`` style)
+    return (float(m.group(1)), float(m.group(2))) if m else None
+
+
+def edge_points(edge, table: Dict[str, tuple]) -> Optional[List[Point]]:
+    """Polyline of an edge (``via`` elbows and routed ``path`` expanded), or None."""
+    p0 = _point(edge.src, table)
+    p1 = _point(edge.dst, table)
+    if p0 is None or p1 is None:
+        return None
+    if edge.path:
+        return [p0, *edge.path, p1]
+    if edge.via is not None:
+        q = (p0[0] + edge.via[0], p0[1] + edge.via[1])
+        return [p0, q, (q[0], p1[1]), p1]
+    return [p0, p1]
+
+
+def _arrow(points: List[Point]) -> Tuple[List[Point], Optional[List[Point]]]:
+    """Shorten the last segment by the tip and return ``(line, tip triangle)``."""
+    (ax, ay), (bx, by) = points[-2], points[-1]
+    seg = math.hypot(bx - ax, by - ay)
+    if seg < 1e-9:
+        return points, None
+    ux, uy = (bx - ax) / seg, (by - ay) / seg
+    back = min(ARROW_LEN, seg)
+    base = (bx - ux * back, by - uy * back)
+    hw = ARROW_WIDTH / 2
+    tip = [(bx, by), (base[0] - uy * hw, base[1] + ux * hw), (base[0] + uy * hw, base[1] - ux * hw)]
+    return points[:-1] + [base], tip
+
+
+def _node_shapes(n, theme: Theme, labels: bool) -> Iterable[Shape]:
+    kind = n.kind
+    base = kind[:-2] if is_3d(kind) else kind
+    hw, hh = n.w / 2.0, n.h / 2.0
+    x0, y0, x1, y1 = n.x - hw, n.y - hh, n.x + hw, n.y + hh
+    if base == "addnode":
+        hw = hh = max(n.w, ADD_DIAMETER) / 2.0  # grown around the "+" glyph, as in TikZ
+        yield Circle(n.x, n.y, hw, theme.add, theme.stroke, THICK)
+        if is_3d(kind):  # highlight arc from the north-west, 150° to -30°
+            r = 0.35 * n.w
+            sx, sy = n.x + hw * math.cos(math.radians(135)) + PT, n.y + hh * math.sin(math.radians(135)) + PT
+            cx, cy = sx - r * math.cos(math.radians(150)), sy - r * math.sin(math.radians(150))
+            arc = [(cx + r * math.cos(math.radians(a)), cy + r * math.sin(math.radians(a))) for a in range(150, -31, -15)]
+            yield Poly(arc, None, mix(theme.stroke, 60), 0.4 * PT, closed=False)
+    else:
+        fill = {"sblk": theme.small_block, "tagnode": theme.tag}.get(base, theme.block)
+        yield Rect(x0, y0, x1, y1, fill, theme.stroke, THIN if base == "tagnode" else THICK, 2 * PT)
+        if is_3d(kind):
+            dx, dy = THREE_D_SHIFT, THREE_D_UP
+            yield Poly([(x1 + dx, y1 + dy), (x0 + dx, y1 + dy), (x0, y1), (x1, y1)], mix(fill, 70), theme.stroke, 0.4 * PT)
+            yield Poly([(x1, y1), (x1 + dx, y1 + dy), (x1 + dx, y0 + dy), (x1, y0)], mix(fill, 50), theme.stroke, 0.4 * PT)
+    if labels and getattr(n, "label", ""):
+        yield Text(n.x, n.y, label_lines(n.label, base), theme.stroke)
+
+
+def build_scene(nodes: Sequence, edges: Iterable = (), boxes: Optional[Iterable] = None,
+                theme: str | Theme = "paper", labels: bool = True) -> Scene:
+    """Flatten a diagram into drawable shapes.
+
+    Args:
+      nodes: primitive Node objects (or a ``NodeTable``).
+      edges: Edge objects; ends that cannot be located are listed in ``Scene.skipped``.
+      boxes: optional group / lane ``Box`` objects.
+      theme: ``"paper"``, ``"dark"`` or a ``Theme``.
+      labels: draw node / box labels.
+    """
+    th = THEMES[theme] if isinstance(theme, str) else theme
+    shapes: List[Shape] = []
+    box_shapes: List[Shape] = []
+    for b in boxes or ():
+        x0, y0, x1, y1 = b.frame()
+        lane = b.kind == "lane"
+        box_shapes.append(Rect(x0, y0, x1, y1, None, th.box, THICK, (3 if lane else 4) * PT, dashed=lane))
+        if labels and b.title:
+            lines = label_lines(b.title, "gbox")
+            box_shapes.append(Text((x0 + x1) / 2, y1 + text_height(lines) / 2 + 0.118, lines, th.box))
+    for n in nodes:
+        shapes.extend(_node_shapes(n, th, labels))
+
+    table = anchor_table(nodes, exact=False)
+    skipped = []
+    for e in edges:
+        pts = edge_points(e, table)
+        if pts is None:
+            skipped.append((e.src, e.dst))
+            continue
+        line, tip = _arrow(pts)
+        shapes.append(Poly(line, None, th.edge, THICK, closed=False, dashed=e.style == "dashconn"))
+        if tip:
+            shapes.append(Poly(tip, th.edge, th.edge, THICK / 2))
+
+    shapes = box_shapes + shapes
+    xs: List[float] = []
+    ys: List[float] = []
+    for s in shapes:
+        if isinstance(s, Rect):
+            xs += [s.x0, s.x1]
+            ys += [s.y0, s.y1]
+        elif isinstance(s, Circle):
+            xs += [s.cx - s.r, s.cx + s.r]
+            ys += [s.cy - s.r, s.cy + s.r]
+        elif isinstance(s, Poly):
+            xs += [p[0] for p in s.points]
+            ys += [p[1] for p in s.points]
+        elif isinstance(s, Text):
+            h = text_height(s.lines) / 2
+            ys += [s.y - h, s.y + h]
+    if not xs:
+        xs, ys = [0.0], [0.0]
+    return Scene(min(xs) - BORDER, min(ys) - BORDER, max(xs) + BORDER, max(ys) + BORDER, shapes, th.background, skipped)
+
+
+__all__ = ["Scene", "Theme", "THEMES", "Rect", "Circle", "Poly", "Text", "TextLine", "Run",
+           "build_scene", "label_lines", "edge_points", "mix"]
@@ -0,0 +1,422 @@
+"""Versioned on-disk format for built diagrams (nodes, edges, boxes).
+
+Persisting a diagram lets huge generated architectures be cached, shared
+between processes and re-exported without re-running the builder script::
+
+    dump("enc.pnx", nodes, edges, boxes=[g])
+    d = load("enc.pnx")                  # memory-mapped, nothing decoded yet
+    export_tex(d.nodes, d.edges, "enc.tex", boxes=d.boxes)
+
+Binary layout (little-endian; every section starts 8-byte aligned)::
+
+    header   magic, version, counts, string blob size          (48 bytes)
+    nodes    x, y, w, h: f64; name, kind, label: u32 string id  (48 bytes each)
+    edges    via dx, dy: f64; src, dst, style, flags,
+             first path point, path length: u32                 (40 bytes each)
+    boxes    rect x0, y0, x1, y1: f64; name, kind, title,
+             flags, first member, member count: u32             (56 bytes each)
+    points   x, y: f64 (edge waypoints)
+    strings  u32 offsets into the blob (count + 1 entries)
+    members  u32 node index per box member
+    blob     UTF-8 text of every distinct string, concatenated
+
+Names, kinds, labels and styles are interned, so a stack of repeated blocks
+stores each kind/label once. ``load`` maps the file and exposes the records
+through ``memoryview`` casts: ``d.nodes`` is a lazy sequence of
+``nodetable.NodeRef`` rows, ``d.edges`` builds ``Edge`` objects on access and
+the string table is decoded in one pass on first use. The mapping is read-only, so concurrent
+readers share the page cache.
+
+``dump_json`` / ``load_json`` write the same model as indented JSON for
+debugging and diffs.
+"""
+from __future__ import annotations
+import json
+import mmap
+import struct
+import sys
+from array import array
+from dataclasses import dataclass, field
+from functools import cached_property
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence
+
+from .layout import Box, Edge
+from .nodetable import NodeRef
+from .primitives import Node
+
+MAGIC = b"PLOTNNIR"
+VERSION = 1
+NONE = 0xFFFFFFFF  # string id / path start meaning ``None``
+
+_HEAD = struct.Struct("<8sHH6IQ4x")  # magic, version, reserved, counts (strings, nodes, edges, boxes, points, members), blob size
+_NODE = struct.Struct("<4d3I4x")
+_EDGE = struct.Struct("<2d6I")
+_BOX = struct.Struct("<4d6I")
+_POINT = struct.Struct("<2d")
+
+_VIA, _PATH = 1, 2  # edge flags
+_FIT, _RECT = 1, 2  # box flags
+
+
+def _align(n: int) -> int:
+    return (n + 7) & ~7
+
+
+@dataclass
+class Diagram:
+    """A loaded diagram; pass the fields straight to ``export_tex`` & co."""
+    nodes: Sequence
+    edges: Sequence
+    boxes: List[Box] = field(default_factory=list)
+
+
+# -- writing ----------------------------------------------------------------
+
+def _le(a: array) -> array:
+    """``a`` in little-endian byte order (in place)."""
+    if sys.byteorder != "little":
+        a.byteswap()
+    return a
+
+
+def _fill(buf: bytearray, size: int, fmt: str, pos: int, columns: Sequence) -> None:
+    """Write ``columns`` into consecutive ``fmt`` fields of ``size``-byte records, starting at field ``pos``."""
+    view = memoryview(buf).cast(fmt)
+    step = size // view.itemsize
+    for k, col in enumerate(columns):
+        view[pos + k::step] = _le(array(fmt, col))
+
+
+def dumps(nodes: Iterable, edges: Iterable = (), boxes: Optional[Iterable[Box]] = None) -> bytes:
+    """Serialize a diagram to bytes (see the module docstring for the layout).
+
+    Box members are stored as indices into ``nodes`` and must be exported nodes.
+    Records are written column-wise (strided ``memoryview`` assignment), taking
+    the columns of a ``NodeTable`` as they are.
+    """
+    ids: Dict[str, int] = {}
+    intern = ids.setdefault
+
+    if not hasattr(nodes, "kinds"):  # NodeTable / MappedNodes already are columns
+        nodes = list(nodes)
+        cols = [[getattr(n, a) for n in nodes] for a in ("name", "x", "y", "w", "h", "kind")]
+        cols.append([getattr(n, "label", "") for n in nodes])
+        names, xs, ys, ws, hs, kinds, labels = cols
+    else:
+        names, xs, ys, ws, hs, kinds, labels = (nodes.names, nodes.x, nodes.y, nodes.w, nodes.h,
+                                                nodes.kinds, nodes.labels)
+    n_nodes = len(names)
+    node_buf = bytearray(_NODE.size * n_nodes)
+    _fill(node_buf, _NODE.size, "d", 0, (xs, ys, ws, hs))
+    _fill(node_buf, _NODE.size, "I", 8, [[intern(v, len(ids)) for v in col] for col in (names, kinds, labels)])
+
+    edges = list(edges)
+    points = array("d")
+    vias, flags, starts, lengths = [], [], [], []
+    for e in edges:
+        f, start, length = 0, NONE, 0
+        if e.via is not None:
+            f |= _VIA
+        if e.path is not None:
+            f |= _PATH
+            start, length = len(points) // 2, len(e.path)
+            for p in e.path:
+                points.extend(p)
+        vias.append(e.via if e.via is not None else (0.0, 0.0))
+        flags.append(f)
+        starts.append(start)
+        lengths.append(length)
+    edge_buf = bytearray(_EDGE.size * len(edges))
+    _fill(edge_buf, _EDGE.size, "d", 0, ([v[0] for v in vias], [v[1] for v in vias]))
+    _fill(edge_buf, _EDGE.size, "I", 4, [[intern(getattr(e, a), len(ids)) for e in edges] for a in ("src", "dst", "style")]
+          + [flags, starts, lengths])
+
+    index = {name: i for i, name in enumerate(names)}
+    members = array("I")
+    boxes = list(boxes or ())
+    box_buf = bytearray(_BOX.size * len(boxes))
+    for i, b in enumerate(boxes):
+        start = len(members)
+        for n in b.nodes:
+            j = index.get(n.name)
+            if j is None:
+                raise ValueError(f"box {b.name!r}: member {n.name!r} is not among the diagram's nodes")
+            members.append(j)
+        f = (_FIT if b.fit else 0) | (_RECT if b.rect is not None else 0)
+        rect = b.rect if b.rect is not None else (0.0, 0.0, 0.0, 0.0)
+        title = NONE if b.title is None else intern(b.title, len(ids))
+        _BOX.pack_into(box_buf, i * _BOX.size, *rect, intern(b.name, len(ids)), intern(b.kind, len(ids)), title,
+                       f, start, len(members) - start)
+
+    encoded = [v.encode("utf-8") for v in ids]
+    offsets = array("I", [0])
+    total = 0
+    for v in encoded:
+        total += len(v)
+        offsets.append(total)
+    blob = b"".join(encoded)
+    out = bytearray(_HEAD.pack(MAGIC, VERSION, 0, len(encoded), n_nodes, len(edges), len(boxes),
+                               len(points) // 2, len(members), len(blob)))
+    for section in (node_buf, edge_buf, box_buf, _le(points).tobytes(), _le(offsets).tobytes(), _le(members).tobytes()):
+        out += section
+        out += bytes(_align(len(out)) - len(out))
+    out += blob
+    return bytes(out)
+
+
+def dump(path: str | Path, nodes: Iterable, edges: Iterable = (), boxes: Optional[Iterable[Box]] = None) -> Path:
+    """Write a diagram to ``path`` in the binary format."""
+    out = Path(path)
+    out.write_bytes(dumps(nodes, edges, boxes))
+    return out
+
+
+# -- reading ----------------------------------------------------------------
+
+def _column(buf: memoryview, fmt: str):
+    """``buf`` as a flat ``fmt`` array: a zero-copy cast on little-endian hosts."""
+    if sys.byteorder == "little":
+        return buf.cast(fmt)
+    a = array(fmt, buf.tobytes())
+    a.byteswap()
+    return a
+
+
+class _Strings:
+    """Interned string table; decoded in one pass on first use."""
+
+    def __init__(self, offsets, blob: memoryview):
+        self._off = offsets
+        self._blob = blob
+
+    @cached_property
+    def table(self) -> List[str]:
+        off = self._off.tolist()
+        raw = self._blob.tobytes()
+        text = raw.decode("utf-8")
+        if len(text) == len(raw):  # ASCII: byte offsets are character offsets
+            return [text[a:b] for a, b in zip(off, off[1:])]
+        return [raw[a:b].decode("utf-8") for a, b in zip(off, off[1:])]
+
+    def get(self, i: int) -> Optional[str]:
+        """One string (``None`` for ``NONE``), without decoding the whole table."""
+        if i == NONE:
+            return None
+        table = self.__dict__.get("table")
+        if table is not None:
+            return table[i]
+        return str(self._blob[self._off[i]:self._off[i + 1]], "utf-8")
+
+
+class MappedNodes(Sequence):
+    """Node records of a loaded diagram as ``NodeRef`` rows.
+
+    Exposes the ``NodeTable`` column attributes: ``x, y, w, h`` are strided
+    views over the record section (rows read the mapped file directly);
+    ``names, kinds, labels`` are resolved to lists on first access.
+    """
+
+    def __init__(self, records: memoryview, strings: _Strings):
+        d = _column(records, "d")
+        self._ids = _column(records, "I")
+        self._s = strings
+        self.x, self.y, self.w, self.h = (d[k::_NODE.size // 8] for k in range(4))
+        self._index: Optional[Dict[str, int]] = None
+
+    def _strings(self, pos: int) -> List[str]:
+        table = self._s.table
+        return [table[k] for k in self._ids[pos::_NODE.size // 4]]
+
+    @cached_property
+    def names(self) -> List[str]:
+        return self._strings(8)
+
+    @cached_property
+    def kinds(self) -> List[str]:
+        return self._strings(9)
+
+    @cached_property
+    def labels(self) -> List[str]:
+        return self._strings(10)
+
+    def __len__(self) -> int:
+        return len(self.x)
+
+    def __getitem__(self, i):
+        n = len(self.x)
+        if isinstance(i, slice):
+            return [NodeRef(self, j) for j in range(*i.indices(n))]
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("node index out of range")
+        return NodeRef(self, i)
+
+    def __iter__(self) -> Iterator[NodeRef]:
+        for i in range(len(self.x)):
+            yield NodeRef(self, i)
+
+    def find(self, name: str) -> NodeRef:
+        """Look a row up by node name (index built lazily on first call)."""
+        if self._index is None:
+            self._index = {n: i for i, n in enumerate(self.names)}
+        return NodeRef(self, self._index[name])
+
+    def to_nodes(self) -> List[Node]:
+        return [r.to_node() for r in self]
+
+
+class MappedEdges(Sequence):
+    """Edge records of a loaded diagram; ``Edge`` objects are built on access."""
+
+    def __init__(self, records: memoryview, points, strings: _Strings):
+        self._buf = records
+        self._p = points
+        self._s = strings
+
+    def __len__(self) -> int:
+        return len(self._buf) // _EDGE.size
+
+    def _edge(self, rec) -> Edge:
+        dx, dy, src, dst, style, flags, start, length = rec
+        table = self._s.table
+        path = None
+        if flags & _PATH:
+            p = self._p
+            path = tuple((p[2 * j], p[2 * j + 1]) for j in range(start, start + length))
+        return Edge(table[src], table[dst], table[style], (dx, dy) if flags & _VIA else None, path)
+
+    def __getitem__(self, i):
+        n = len(self)
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(n))]
+        if i < 0:
+            i += n
+        if not 0 <= i < n:
+            raise IndexError("edge index out of range")
+        return self._edge(_EDGE.unpack_from(self._buf, i * _EDGE.size))
+
+    def __iter__(self) -> Iterator[Edge]:
+        return map(self._edge, _EDGE.iter_unpack(self._buf))
+
+
+class _Members(Sequence):
+    """Lazy ``Box.nodes``: member indices into the mapped node table."""
+
+    def __init__(self, nodes: MappedNodes, idx):
+        self._nodes = nodes
+        self._idx = idx
+
+    def __len__(self) -> int:
+        return len(self._idx)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [NodeRef(self._nodes, j) for j in self._idx[i]]
+        return NodeRef(self._nodes, self._idx[i])
+
+    def __iter__(self) -> Iterator[NodeRef]:
+        nodes = self._nodes
+        return (NodeRef(nodes, j) for j in self._idx)
+
+
+def loads(data) -> Diagram:
+    """Load a diagram from a bytes-like object (views into ``data``, no copies)."""
+    buf = memoryview(data)
+    if len(buf) < _HEAD.size:
+        raise ValueError("not a plotnn_xt diagram: file too short")
+    magic, version, _, n_str, n_nodes, n_edges, n_boxes, n_points, n_members, blob_size = _HEAD.unpack_from(buf)
+    if magic != MAGIC:
+        raise ValueError(f"not a plotnn_xt diagram: bad magic {magic!r}")
+    if version != VERSION:
+        raise ValueError(f"unsupported diagram format version {version} (this build reads {VERSION})")
+
+    sections = []
+    pos = _HEAD.size
+    for size in (_NODE.size * n_nodes, _EDGE.size * n_edges, _BOX.size * n_boxes, _POINT.size * n_points,
+                 4 * (n_str + 1), 4 * n_members):
+        sections.append(buf[pos:pos + size])
+        pos = _align(pos + size)
+    if pos + blob_size > len(buf):
+        raise ValueError("truncated plotnn_xt diagram")
+    node_buf, edge_buf, box_buf, point_buf, off_buf, member_buf = sections
+
+    strings = _Strings(_column(off_buf, "I"), buf[pos:pos + blob_size])
+    nodes = MappedNodes(node_buf, strings)
+    edges = MappedEdges(edge_buf, _column(point_buf, "d"), strings)
+    members = _column(member_buf, "I")
+    boxes = []
+    for i in range(n_boxes):
+        x0, y0, x1, y1, name, kind, title, flags, start, length = _BOX.unpack_from(box_buf, i * _BOX.size)
+        idx = members[start:start + length]
+        # a box over the whole table keeps column access (fast ``bboxes``)
+        whole = length == n_nodes and idx.tolist() == list(range(n_nodes))
+        boxes.append(Box(strings.get(name), nodes if whole else _Members(nodes, idx), strings.get(kind),
+                         strings.get(title), bool(flags & _FIT), (x0, y0, x1, y1) if flags & _RECT else None))
+    return Diagram(nodes, edges, boxes)
+
+
+def load(path: str | Path, use_mmap: bool = True) -> Diagram:
+    """Load a diagram written by ``dump``.
+
+    With ``use_mmap`` (default) the file is memory-mapped read-only and records
+    are decoded on access; the mapping lives as long as the returned views.
+    """
+    with open(path, "rb") as f:
+        if not use_mmap:
+            return loads(f.read())
+        if f.seek(0, 2) == 0:
+            raise ValueError("not a plotnn_xt diagram: file too short")
+        return loads(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+# -- JSON variant -------------------------------------------------------------
+
+def to_json(nodes: Iterable, edges: Iterable = (), boxes: Optional[Iterable[Box]] = None) -> dict:
+    """Plain-JSON form of a diagram (members by node name)."""
+    return {
+        "format": "plotnn_xt.diagram",
+        "version": VERSION,
+        "nodes": [{"name": n.name, "x": n.x, "y": n.y, "w": n.w, "h": n.h, "kind": n.kind,
+                   "label": getattr(n, "label", "")} for n in nodes],
+        "edges": [{"src": e.src, "dst": e.dst, "style": e.style, "via": e.via,
+                   "path": None if e.path is None else [list(p) for p in e.path]} for e in edges],
+        "boxes": [{"name": b.name, "nodes": [n.name for n in b.nodes], "kind": b.kind, "title": b.title,
+                   "fit": b.fit, "rect": b.rect} for b in (boxes or ())],
+    }
+
+
+def from_json(doc: dict) -> Diagram:
+    """Inverse of ``to_json`` (plain ``Node`` / ``Edge`` / ``Box`` objects)."""
+    if doc.get("format") != "plotnn_xt.diagram":
+        raise ValueError("not a plotnn_xt diagram document")
+    if doc.get("version") != VERSION:
+        raise ValueError(f"unsupported diagram format version {doc.get('version')} (this build reads {VERSION})")
+    nodes = [Node(**n) for n in doc["nodes"]]
+    by_name = {n.name: n for n in nodes}
+    edges = [Edge(e["src"], e["dst"], e["style"], None if e["via"] is None else tuple(e["via"]),
+                  None if e["path"] is None else tuple(tuple(p) for p in e["path"])) for e in doc["edges"]]
+    boxes = [Box(b["name"], [by_name[m] for m in b["nodes"]], b["kind"], b["title"], b["fit"],
+                 None if b["rect"] is None else tuple(b["rect"])) for b in doc["boxes"]]
+    return Diagram(nodes, edges, boxes)
+
+
+def dump_json(path: str | Path, nodes: Iterable, edges: Iterable = (), boxes: Optional[Iterable[Box]] = None) -> Path:
+    """Write ``to_json`` output with one node / edge / box per line (diff-friendly)."""
+    doc = to_json(nodes, edges, boxes)
+    parts = [f'{{"format": {json.dumps(doc["format"])}, "version": {doc["version"]}']
+    for key in ("nodes", "edges", "boxes"):
+        items = ",\n  ".join(json.dumps(item, ensure_ascii=False) for item in doc[key])
+        parts.append(f'"{key}": [\n  {items}\n]' if items else f'"{key}": []')
+    out = Path(path)
+    out.write_text(",\n".join(parts) + "}\n", encoding="utf-8")
+    return out
+
+
+def load_json(path: str | Path) -> Diagram:
+    return from_json(json.loads(Path(path).read_text(encoding="utf-8")))
+
+
+__all__ = ["Diagram", "MappedNodes", "MappedEdges", "dump", "dumps", "load", "loads",
+           "dump_json", "load_json", "to_json", "from_json", "MAGIC", "VERSION"]
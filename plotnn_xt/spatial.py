@@ -0,0 +1,192 @@
+"""Grid-backed spatial index and overlap checks for diagram layouts.
+
+Layouts use hard-coded offsets, and collisions used to surface only after a
+LaTeX compile and a visual check. ``check_overlaps`` finds them in Python:
+
+* node/node overlaps (bounding boxes from ``geometry.bbox``),
+* labels whose estimated text extent exceeds the node's declared size (TikZ
+  would silently grow the node),
+* non-member nodes intruding into a group / lane ``Box``.
+
+The uniform grid (cell size ~ median node extent) keeps the check close to
+linear for typical diagrams; 100k nodes take well under a second.
+"""
+from __future__ import annotations
+import math
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from statistics import median
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from .geometry import BBox, bboxes, intersects
+from .nodetable import NodeTable
+
+# Rough glyph metrics (cm) for Computer Modern at \normalsize / \scriptsize.
+CHAR_W = {"normal": 0.19, "script": 0.13}
+LINE_H = {"normal": 0.42, "script": 0.30}
+INNER_SEP = 0.118  # TikZ default inner sep (.3333em) in cm
+SMALL_KINDS = {"sblk", "sblk3d", "tagnode"}
+# ``addnode`` is a circle with inner sep=0pt and minimum size=#1: TikZ grows it to
+# the diagonal of the "+" glyph box (~7.8pt x 6.7pt) unless declared larger.
+ADD_DIAMETER = math.hypot(7.8, 6.7) * 2.54 / 72.27
+
+_CMD = re.compile(r"\\[a-zA-Z]+\*?")
+
+
+class GridIndex:
+    """Uniform-grid spatial hash over axis-aligned boxes."""
+
+    def __init__(self, cell: float):
+        if cell <= 0:
+            raise ValueError("cell size must be positive")
+        self.cell = cell
+        self.cells: Dict[Tuple[int, int], List[int]] = defaultdict(list)
+        self.boxes: List[BBox] = []
+
+    def _span(self, b: BBox) -> Tuple[range, range]:
+        c = self.cell
+        return (range(math.floor(b[0] / c), math.floor(b[2] / c) + 1),
+                range(math.floor(b[1] / c), math.floor(b[3] / c) + 1))
+
+    def insert(self, b: BBox) -> int:
+        i = len(self.boxes)
+        self.boxes.append(b)
+        c = self.cell
+        cells = self.cells
+        cx0, cx1 = math.floor(b[0] / c), math.floor(b[2] / c)
+        cy0, cy1 = math.floor(b[1] / c), math.floor(b[3] / c)
+        if cx0 == cx1 and cy0 == cy1:  # common case: box fits one cell
+            cells[(cx0, cy0)].append(i)
+            return i
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                cells[(cx, cy)].append(i)
+        return i
+
+    def query(self, b: BBox, tol: float = 0.0) -> List[int]:
+        """Indices of stored boxes intersecting ``b``."""
+        xs, ys = self._span(b)
+        seen = set()
+        out = []
+        for cx in xs:
+            for cy in ys:
+                for i in self.cells.get((cx, cy), ()):
+                    if i not in seen:
+                        seen.add(i)
+                        if intersects(b, self.boxes[i], tol):
+                            out.append(i)
+        return out
+
+    def pairs(self, tol: float = 0.0) -> Iterator[Tuple[int, int]]:
+        """Every intersecting pair ``(i, j)``, ``i < j``, reported exactly once.
+
+        A pair is emitted only from the cell holding the lower-left corner of
+        its intersection, so no global de-duplication set is needed.
+        """
+        c = self.cell
+        boxes = self.boxes
+        for (cx, cy), members in self.cells.items():
+            if len(members) < 2:
+                continue
+            for k, i in enumerate(members):
+                a = boxes[i]
+                for j in members[k + 1:]:
+                    b = boxes[j]
+                    ix0 = a[0] if a[0] > b[0] else b[0]
+                    iy0 = a[1] if a[1] > b[1] else b[1]
+                    if (a[2] if a[2] < b[2] else b[2]) - ix0 <= tol or (a[3] if a[3] < b[3] else b[3]) - iy0 <= tol:
+                        continue
+                    if math.floor(ix0 / c) == cx and math.floor(iy0 / c) == cy:
+                        yield (i, j) if i < j else (j, i)
+
+
+@lru_cache(maxsize=4096)
+def label_extent(label: str, kind: str) -> Tuple[float, float]:
+    """Estimated (width, height) in cm of a node label rendered by TikZ."""
+    if kind.startswith("addnode"):
+        return ADD_DIAMETER, ADD_DIAMETER  # circle around the "+" glyph
+    size = "script" if kind in SMALL_KINDS else "normal"
+    lines = label.split("\\\\")
+    width = 0.0
+    height = 0.0
+    for line in lines:
+        if "\\scriptsize" in line or "\\footnotesize" in line:
+            size = "script"
+        text = _CMD.sub("", line)
+        text = re.sub(r"[${}]", "", text).replace("_", "").replace("^", "").strip()
+        width = max(width, len(text) * CHAR_W[size])
+        height += LINE_H[size]
+    return width + 2 * INNER_SEP, height + 2 * INNER_SEP
+
+
+@dataclass
+class OverlapReport:
+    overlaps: List[Tuple[str, str]] = field(default_factory=list)
+    label_overflows: List[Tuple[str, float, float]] = field(default_factory=list)  # (node, est_w, est_h)
+    box_intrusions: List[Tuple[str, str]] = field(default_factory=list)  # (box, node)
+
+    @property
+    def ok(self) -> bool:
+        return not (self.overlaps or self.label_overflows or self.box_intrusions)
+
+    def summary(self) -> str:
+        lines = [f"overlap  {a} <-> {b}" for a, b in self.overlaps]
+        lines += [f"overflow {n}: label ~{w:.2f}x{h:.2f}cm" for n, w, h in self.label_overflows]
+        lines += [f"intrude  {n} inside box {b}" for b, n in self.box_intrusions]
+        lines.append(f"{len(self.overlaps)} overlap(s), {len(self.label_overflows)} label overflow(s), "
+                     f"{len(self.box_intrusions)} box intrusion(s)")
+        return "\n".join(lines)
+
+
+def check_overlaps(nodes: Sequence, boxes: Optional[Iterable] = None, tol: float = 1e-6,
+                   labels: bool = True, cell: Optional[float] = None) -> OverlapReport:
+    """Report colliding nodes, overflowing labels and box intrusions.
+
+    Args:
+      nodes: node-like objects (``name, x, y, w, h, kind, label``).
+      boxes: optional ``layout.Box`` groups; non-member nodes inside a box's
+        frame are reported.
+      tol: overlaps up to ``tol`` cm (e.g. exactly touching nodes) are ignored.
+      labels: also estimate label extents against the declared ``w``/``h``.
+      cell: grid cell size (default: median node extent).
+    """
+    report = OverlapReport()
+    if not isinstance(nodes, NodeTable):
+        nodes = list(nodes)
+    bbs = bboxes(nodes)
+    if not bbs:
+        return report
+    if isinstance(nodes, NodeTable):
+        names = nodes.names
+        rows = zip(nodes.names, nodes.kinds, nodes.labels, nodes.w, nodes.h)
+    else:
+        names = [n.name for n in nodes]
+        rows = ((n.name, n.kind, getattr(n, "label", ""), n.w, n.h) for n in nodes)
+    if cell is None:
+        cell = max(median(max(b[2] - b[0], b[3] - b[1]) for b in bbs), 1e-3)
+    grid = GridIndex(cell)
+    for b in bbs:
+        grid.insert(b)
+
+    report.overlaps = sorted((names[i], names[j]) for i, j in grid.pairs(tol))
+
+    if labels:
+        for name, kind, label, w, h in rows:
+            lw, lh = label_extent(label, kind)
+            if lw > w + tol or lh > h + tol:
+                report.label_overflows.append((name, lw, lh))
+
+    for box in boxes or ():
+        members = {m.name for m in box.nodes}
+        if not members:
+            continue
+        frame = box.frame()
+        for i in grid.query(frame, tol):
+            if names[i] not in members:
+                report.box_intrusions.append((box.name, names[i]))
+    return report
+
+
+__all__ = ["GridIndex", "OverlapReport", "check_overlaps", "label_extent", "ADD_DIAMETER"]
@@ -0,0 +1,85 @@
+"""Pure-Python SVG backend for fast previews.
+
+Renders the ``Node`` / ``Edge`` / ``Box`` model straight to SVG via
+``plotnn_xt.scene``: no TeX run, no ``pdf2svg``. The output approximates the
+``transformer_styles.tex`` look (fonts and label metrics differ); LaTeX stays
+the print path.
+
+    export_svg(nodes, edges, "examples/assets/fig_encoder_block.svg", theme="dark")
+"""
+from __future__ import annotations
+from pathlib import Path
+from typing import Iterable, List, Optional, Sequence
+from xml.sax.saxutils import escape
+
+from .scene import FONT, LEADING, Circle, Poly, Rect, Scene, Text, Theme, build_scene, text_height
+
+FONT_FAMILY = "Latin Modern Roman, CMU Serif, Computer Modern, serif"
+
+
+def _f(v: float) -> str:
+    return f"{v:.3f}".rstrip("0").rstrip(".") or "0"
+
+
+def _paint(fill: Optional[str], stroke: Optional[str], width: float, dashed: bool = False) -> str:
+    out = f'fill="{fill or "none"}"'
+    if stroke:
+        out += f' stroke="{stroke}" stroke-width="{_f(width)}"'
+        if dashed:
+            out += f' stroke-dasharray="{_f(width * 4)} {_f(width * 4)}"'
+    return out
+
+
+def render_svg(scene: Scene) -> str:
+    """SVG document for ``scene`` (user units are centimetres)."""
+    top = scene.y1
+
+    def pt(x: float, y: float) -> str:
+        return f"{_f(x)},{_f(top - y)}"
+
+    out: List[str] = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{_f(scene.width)}cm" height="{_f(scene.height)}cm" '
+        f'viewBox="{_f(scene.x0)} 0 {_f(scene.width)} {_f(scene.height)}" '
+        f'font-family="{FONT_FAMILY}" stroke-linejoin="round">',
+    ]
+    if scene.background:
+        out.append(f'<rect x="{_f(scene.x0)}" y="0" width="{_f(scene.width)}" height="{_f(scene.height)}" '
+                   f'fill="{scene.background}"/>')
+    for s in scene.shapes:
+        if isinstance(s, Rect):
+            r = f' rx="{_f(s.radius)}"' if s.radius else ""
+            out.append(f'<rect x="{_f(s.x0)}" y="{_f(top - s.y1)}" width="{_f(s.x1 - s.x0)}" '
+                       f'height="{_f(s.y1 - s.y0)}"{r} {_paint(s.fill, s.stroke, s.width, s.dashed)}/>')
+        elif isinstance(s, Circle):
+            out.append(f'<circle cx="{_f(s.cx)}" cy="{_f(top - s.cy)}" r="{_f(s.r)}" '
+                       f'{_paint(s.fill, s.stroke, s.width)}/>')
+        elif isinstance(s, Poly):
+            tag = "polygon" if s.closed else "polyline"
+            pts = " ".join(pt(x, y) for x, y in s.points)
+            out.append(f'<{tag} points="{pts}" {_paint(s.fill, s.stroke, s.width, s.dashed)}/>')
+        elif isinstance(s, Text):
+            y = top - s.y - text_height(s.lines) / 2
+            for line in s.lines:
+                y += LEADING[line.size]
+                size = FONT[line.size]
+                spans = "".join(
+                    f'<tspan font-size="{_f(size * 0.7)}" baseline-shift="{"sub" if r.shift < 0 else "super"}">'
+                    f"{escape(r.text)}</tspan>" if r.shift else escape(r.text)
+                    for r in line.runs)
+                # baseline sits ~0.3 em above the bottom of its line slot
+                out.append(f'<text x="{_f(s.x)}" y="{_f(y - 0.3 * size)}" font-size="{_f(size)}" '
+                           f'text-anchor="middle" fill="{s.color}">{spans}</text>')
+    out.append("</svg>")
+    return "\n".join(out) + "\n"
+
+
+def export_svg(nodes: Sequence, edges: Iterable, out_svg: str | Path, boxes: Optional[Iterable] = None,
+               theme: str | Theme = "paper", labels: bool = True) -> Path:
+    """Render a diagram straight to an SVG file (see ``scene.build_scene`` for args)."""
+    out = Path(out_svg)
+    out.write_text(render_svg(build_scene(nodes, edges, boxes, theme, labels)), encoding="utf-8")
+    return out
+
+
+__all__ = ["render_svg", "export_svg"]
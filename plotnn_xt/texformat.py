@@ -0,0 +1,126 @@
+"""Precompiled LaTeX formats for the shared figure preamble.
+
+Loading TikZ, its libraries and ``transformer_styles.tex`` dominates the compile
+time of a small figure. ``FormatCache`` dumps a document's preamble (everything
+before ``\\begin{document}``) once into a ``.fmt`` file via ``mylatexformat`` and
+returns a compiler command that loads it with ``-fmt``. Formats are keyed by the
+preamble text, the style inputs (``transformer_tex/*.tex``, ``layers/*.sty``) and
+the engine, so they are rebuilt only when one of those changes. Documents from
+``export_tex`` and from ``pycore.tikzeng.to_head`` each get their own format.
+
+Usage::
+
+    fmt = FormatCache(root)
+    BuildCache(root, compiler=fmt.compiler_for("examples/fig_encoder_block.tex")).build(...)
+
+or ``python -m plotnn_xt.cli build --fmt``.
+"""
+from __future__ import annotations
+import hashlib
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Optional, Sequence, Tuple
+
+from . import trace
+from .buildcache import DEFAULT_COMPILER, DEFAULT_DEPS, BuildError, _fill, _run, deps_digest
+
+BEGIN_DOCUMENT = "\\begin{document}"
+FORMAT_NAME = "plotnn_preamble"
+DEFAULT_DUMP = ("{engine}", "-ini", "-interaction=nonstopmode", "-jobname={name}", "-output-directory={outdir}",
+                "&{engine}", "mylatexformat.ltx", "{preamble}")
+DEFAULT_FMT_COMPILER = ("{engine}", "-fmt={fmt}", "-interaction=nonstopmode", "-halt-on-error",
+                        "-output-directory={outdir}", "{tex}")
+
+
+def read_preamble(tex: str | Path) -> Optional[str]:
+    """Text before ``\\begin{document}`` (None if the file has no document body)."""
+    head = []
+    with open(tex, encoding="utf-8") as f:
+        for line in f:
+            i = line.find(BEGIN_DOCUMENT)
+            if i >= 0:
+                head.append(line[:i])
+                return "".join(head)
+            head.append(line)
+    return None
+
+
+class FormatCache:
+    """Build and reuse ``.fmt`` files keyed by preamble + style content.
+
+    Args:
+      root: project root (dump and compile run here so relative ``\\input`` works).
+      cache_dir: where formats live (default ``<root>/.plotnn_cache/fmt``).
+      engine: TeX engine for both the dump and the figure compiles.
+      deps: glob patterns of style inputs folded into the key.
+      dump_cmd / compile_cmd: command templates (stand-ins for tests).
+    """
+
+    def __init__(self, root: str | Path = ".", cache_dir: str | Path | None = None, engine: str = "pdflatex",
+                 deps: Sequence[str] = DEFAULT_DEPS, dump_cmd: Sequence[str] = DEFAULT_DUMP,
+                 compile_cmd: Sequence[str] = DEFAULT_FMT_COMPILER):
+        self.root = Path(root).resolve()
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else self.root / ".plotnn_cache" / "fmt"
+        self.engine = engine
+        self.deps = tuple(deps)
+        self.dump_cmd = tuple(dump_cmd)
+        self.compile_cmd = tuple(compile_cmd)
+        self._deps_digest: Optional[bytes] = None
+
+    def key(self, preamble: str) -> str:
+        if self._deps_digest is None:
+            self._deps_digest = deps_digest(self.root, self.deps)
+        h = hashlib.sha256(self._deps_digest)
+        h.update(self.engine.encode() + b"\0")
+        h.update("\0".join(self.dump_cmd).encode() + b"\0")
+        h.update(preamble.encode())
+        return h.hexdigest()
+
+    def ensure(self, preamble: str) -> Path:
+        """Path of the ``.fmt`` for ``preamble``, dumping it on first use."""
+        slot = self.cache_dir / self.key(preamble)
+        fmt = slot / f"{FORMAT_NAME}.fmt"
+        if fmt.exists():
+            return fmt
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # Dump into a private directory and rename, so parallel builds never load
+        # a half-written format.
+        tmp = Path(tempfile.mkdtemp(dir=self.cache_dir, prefix=".dump-"))
+        try:
+            src = tmp / f"{FORMAT_NAME}.tex"
+            src.write_text(preamble + BEGIN_DOCUMENT + "\n\\end{document}\n", encoding="utf-8")
+            cmd = _fill(self.dump_cmd, engine=self.engine, name=FORMAT_NAME, outdir=str(tmp), preamble=str(src))
+            with trace.span("build.fmt_dump"):
+                _run(cmd, src, self.root)
+            if not (tmp / fmt.name).exists():
+                raise BuildError(src, cmd, f"format dump did not produce {fmt.name}")
+            try:
+                os.replace(tmp, slot)
+            except OSError:  # another process won the race; its format is equivalent
+                if not fmt.exists():
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+        return fmt
+
+    def compiler_for(self, tex: str | Path, fallback: Sequence[str] = DEFAULT_COMPILER) -> Tuple[str, ...]:
+        """Compiler command template for ``tex`` using its preamble's format.
+
+        The result still contains ``{tex}``/``{outdir}`` placeholders, so it can be
+        handed to ``BuildCache``. Documents without ``\\begin{document}`` get
+        ``fallback``.
+        """
+        tex = Path(tex)
+        if not tex.is_absolute():
+            tex = self.root / tex
+        preamble = read_preamble(tex)
+        if preamble is None:
+            return tuple(fallback)
+        fmt = self.ensure(preamble)
+        stem = str(fmt.with_suffix(""))
+        return tuple(c.replace("{engine}", self.engine).replace("{fmt}", stem) for c in self.compile_cmd)
+
+
+__all__ = ["FormatCache", "read_preamble", "DEFAULT_DUMP", "DEFAULT_FMT_COMPILER"]
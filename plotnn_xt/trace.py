@@ -0,0 +1,190 @@
+"""Opt-in timing spans for figure builds.
+
+Block builders, layout helpers, the exporter and the build path are wrapped in
+named spans. Tracing is off by default: a disabled ``span`` returns a shared
+no-op context and a ``traced`` function costs one global check, so normal runs
+pay (almost) nothing.
+
+Enable with ``trace.enable()`` or by setting ``PLOTNN_TRACE=<out.json>`` before
+the first import (the trace is then written at interpreter exit). Recorded
+spans nest, carry optional counts (``nodes=...``, ``edges=...``) and can be
+written as Chrome trace-event JSON (``chrome://tracing`` / Perfetto) or printed
+as a summary table::
+
+    from plotnn_xt import trace
+    trace.enable()
+    build_gpt_stack(n=12, out_tex="gpt.tex")
+    print(trace.summary())
+    trace.write_chrome("gpt_trace.json")
+
+Timestamps come from ``time.perf_counter_ns`` (system-wide monotonic clock on
+Linux), so events loaded from other processes line up on one timeline.
+"""
+from __future__ import annotations
+import atexit
+import functools
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+_ENABLED = False
+_events: List[Dict[str, Any]] = []
+_local = threading.local()
+
+
+def enable() -> None:
+    global _ENABLED
+    _ENABLED = True
+
+
+def disable() -> None:
+    global _ENABLED
+    _ENABLED = False
+
+
+def is_enabled() -> bool:
+    return _ENABLED
+
+
+def reset() -> None:
+    """Drop every recorded event."""
+    _events.clear()
+
+
+def events() -> List[Dict[str, Any]]:
+    """Recorded Chrome ``X`` (complete) events, in completion order."""
+    return list(_events)
+
+
+def count(items: Any) -> Optional[int]:
+    """``len(items)`` for sized collections, None for generators and other iterables."""
+    try:
+        return len(items)
+    except TypeError:
+        return None
+
+
+def pair_counts(result: Any) -> Dict[str, Any]:
+    """Span args for builders returning ``(nodes, edges, ...)``."""
+    return {"nodes": count(result[0]), "edges": count(result[1])}
+
+
+class _NoSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args) -> None:
+        pass
+
+
+_NOOP = _NoSpan()
+
+
+class _Span:
+    __slots__ = ("name", "args", "t0", "child")
+
+    def __init__(self, name: str, args: Dict[str, Any]):
+        self.name = name
+        self.args = args
+        self.child = 0
+
+    def set(self, **args) -> None:
+        """Attach (or update) span arguments, e.g. counts only known at the end."""
+        self.args.update(args)
+
+    def __enter__(self):
+        stack = getattr(_local, "stack", None)
+        if stack is None:
+            stack = _local.stack = []
+        stack.append(self)
+        self.t0 = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        dur = time.perf_counter_ns() - self.t0
+        stack = _local.stack
+        stack.pop()
+        if stack:
+            stack[-1].child += dur
+        args = {k: v for k, v in self.args.items() if v is not None}
+        args["self_us"] = (dur - self.child) / 1e3
+        _events.append({"name": self.name, "ph": "X", "ts": self.t0 / 1e3, "dur": dur / 1e3,
+                        "pid": os.getpid(), "tid": threading.get_ident(), "args": args})
+        return False
+
+
+def span(name: str, **args):
+    """Context manager timing the enclosed block as ``name`` (no-op when disabled)."""
+    if not _ENABLED:
+        return _NOOP
+    return _Span(name, args)
+
+
+def traced(name: Optional[str] = None, counts: Optional[Callable[[Any], Dict[str, Any]]] = None):
+    """Decorator: time every call as span ``name`` (default: ``module.qualname``).
+
+    ``counts`` maps the return value to span args, e.g.
+    ``lambda r: {"nodes": len(r[0]), "edges": len(r[1])}``.
+    """
+    def deco(fn):
+        label = name or f"{fn.__module__.rpartition('.')[2]}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            if not _ENABLED:
+                return fn(*a, **kw)
+            with _Span(label, {}) as s:
+                result = fn(*a, **kw)
+                if counts is not None:
+                    s.set(**counts(result))
+                return result
+        return wrapper
+    return deco
+
+
+def load(path: str | Path) -> None:
+    """Append the events of a Chrome trace file (e.g. written by another process)."""
+    _events.extend(json.loads(Path(path).read_text())["traceEvents"])
+
+
+def write_chrome(path: str | Path, evts: Optional[Iterable[Dict[str, Any]]] = None) -> Path:
+    """Write ``evts`` (default: everything recorded) as Chrome trace-event JSON."""
+    out = Path(path)
+    out.write_text(json.dumps({"traceEvents": list(_events if evts is None else evts),
+                               "displayTimeUnit": "ms"}))
+    return out
+
+
+def summary(evts: Optional[Iterable[Dict[str, Any]]] = None) -> str:
+    """Per-span-name table: calls, total / self time and summed node / edge counts."""
+    rows: Dict[str, List[float]] = {}
+    for e in (_events if evts is None else evts):
+        r = rows.setdefault(e["name"], [0, 0.0, 0.0, 0, 0])
+        args = e.get("args", {})
+        r[0] += 1
+        r[1] += e["dur"] / 1e3
+        r[2] += args.get("self_us", e["dur"]) / 1e3
+        r[3] += args.get("nodes") or 0
+        r[4] += args.get("edges") or 0
+    width = max([len("span")] + [len(n) for n in rows])
+    lines = [f"{'span':<{width}}  {'calls':>6}  {'total ms':>10}  {'self ms':>10}  {'nodes':>8}  {'edges':>8}"]
+    for n, (calls, total, own, nodes, edges) in sorted(rows.items(), key=lambda kv: -kv[1][1]):
+        lines.append(f"{n:<{width}}  {calls:>6}  {total:>10.2f}  {own:>10.2f}  {nodes or '':>8}  {edges or '':>8}")
+    return "\n".join(lines)
+
+
+if os.environ.get("PLOTNN_TRACE"):  # pragma: no cover - exercised through subprocesses
+    enable()
+    atexit.register(write_chrome, os.environ["PLOTNN_TRACE"])
+
+
+__all__ = ["enable", "disable", "is_enabled", "reset", "events", "count", "pair_counts", "span", "traced",
+           "load", "write_chrome", "summary"]
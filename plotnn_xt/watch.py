@@ -0,0 +1,307 @@
+"""Watch mode: rebuild figures in one long-lived interpreter.
+
+``tikzmake.sh`` pays interpreter startup, every import and a TeX run per edit.
+``Watcher`` instead polls ``examples/``, ``plotnn_xt/`` and ``transformer_tex/``
+(mtime + size, no extra dependencies) and on a change:
+
+* reloads the changed ``plotnn_xt`` modules and every module importing them
+  (dependencies first, from a static import graph),
+* re-runs (``runpy``, in-process) only the figure scripts that depend on a
+  reloaded module, or the edited script itself,
+* optionally recompiles through the content-hash ``BuildCache``; style edits
+  (``transformer_tex/``) recompile every figure without re-running scripts,
+
+and prints the rebuild latency.
+
+Usage:
+  python -m plotnn_xt.cli watch [PATHS...] [--interval 0.5] [--compile]
+"""
+from __future__ import annotations
+import ast
+import contextlib
+import importlib
+import io
+import os
+import runpy
+import sys
+import time
+import traceback
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .buildcache import DEFAULT_COMPILER, BuildCache, BuildError
+
+PACKAGE = "plotnn_xt"
+WATCHED = ("examples", PACKAGE, "transformer_tex")
+_STAMP = Tuple[int, int]  # (mtime_ns, size)
+
+
+@dataclass
+class Rebuild:
+    """Outcome of one change cycle."""
+    changed: List[Path] = field(default_factory=list)
+    reloaded: List[str] = field(default_factory=list)
+    built: List[Path] = field(default_factory=list)
+    failed: Dict[Path, str] = field(default_factory=dict)
+    seconds: float = 0.0
+
+    def summary(self, root: Path) -> str:
+        def rel(p: Path) -> str:
+            try:
+                return str(p.relative_to(root))
+            except ValueError:
+                return str(p)
+        lines = [f"FAIL {rel(p)}\n    " + err.strip().replace("\n", "\n    ") for p, err in self.failed.items()]
+        reloaded = f" (reloaded {', '.join(self.reloaded)})" if self.reloaded else ""
+        lines.append(f"rebuilt {len(self.built)} figure(s), {len(self.failed)} failed "
+                     f"in {self.seconds * 1e3:.1f} ms{reloaded}")
+        return "\n".join(lines)
+
+
+def module_name(path: Path, root: Path) -> Optional[str]:
+    """Dotted name of a package source file (``plotnn_xt/layout.py`` -> ``plotnn_xt.layout``)."""
+    try:
+        parts = list(path.relative_to(root).with_suffix("").parts)
+    except ValueError:
+        return None
+    if not parts or parts[0] != PACKAGE:
+        return None
+    if parts[-1] == "__init__":
+        parts.pop()
+    return ".".join(parts)
+
+
+def imports_of(path: Path, name: Optional[str] = None) -> Set[str]:
+    """``plotnn_xt`` modules imported anywhere in ``path`` (including function-level imports).
+
+    ``name`` is the file's own module name, needed to resolve relative imports.
+    """
+    tree = ast.parse(path.read_bytes(), str(path))
+    is_pkg = path.name == "__init__.py"
+    found: Set[str] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            found.update(a.name for a in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if node.level:
+                if name is None:
+                    continue
+                pkg = name.split(".")
+                if not is_pkg:
+                    pkg.pop()
+                pkg = pkg[:len(pkg) - (node.level - 1)]
+                base = ".".join(pkg + ([base] if base else []))
+            found.add(base)
+            found.update(f"{base}.{a.name}" for a in node.names)  # ``from . import trace``
+    return {m for m in found if m == PACKAGE or m.startswith(PACKAGE + ".")}
+
+
+class Watcher:
+    """Poll sources and rebuild the affected figures in-process.
+
+    Args:
+      root: project root (scripts run with it as the working directory).
+      scripts: figure scripts to keep built.
+      compile: also compile each emitted ``.tex`` through ``BuildCache``.
+      compiler: compiler command template for ``BuildCache``.
+      watch: directories (relative to ``root``) to poll.
+      echo: sink for progress lines.
+    """
+
+    def __init__(self, root: str | Path, scripts: Sequence[Path], compile: bool = False,
+                 compiler: Sequence[str] = DEFAULT_COMPILER, watch: Sequence[str] = WATCHED,
+                 echo: Callable[[str], None] = print):
+        self.root = Path(root).resolve()
+        self.scripts = [Path(s).resolve() for s in scripts]
+        self.compile = compile
+        self.cache = BuildCache(self.root, compiler=compiler) if compile else None
+        self.watch = [self.root / w for w in watch]
+        self.echo = echo
+        self._stamps: Dict[Path, _STAMP] = {}
+        self._imports: Dict[Path, Tuple[_STAMP, Set[str]]] = {}
+
+    # -- change detection ------------------------------------------------
+    def _files(self) -> Iterable[Path]:
+        for d in self.watch:
+            if not d.is_dir():
+                continue
+            for p in d.rglob("*"):
+                if p.suffix in (".py", ".sty") or (p.suffix == ".tex" and p.parent.name == "transformer_tex"):
+                    yield p
+
+    def snapshot(self) -> Dict[Path, _STAMP]:
+        stamps = {}
+        for p in self._files():
+            try:
+                st = p.stat()
+            except OSError:  # removed between listing and stat
+                continue
+            stamps[p] = (st.st_mtime_ns, st.st_size)
+        return stamps
+
+    def poll(self) -> List[Path]:
+        """Files added, removed or modified since the previous poll."""
+        now = self.snapshot()
+        old = self._stamps
+        self._stamps = now
+        return sorted(p for p in now.keys() | old.keys() if now.get(p) != old.get(p))
+
+    # -- dependency graph ------------------------------------------------
+    def _deps(self, path: Path) -> Set[str]:
+        stamp = self._stamps.get(path)
+        hit = self._imports.get(path)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+        try:
+            deps = imports_of(path, module_name(path, self.root))
+        except (OSError, SyntaxError):
+            deps = set()
+        self._imports[path] = (stamp, deps)
+        return deps
+
+    def graph(self) -> Dict[str, Set[str]]:
+        """``module -> package modules it imports`` for every package source file."""
+        g: Dict[str, Set[str]] = {}
+        for p in (self.root / PACKAGE).rglob("*.py"):
+            name = module_name(p, self.root)
+            if name is not None:
+                g[name] = self._deps(p) - {name}
+        return g
+
+    def closure(self, mods: Iterable[str], g: Dict[str, Set[str]]) -> Set[str]:
+        """``mods`` plus everything they import, transitively."""
+        seen: Set[str] = set()
+        todo = list(mods)
+        while todo:
+            m = todo.pop()
+            if m not in seen:
+                seen.add(m)
+                todo.extend(g.get(m, ()))
+        return seen
+
+    def reload_order(self, changed: Set[str], g: Dict[str, Set[str]]) -> List[str]:
+        """Changed modules and their importers, each after the modules it imports."""
+        affected = {m for m in g if changed & self.closure([m], g)}
+        order: List[str] = []
+
+        def visit(m: str, stack: Set[str]) -> None:
+            if m in order or m in stack:
+                return
+            stack.add(m)
+            for d in sorted(g.get(m, ())):
+                if d in affected:
+                    visit(d, stack)
+            order.append(m)
+
+        for m in sorted(affected):
+            visit(m, set())
+        return order
+
+    # -- rebuild ---------------------------------------------------------
+    def _reload(self, names: List[str]) -> List[str]:
+        done = []
+        pkg = sys.modules.get(PACKAGE)
+        lazy = getattr(pkg, "_LAZY", {})
+        for name in names:
+            mod = sys.modules.get(name)
+            if mod is None:
+                continue  # never imported: the next run picks up the new source
+            importlib.reload(mod)
+            done.append(name)
+            # Drop names the package cached from the old module; they re-resolve lazily.
+            short = name.rpartition(".")[2]
+            for attr in [a for a, m in lazy.items() if m == short and a in vars(pkg)]:
+                delattr(pkg, attr)
+        return done
+
+    def run_script(self, script: Path) -> Optional[str]:
+        """Execute ``script`` as ``__main__`` in this interpreter; returns an error or None."""
+        cwd = os.getcwd()
+        argv = sys.argv
+        os.chdir(self.root)
+        sys.argv = [str(script)]
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                runpy.run_path(str(script), run_name="__main__")
+        except BaseException:  # noqa: BLE001 - a broken figure must not stop the watcher
+            return traceback.format_exc(limit=-3)
+        finally:
+            os.chdir(cwd)
+            sys.argv = argv
+        return None
+
+    def _compile(self, script: Path) -> Optional[str]:
+        tex = script.with_suffix(".tex")
+        if not tex.exists():
+            return f"script did not write {tex.name}"
+        try:
+            self.cache.build(tex)
+        except BuildError as e:
+            return e.output.strip() or str(e)
+        return None
+
+    def rebuild(self, changed: Sequence[Path]) -> Rebuild:
+        """Reload and rebuild everything affected by ``changed`` files."""
+        t0 = time.perf_counter()
+        res = Rebuild(changed=list(changed))
+        g = self.graph()
+        mods = {m for m in (module_name(p, self.root) for p in changed) if m}
+        styles = any(p.suffix in (".tex", ".sty") for p in changed)
+        reload = self.reload_order(mods, g) if mods else []
+        res.reloaded = self._reload(reload)
+
+        hit = set(reload)
+        targets = []
+        for s in self.scripts:
+            if not s.exists():
+                continue
+            uses = self.closure(self._deps(s) | {PACKAGE}, g)  # every script imports the package
+            if s in changed or uses & hit:
+                targets.append(s)
+        for s in targets:
+            err = self.run_script(s)
+            if err is None and self.compile:
+                err = self._compile(s)
+            if err is None:
+                res.built.append(s)
+            else:
+                res.failed[s] = err
+        if styles and self.compile:
+            for s in self.scripts:
+                if s not in targets and s.exists():
+                    err = self._compile(s)
+                    if err is None:
+                        res.built.append(s)
+                    else:
+                        res.failed[s] = err
+        res.seconds = time.perf_counter() - t0
+        return res
+
+    def step(self) -> Optional[Rebuild]:
+        """One poll; rebuilds and reports if anything changed."""
+        changed = self.poll()
+        if not changed:
+            return None
+        res = self.rebuild(changed)
+        self.echo(res.summary(self.root))
+        return res
+
+    def run(self, interval: float = 0.5, max_cycles: Optional[int] = None) -> None:
+        """Build everything once, then poll every ``interval`` seconds until interrupted."""
+        self.poll()
+        first = self.rebuild(self.scripts)
+        self.echo(first.summary(self.root))
+        self.echo(f"watching {', '.join(str(w.relative_to(self.root)) for w in self.watch if w.is_dir())} (Ctrl-C to stop)")
+        cycles = 0
+        try:
+            while max_cycles is None or cycles < max_cycles:
+                time.sleep(interval)
+                self.step()
+                cycles += 1
+        except KeyboardInterrupt:  # pragma: no cover - interactive exit
+            pass
+
+
+__all__ = ["Watcher", "Rebuild", "imports_of", "module_name"]
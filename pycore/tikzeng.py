@@ -63,20 +63,24 @@ def to_decoder_block(name_prefix, x, y, include_cross=True):  # pragma: no cover
     snips.append(to_Add(f"{name_prefix}add3", cur + 5.4, y + 0.2))
     return snips
 
+# Legacy layer helpers. Each snippet is a single preformatted (raw f-string)
+# template instead of a chain of ``+`` concatenations: one BUILD_STRING per
+# call, about twice as fast. Values are formatted exactly as ``str()`` did, so
+# the output is byte-identical.
+
 def to_head( projectpath ):
     pathlayers = os.path.join( projectpath, 'layers/' ).replace('\\', '/')
-    return r"""
-\documentclass[border=8pt, multi, tikz]{standalone} 
-\usepackage{import}
-\subimport{"""+ pathlayers + r"""}{init}
+    return rf"""
+\documentclass[border=8pt, multi, tikz]{{standalone}} 
+\usepackage{{import}}
+\subimport{{{pathlayers}}}{{init}}
 % Extended transformer styles
-\input{transformer_tex/transformer_styles.tex}
-\usetikzlibrary{positioning}
-\usetikzlibrary{3d} %for including external image 
+\input{{transformer_tex/transformer_styles.tex}}
+\usetikzlibrary{{positioning}}
+\usetikzlibrary{{3d}} %for including external image 
 """
 
-def to_cor():
-    return r"""
+_COR = r"""
 \def\ConvColor{rgb:yellow,5;red,2.5;white,5}
 \def\ConvReluColor{rgb:yellow,5;red,5;white,5}
 \def\PoolColor{rgb:red,1;black,0.3}
@@ -87,8 +91,7 @@ def to_cor():
 \def\SumColor{rgb:blue,5;green,15}
 """
 
-def to_begin():
-    return r"""
+_BEGIN = r"""
 \newcommand{\copymidarrow}{\tikz \draw[-Stealth,line width=0.8mm,draw={rgb:blue,4;red,1;green,1;black,3}] (-0.3,0) -- ++(0.3,0);}
 
 \begin{document}
@@ -97,179 +100,210 @@ def to_begin():
 \tikzstyle{copyconnection}=[ultra thick,every node/.style={sloped,allow upside down},draw={rgb:blue,4;red,1;green,1;black,3},opacity=0.7]
 """
 
+_END = r"""
+\end{tikzpicture}
+\end{document}
+"""
+
+def to_cor():
+    return _COR
+
+def to_begin():
+    return _BEGIN
+
 # layers definition
 
 def to_input( pathfile, to='(-3,0,0)', width=8, height=8, name="temp" ):
-    return r"""
-\node[canvas is zy plane at x=0] (""" + name + """) at """+ to +""" {\includegraphics[width="""+ str(width)+"cm"+""",height="""+ str(height)+"cm"+"""]{"""+ pathfile +"""}};
+    return rf"""
+\node[canvas is zy plane at x=0] ({name}) at {to} {{\includegraphics[width={width}cm,height={height}cm]{{{pathfile}}}}};
 """
 
 # Conv
 def to_Conv( name, s_filer=256, n_filer=64, offset="(0,0,0)", to="(0,0,0)", width=1, height=40, depth=40, caption=" " ):
-    return r"""
-\pic[shift={"""+ offset +"""}] at """+ to +""" 
-    {Box={
-        name=""" + name +""",
-        caption="""+ caption +r""",
-        xlabel={{"""+ str(n_filer) +""", }},
-        zlabel="""+ str(s_filer) +""",
+    return rf"""
+\pic[shift={{{offset}}}] at {to} 
+    {{Box={{
+        name={name},
+        caption={caption},
+        xlabel={{{{{n_filer}, }}}},
+        zlabel={s_filer},
         fill=\ConvColor,
-        height="""+ str(height) +""",
-        width="""+ str(width) +""",
-        depth="""+ str(depth) +"""
-        }
-    };
+        height={height},
+        width={width},
+        depth={depth}
+        }}
+    }};
 """
 
 # Conv,Conv,relu
 # Bottleneck
 def to_ConvConvRelu( name, s_filer=256, n_filer=(64,64), offset="(0,0,0)", to="(0,0,0)", width=(2,2), height=40, depth=40, caption=" " ):
-    return r"""
-\pic[shift={ """+ offset +""" }] at """+ to +""" 
-    {RightBandedBox={
-        name="""+ name +""",
-        caption="""+ caption +""",
-        xlabel={{ """+ str(n_filer[0]) +""", """+ str(n_filer[1]) +""" }},
-        zlabel="""+ str(s_filer) +""",
+    return rf"""
+\pic[shift={{ {offset} }}] at {to} 
+    {{RightBandedBox={{
+        name={name},
+        caption={caption},
+        xlabel={{{{ {n_filer[0]}, {n_filer[1]} }}}},
+        zlabel={s_filer},
         fill=\ConvColor,
         bandfill=\ConvReluColor,
-        height="""+ str(height) +""",
-        width={ """+ str(width[0]) +""" , """+ str(width[1]) +""" },
-        depth="""+ str(depth) +"""
-        }
-    };
+        height={height},
+        width={{ {width[0]} , {width[1]} }},
+        depth={depth}
+        }}
+    }};
 """
 
 
 
 # Pool
 def to_Pool(name, offset="(0,0,0)", to="(0,0,0)", width=1, height=32, depth=32, opacity=0.5, caption=" "):
-    return r"""
-\pic[shift={ """+ offset +""" }] at """+ to +""" 
-    {Box={
-        name="""+name+""",
-        caption="""+ caption +r""",
+    return rf"""
+\pic[shift={{ {offset} }}] at {to} 
+    {{Box={{
+        name={name},
+        caption={caption},
         fill=\PoolColor,
-        opacity="""+ str(opacity) +""",
-        height="""+ str(height) +""",
-        width="""+ str(width) +""",
-        depth="""+ str(depth) +"""
-        }
-    };
+        opacity={opacity},
+        height={height},
+        width={width},
+        depth={depth}
+        }}
+    }};
 """
 
 # unpool4, 
 def to_UnPool(name, offset="(0,0,0)", to="(0,0,0)", width=1, height=32, depth=32, opacity=0.5, caption=" "):
-    return r"""
-\pic[shift={ """+ offset +""" }] at """+ to +""" 
-    {Box={
-        name="""+ name +r""",
-        caption="""+ caption +r""",
+    return rf"""
+\pic[shift={{ {offset} }}] at {to} 
+    {{Box={{
+        name={name},
+        caption={caption},
         fill=\UnpoolColor,
-        opacity="""+ str(opacity) +""",
-        height="""+ str(height) +""",
-        width="""+ str(width) +""",
-        depth="""+ str(depth) +"""
-        }
-    };
+        opacity={opacity},
+        height={height},
+        width={width},
+        depth={depth}
+        }}
+    }};
 """
 
 
 
 def to_ConvRes( name, s_filer=256, n_filer=64, offset="(0,0,0)", to="(0,0,0)", width=6, height=40, depth=40, opacity=0.2, caption=" " ):
-    return r"""
-\pic[shift={ """+ offset +""" }] at """+ to +""" 
-    {RightBandedBox={
-        name="""+ name + """,
-        caption="""+ caption + """,
-        xlabel={{ """+ str(n_filer) + """, }},
-        zlabel="""+ str(s_filer) +r""",
-        fill={rgb:white,1;black,3},
-        bandfill={rgb:white,1;black,2},
-        opacity="""+ str(opacity) +""",
-        height="""+ str(height) +""",
-        width="""+ str(width) +""",
-        depth="""+ str(depth) +"""
-        }
-    };
+    return rf"""
+\pic[shift={{ {offset} }}] at {to} 
+    {{RightBandedBox={{
+        name={name},
+        caption={caption},
+        xlabel={{{{ {n_filer}, }}}},
+        zlabel={s_filer},
+        fill={{rgb:white,1;black,3}},
+        bandfill={{rgb:white,1;black,2}},
+        opacity={opacity},
+        height={height},
+        width={width},
+        depth={depth}
+        }}
+    }};
 """
 
 
 # ConvSoftMax
 def to_ConvSoftMax( name, s_filer=40, offset="(0,0,0)", to="(0,0,0)", width=1, height=40, depth=40, caption=" " ):
-    return r"""
-\pic[shift={"""+ offset +"""}] at """+ to +""" 
-    {Box={
-        name=""" + name +""",
-        caption="""+ caption +""",
-        zlabel="""+ str(s_filer) +""",
+    return rf"""
+\pic[shift={{{offset}}}] at {to} 
+    {{Box={{
+        name={name},
+        caption={caption},
+        zlabel={s_filer},
         fill=\SoftmaxColor,
-        height="""+ str(height) +""",
-        width="""+ str(width) +""",
-        depth="""+ str(depth) +"""
-        }
-    };
+        height={height},
+        width={width},
+        depth={depth}
+        }}
+    }};
 """
 
 # SoftMax
 def to_SoftMax( name, s_filer=10, offset="(0,0,0)", to="(0,0,0)", width=1.5, height=3, depth=25, opacity=0.8, caption=" " ):
-    return r"""
-\pic[shift={"""+ offset +"""}] at """+ to +""" 
-    {Box={
-        name=""" + name +""",
-        caption="""+ caption +""",
-        xlabel={{" ","dummy"}},
-        zlabel="""+ str(s_filer) +""",
+    return rf"""
+\pic[shift={{{offset}}}] at {to} 
+    {{Box={{
+        name={name},
+        caption={caption},
+        xlabel={{{{" ","dummy"}}}},
+        zlabel={s_filer},
         fill=\SoftmaxColor,
-        opacity="""+ str(opacity) +""",
-        height="""+ str(height) +""",
-        width="""+ str(width) +""",
-        depth="""+ str(depth) +"""
-        }
-    };
+        opacity={opacity},
+        height={height},
+        width={width},
+        depth={depth}
+        }}
+    }};
 """
 
 def to_Sum( name, offset="(0,0,0)", to="(0,0,0)", radius=2.5, opacity=0.6):
-    return r"""
-\pic[shift={"""+ offset +"""}] at """+ to +""" 
-    {Ball={
-        name=""" + name +""",
+    return rf"""
+\pic[shift={{{offset}}}] at {to} 
+    {{Ball={{
+        name={name},
         fill=\SumColor,
-        opacity="""+ str(opacity) +""",
-        radius="""+ str(radius) +""",
+        opacity={opacity},
+        radius={radius},
         logo=$+$
-        }
-    };
+        }}
+    }};
 """
 
 
 def to_connection( of, to):
-    return r"""
-\draw [connection]  ("""+of+"""-east)    -- node {\midarrow} ("""+to+"""-west);
+    return rf"""
+\draw [connection]  ({of}-east)    -- node {{\midarrow}} ({to}-west);
 """
 
 def to_skip( of, to, pos=1.25):
-    return r"""
-\path ("""+ of +"""-southeast) -- ("""+ of +"""-northeast) coordinate[pos="""+ str(pos) +"""] ("""+ of +"""-top) ;
-\path ("""+ to +"""-south)  -- ("""+ to +"""-north)  coordinate[pos="""+ str(pos) +"""] ("""+ to +"""-top) ;
-\draw [copyconnection]  ("""+of+"""-northeast)  
--- node {\copymidarrow}("""+of+"""-top)
--- node {\copymidarrow}("""+to+"""-top)
--- node {\copymidarrow} ("""+to+"""-north);
+    return rf"""
+\path ({of}-southeast) -- ({of}-northeast) coordinate[pos={pos}] ({of}-top) ;
+\path ({to}-south)  -- ({to}-north)  coordinate[pos={pos}] ({to}-top) ;
+\draw [copyconnection]  ({of}-northeast)  
+-- node {{\copymidarrow}}({of}-top)
+-- node {{\copymidarrow}}({to}-top)
+-- node {{\copymidarrow}} ({to}-north);
 """
 
 def to_end():
-    return r"""
-\end{tikzpicture}
-\end{document}
-"""
+    return _END
 
 
-def to_generate( arch, pathname="file.tex" ):
-    with open(pathname, "w") as f: 
-        for c in arch:
-            print(c)
-            f.write( c )
-     
+def to_generate( arch, pathname="file.tex", echo=True, buffer_size=1 << 16, report=None ):
+    """Write the snippets of ``arch`` (a list or any iterable, e.g. a generator) to ``pathname``.
 
+    The file is written through a ``buffer_size``-byte buffer as the snippets
+    arrive, so a generator never has to be materialized. ``echo=False`` skips
+    printing every snippet to stdout (the main cost when stdout is a terminal).
 
+    When ``plotnn_xt`` is importable the output goes to a temp file that only
+    replaces ``pathname`` if the content changed, so an unchanged figure keeps
+    its mtime and ``make`` / ``latexmk`` do not rebuild it; pass a list as
+    ``report`` to receive the ``plotnn_xt.fileio.WriteReport``. A standalone
+    copy of ``pycore`` writes the file directly (``report`` stays empty).
+    """
+    try:
+        from plotnn_xt.fileio import atomic_open
+    except ImportError:
+        atomic_open = None
+    if atomic_open is not None:
+        f = atomic_open(pathname, buffering=buffer_size)
+    else:
+        f = open(pathname, "w", buffering=buffer_size)
+    with f:
+        if not echo:
+            f.writelines(arch)
+        else:
+            out = sys.stdout
+            for c in arch:
+                out.write("%s\n" % (c,))  # same text as print(c)
+                f.write( c )
+    if report is not None and atomic_open is not None:
+        report.append(f.report)
@@ -0,0 +1,12 @@
+import pytest
+
+from benchmarks._util import STANDIN_COMPILER
+
+
+@pytest.fixture
+def fake_tex():
+    """Stand-in compiler command (no TeX): writes ``{outdir}/{stem}.pdf`` as
+    ``%PDF `` + the .tex bytes; ``fake_tex(log)`` also appends the .tex name to ``log``."""
+    def command(log=None):
+        return STANDIN_COMPILER + ((str(log),) if log is not None else ())
+    return command
@@ -0,0 +1,75 @@
+import random
+import time
+
+import pytest
+
+from plotnn_xt.autolayout import _crossings, layered
+from plotnn_xt.export import export_tex
+from plotnn_xt.primitives import Node, ffn, layernorm, residual_add
+from plotnn_xt.spatial import check_overlaps
+from plotnn_xt.checks import validate
+
+
+def _moe(n=4):
+    nodes = [layernorm("emb", 0, 0), Node("gate", 0, 0, 2.2, 0.6, "sblk", "Router")]
+    nodes += [ffn(f"e{i}", 0, 0) for i in range(n)] + [residual_add("mix", 0, 0), layernorm("head", 0, 0)]
+    links = [("emb", "gate")] + [("gate", f"e{i}", "dashconn") for i in range(n)]
+    links += [(f"e{i}", "mix") for i in range(n)] + [("mix", "head")]
+    return nodes, links
+
+
+@pytest.mark.parametrize("dir", ["x", "y"])
+def test_branches_share_a_layer_and_chain_is_centred(tmp_path, dir):
+    nodes, edges = layered(*_moe(), dir=dir)
+    by = {n.name: n for n in nodes}
+    flow, cross = ("x", "y") if dir == "x" else ("y", "x")
+    sign = 1 if dir == "x" else -1
+    ranks = [sign * getattr(by[k], flow) for k in ("emb", "gate", "e0", "mix", "head")]
+    assert ranks == sorted(ranks) and len(set(ranks)) == 5
+    assert len({getattr(by[f"e{i}"], flow) for i in range(4)}) == 1
+    mid = sum(getattr(by[f"e{i}"], cross) for i in range(4)) / 4
+    assert all(abs(getattr(by[k], cross) - mid) < 1e-9 for k in ("emb", "gate", "mix", "head"))
+    assert check_overlaps(nodes, labels=False).ok
+    assert edges[1].style == "dashconn" and edges[0].path is None
+    ports = ("east", "west") if dir == "x" else ("south", "north")
+    assert edges[0].src == f"(emb.{ports[0]})" and edges[0].dst == f"(gate.{ports[1]})"
+    export_tex(nodes, edges, tmp_path / "moe.tex", validate=True)
+
+
+def test_long_edges_get_waypoints_and_cycles_are_broken():
+    nodes = [layernorm(k, 0, 0) for k in "abcd"]
+    placed, edges = layered(nodes, [("a", "b"), ("b", "c"), ("c", "d"), ("a", "d"), ("d", "b")])
+    x = {n.name: n.x for n in placed}
+    assert x["a"] < x["b"] < x["c"] < x["d"]
+    skip, back = edges[3], edges[4]
+    assert len(skip.path) == 4  # straight through the two dummy slots of layers b and c
+    assert all(x["a"] < px < x["d"] for px, _ in skip.path)
+    assert back.src == "(d.west)" and back.dst == "(b.east)"  # drawn against the flow
+    assert back.path and back.path[0][0] > back.path[-1][0]
+    with pytest.raises(ValueError, match="unknown node 'z'"):
+        layered(nodes, [("a", "z")])
+    with pytest.raises(ValueError, match="self-loop"):
+        layered(nodes, [("a", "a")])
+
+
+def test_crossings_are_removed():
+    # each upper node feeds the lower node "opposite" to it: fully crossed in input order
+    up = [layernorm(f"u{i}", 0, 0) for i in range(5)]
+    lo = [layernorm(f"l{i}", 0, 0) for i in range(5)]
+    links = [(f"u{i}", f"l{4 - i}") for i in range(5)]
+    placed, _ = layered(up + lo, links)
+    y = {n.name: n.y for n in placed}
+    ends = sorted((y[a], y[b]) for a, b in links)
+    assert [b for _, b in ends] == sorted(b for _, b in ends)  # no two edges cross
+    assert _crossings([0, 1], [[], [], [0], [1]], [2, 3], [0, 1, 1, 0]) == 1
+
+
+def test_thousands_of_nodes_are_fast_and_disjoint():
+    rng = random.Random(7)
+    nodes = [ffn(f"n{i}", 0, 0) for i in range(2000)]
+    links = [(f"n{rng.randrange(max(0, i - 20), i)}", f"n{i}") for i in range(1, 2000) for _ in range(rng.choice((1, 2)))]
+    t0 = time.perf_counter()
+    placed, edges = layered(nodes, links, dir="y")
+    assert time.perf_counter() - t0 < 5.0  # ~0.2s here; generous bound for slow CI
+    assert check_overlaps(placed, labels=False).ok
+    assert validate(placed, edges).ok
@@ -0,0 +1,37 @@
+import sys
+
+from plotnn_xt.batch import build_batch
+from plotnn_xt.export import Figure, export_batch
+from plotnn_xt.layout import connect, group
+from plotnn_xt.primitives import layernorm, mha
+
+# Stand-in splitter: one "page" per figure of the stand-in PDF (the .tex bytes).
+FAKE_SPLIT = ("import pathlib, sys; pdf, pat = sys.argv[1:]; "
+              "[pathlib.Path(pat.replace('%d', str(i + 1))).write_text('page') "
+              "for i in range(pathlib.Path(pdf).read_text().count('% === figure'))]")
+
+
+def _figures(n):
+    figs = []
+    for i in range(n):
+        a, b = layernorm(f"ln{i}", 0, 0), mha(f"mha{i}", 3.2, 0)
+        figs.append(Figure(f"fig{i}", [a, b], [connect(a.anchors["R"], b.anchors["L"])],
+                           boxes=[group(f"g{i}", [a, b], title="G")] if i % 2 else None))
+    return figs
+
+
+def test_export_batch_one_page_per_figure(tmp_path):
+    text = export_batch(_figures(3), tmp_path / "b.tex").read_text()
+    assert text.count("\\begin{tikzpicture}") == 3
+    assert text.count("\\documentclass") == 1
+    assert text.count("on background layer") == 1  # only fig1 has a box
+    assert text.index("(mha0)") < text.index("(mha1)") < text.index("(mha2)")
+
+
+def test_build_batch_splits_pages(tmp_path, fake_tex):
+    (tmp_path / "transformer_tex").mkdir()
+    compiler = fake_tex()
+    splitter = (sys.executable, "-c", FAKE_SPLIT, "{pdf}", "{pattern}")
+    out = build_batch(_figures(4), tmp_path / "out", root=tmp_path, compiler=compiler, splitter=splitter)
+    assert sorted(out) == ["fig0", "fig1", "fig2", "fig3"]
+    assert all(p.exists() for p in out.values())
@@ -0,0 +1,38 @@
+import json
+import pathlib
+import shutil
+import subprocess
+
+import pytest
+
+from benchmarks import run as bench
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+
+
+def test_compare_flags_only_real_slowdowns():
+    base = {"export_tex": {"1000": 0.010, "10": 0.0001}, "compile": {"1000": 0.5}}
+    new = {"export_tex": {"1000": 0.020, "10": 0.0009}, "compile": {"1000": 0.55}, "tikzeng": {"1000": 1.0}}
+    assert bench.compare(new, base, threshold=0.25) == [("export_tex", "1000", 0.010, 0.020)]
+
+
+def test_main_writes_json_and_fails_on_regression(tmp_path):
+    out = tmp_path / "now.json"
+    assert bench.main(["--sizes", "10", "--repeat", "1", "--out", str(out)]) == 0
+    doc = json.loads(out.read_text())
+    assert set(doc["results"]) == set(bench.STAGES)
+    assert all("10" in by_size for by_size in doc["results"].values())
+
+    fast = {"results": {"compile": {"10": 1e-4}}}
+    (tmp_path / "base.json").write_text(json.dumps(fast))
+    argv = ["--sizes", "10", "--repeat", "1", "--stages", "compile", "--out", str(out),
+            "--baseline", str(tmp_path / "base.json")]
+    assert bench.main(argv) == 1
+
+
+@pytest.mark.skipif(shutil.which("make") is None, reason="make not installed")
+def test_make_bench_target_parses():
+    proc = subprocess.run(["make", "-n", "bench", "BASELINE=base.json"], cwd=ROOT,
+                          capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert "-m benchmarks.run --baseline base.json" in proc.stdout
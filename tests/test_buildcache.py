@@ -0,0 +1,55 @@
+import pytest
+
+from plotnn_xt.buildcache import BuildCache, BuildError
+
+def _project(tmp_path):
+    (tmp_path / "transformer_tex").mkdir()
+    (tmp_path / "transformer_tex" / "transformer_styles.tex").write_text("% styles v1\n")
+    (tmp_path / "fig.tex").write_text("\\node (a) {};\n")
+    return tmp_path
+
+
+def test_cache_skips_identical_rebuild(tmp_path, fake_tex):
+    root = _project(tmp_path)
+    log = root / "compiles.log"
+    cmd = fake_tex(log)
+
+    assert BuildCache(root, compiler=cmd).build("fig.tex") is False
+    (root / "fig.pdf").unlink()
+    # rewriting identical bytes (new mtime) is still a hit; the PDF is restored
+    (root / "fig.tex").write_text("\\node (a) {};\n")
+    cache = BuildCache(root, compiler=cmd)
+    assert cache.build("fig.tex") is True
+    assert (root / "fig.pdf").read_bytes().startswith(b"%PDF")
+    assert log.read_text().count("fig.tex") == 1
+    assert "1 hit(s), 0 miss(es)" in cache.report.summary()
+
+
+def test_cache_invalidated_by_style_change(tmp_path, fake_tex):
+    root = _project(tmp_path)
+    log = root / "compiles.log"
+    cmd = fake_tex(log)
+
+    BuildCache(root, compiler=cmd).build("fig.tex")
+    (root / "transformer_tex" / "transformer_styles.tex").write_text("% styles v2\n")
+    cache = BuildCache(root, compiler=cmd)
+    assert cache.build("fig.tex") is False
+    assert log.read_text().count("fig.tex") == 2
+    assert len(cache.report.misses) == 1
+
+
+def test_missing_compiler_is_a_build_error(tmp_path):
+    root = _project(tmp_path)
+    cache = BuildCache(root, compiler=("plotnn-no-such-latexmk", "{tex}"))
+    with pytest.raises(BuildError, match="compiler not found: plotnn-no-such-latexmk"):
+        cache.build("fig.tex")
+
+
+def test_cache_slot_holds_only_complete_artifacts(tmp_path, fake_tex):
+    root = _project(tmp_path)
+    cmd = fake_tex(root / "compiles.log")
+    cache = BuildCache(root, compiler=cmd)
+    cache.build("fig.tex")
+    (slot,) = [p for p in (root / ".plotnn_cache").rglob("*") if p.is_file()]
+    assert slot.name == "out.pdf" and slot.read_bytes() == (root / "fig.pdf").read_bytes()
+    assert slot.stat().st_mode & 0o777 == (root / "fig.pdf").stat().st_mode & 0o777  # not mkstemp's 0600
@@ -0,0 +1,58 @@
+import types
+
+import pytest
+
+import plotnn_xt
+from plotnn_xt.blocks import encoder_block_factory
+from plotnn_xt.checks import DiagramError, validate
+from plotnn_xt.export import export_tex
+from plotnn_xt.layout import connect, group, repeat
+from plotnn_xt.primitives import layernorm
+from plotnn_xt.replication import instance, replicate
+
+
+def test_clean_diagram_passes():
+    nodes, edges = repeat(3, encoder_block_factory(), gap=1.6, dir="y")
+    report = validate(nodes, edges, boxes=[group("enc", nodes)])
+    assert report.ok
+    assert report.raise_if_failed() is report
+
+
+def test_reports_every_problem_by_name():
+    a, b, a2 = layernorm("a", 0, 0), layernorm("b", 3, 0), layernorm("a", 6, 0)
+    ghost = layernorm("ghost", 9, 0)
+    edges = [connect("(a.east)", "(b.west)"), connect("(b.east)", "(c.west)"), connect("(c.north)", "(1cm,2cm)"),
+             connect("(b)", "(g)"), connect("(ghost.south)", "(a.north)")]
+    report = validate([a, b, a2], edges, boxes=[group("g", [a, ghost]), group("b", [b])])
+    assert report.duplicates == [("a", 2), ("b", 2)]  # box names share the TikZ namespace
+    assert report.dangling == [(1, "(c.west)", "c"), (2, "(c.north)", "c"), (4, "(ghost.south)", "ghost")]
+    assert report.stray_members == [("g", "ghost")]
+    with pytest.raises(DiagramError) as err:
+        report.raise_if_failed()
+    assert isinstance(err.value, ValueError) and err.value.report is report
+    assert "no node ghost" in str(err.value) and "2 duplicate name(s), 3 dangling endpoint(s)" in str(err.value)
+
+
+def test_instanced_and_table_nodes_count_as_exported():
+    stack = instance(3, encoder_block_factory(), gap=1.6, dir="y")
+    head = layernorm("head", 0, 8)
+    edges = [connect(stack.nodes[-1].anchors["R"], head.anchors["L"])]
+    assert validate([head], edges, instances=[stack]).ok
+    nodes, edges = replicate(50, encoder_block_factory(), gap=1.6, dir="y")
+    assert validate(nodes, edges, boxes=[group("all", nodes)]).ok
+
+
+def test_export_tex_validate_raises_before_writing(tmp_path):
+    a = layernorm("a", 0, 0)
+    out = tmp_path / "fig.tex"
+    with pytest.raises(DiagramError, match="dangling  edge 0: \\(b.west\\)"):
+        export_tex([a], [connect("(a.east)", "(b.west)")], out, validate=True)
+    assert not out.exists()
+    export_tex([a], [], out, validate=True)
+    assert out.exists()
+
+
+def test_checks_module_and_package_function():
+    import plotnn_xt.checks as checks
+    assert isinstance(checks, types.ModuleType)
+    assert plotnn_xt.validate is checks.validate is validate
@@ -0,0 +1,81 @@
+import multiprocessing
+import pathlib
+import shlex
+import shutil
+import subprocess
+
+import pytest
+
+from click.testing import CliRunner
+
+from plotnn_xt import cli as cli_mod
+from plotnn_xt.cli import cli, discover
+
+GOOD = "import pathlib; pathlib.Path('examples/fig_good.tex').write_text('ok')\n"
+BAD = "raise SystemExit('boom')\n"
+
+
+def _project(tmp_path, bad=False):
+    ex = tmp_path / "examples"
+    (ex / "sub").mkdir(parents=True)
+    (ex / "fig_good.py").write_text(GOOD)
+    (ex / "helper.py").write_text("")  # not a figure script
+    if bad:
+        (ex / "sub" / "fig_bad.py").write_text(BAD)
+    return tmp_path
+
+
+def test_discover_figure_scripts(tmp_path):
+    root = _project(tmp_path, bad=True)
+    names = [p.name for p in discover(root)]
+    assert names == ["fig_good.py", "fig_bad.py"]
+
+
+def test_build_parallel_with_stand_in_compiler(tmp_path, fake_tex):
+    root = _project(tmp_path)
+    compiler = shlex.join(fake_tex())
+    args = ["build", "--root", str(root), "-j", "2", "--compiler", compiler]
+    result = CliRunner().invoke(cli, args)
+    assert result.exit_code == 0, result.output
+    assert (root / "examples" / "fig_good.pdf").exists()
+    assert "1 figure(s), 0 failed" in result.output
+    # second run is served from the content-hash cache
+    result = CliRunner().invoke(cli, args)
+    assert "(cached)" in result.output
+
+
+def test_build_failure_exits_non_zero(tmp_path):
+    root = _project(tmp_path, bad=True)
+    result = CliRunner().invoke(cli, ["build", "--root", str(root), "--no-compile"])
+    assert result.exit_code == 1
+    assert "FAIL examples/sub/fig_bad.py" in result.output
+
+
+def test_build_missing_compiler_is_a_figure_failure(tmp_path):
+    root = _project(tmp_path)
+    result = CliRunner().invoke(cli, ["build", "--root", str(root), "--compiler", "no-such-latexmk {tex}"])
+    assert result.exit_code == 1
+    assert "FAIL examples/fig_good.py" in result.output
+    assert "compiler not found: no-such-latexmk" in result.output
+    assert "1 figure(s), 1 failed" in result.output
+
+
+@pytest.mark.skipif(multiprocessing.get_start_method() != "fork", reason="patch must reach the workers")
+def test_build_reports_crashed_worker(tmp_path, monkeypatch):
+    def crash(script, *args):
+        raise RuntimeError(f"cannot build {script.name}")
+
+    monkeypatch.setattr(cli_mod, "_build_figure", crash)
+    root = _project(tmp_path, bad=True)
+    result = CliRunner().invoke(cli, ["build", "--root", str(root), "-j", "2", "--no-compile"])
+    assert result.exit_code == 1
+    assert "worker crashed: RuntimeError: cannot build fig_good.py" in result.output
+    assert "2 figure(s), 2 failed" in result.output
+
+
+@pytest.mark.skipif(shutil.which("make") is None, reason="make not installed")
+def test_make_build_target_parses():
+    root = pathlib.Path(__file__).resolve().parents[1]
+    proc = subprocess.run(["make", "-n", "build"], cwd=root, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert "-m plotnn_xt.cli build" in proc.stdout
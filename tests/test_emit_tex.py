@@ -38,10 +38,14 @@ def test_group_box_emit(tmp_path):
     out = tmp_path / "grp.tex"
     export_tex([ln1, ln2], [], out, boxes=[g])
     text = out.read_text()
-    # fit expression references node names
-    assert "fit=(ln1) (ln2)".replace(" ", " ") in text
+    # rectangle precomputed from member geometry (x: -1.30..4.30, y: -0.30..0.30, + 6pt inner sep)
+    assert "minimum width=6.02cm,minimum height=1.02cm] (g1) at (1.50cm,0.00cm)" in text
+    assert "fit=" not in text
     # title label presence
     assert "GroupTitle" in text
+    # TikZ fit over members stays available as opt-in
+    export_tex([ln1, ln2], [], out, boxes=[group("g1", [ln1, ln2], title="GroupTitle", fit=True)])
+    assert "fit=(ln1) (ln2)" in out.read_text()
 
 
 def test_repeat_encoder_blocks(tmp_path):
@@ -101,3 +105,34 @@ def test_gpt_stack_3d_emit(tmp_path):
         assert "MHA" in data
         assert "FFN" in data
 
+
+
+def test_stream_tex_matches_export(tmp_path):
+    from plotnn_xt.export import stream_tex
+    builder = encoder_block_factory()
+    nodes, edges = repeat(3, builder, start=(0.0, 0.0), gap=1.5, dir="x")
+    g = group("g1", nodes, title="Enc")
+    ref = export_tex(nodes, edges, tmp_path / "ref.tex", boxes=[g])
+    out = stream_tex((n for n in nodes), iter(edges), tmp_path / "stream.tex", boxes=(b for b in [g]), buffer_size=64)
+    assert out.read_text() == ref.read_text()
+    # empty generators behave like empty lists (no background scope emitted)
+    ref = export_tex(nodes, edges, tmp_path / "ref2.tex")
+    out = stream_tex(iter(nodes), iter(edges), tmp_path / "stream2.tex", boxes=iter(()))
+    assert out.read_text() == ref.read_text()
+
+
+def test_jinja_bytecode_cache(tmp_path, monkeypatch):
+    from plotnn_xt import export
+
+    nodes, edges = repeat(2, encoder_block_factory(), gap=2.0)
+    plain = export_tex(nodes, edges, tmp_path / "plain.tex").read_text()
+    monkeypatch.setenv(export.JINJA_CACHE_ENV, str(tmp_path / "jinja"))
+    export._environment.cache_clear()
+    export._template.cache_clear()
+    try:
+        cached = export_tex(nodes, edges, tmp_path / "cached.tex").read_text()
+    finally:
+        export._environment.cache_clear()
+        export._template.cache_clear()
+    assert cached == plain
+    assert list((tmp_path / "jinja").glob("*.cache"))
@@ -0,0 +1,71 @@
+import re
+from dataclasses import replace
+
+import pytest
+
+from plotnn_xt.blocks import decoder_block_factory, encoder_block_factory
+from plotnn_xt.buildcache import BuildCache
+from plotnn_xt.export import export_tex
+from plotnn_xt.externalize import export_externalized, split_groups
+from plotnn_xt.layout import elbow, group, repeat
+
+
+def _diagram(dec_label="FFN"):
+    enc_nodes, enc_edges = repeat(2, encoder_block_factory(), start=(0.0, 0.0), gap=1.6, dir="y")
+    dec_nodes, dec_edges = repeat(2, decoder_block_factory(include_cross=True), start=(20.0, 0.0), gap=2.0, dir="y")
+    dec_nodes = [replace(n, label=dec_label) if n.name.startswith("dffn") else n for n in dec_nodes]
+    cross = [elbow(enc_nodes[-1].anchors["R"], n.anchors["L"], dx=2.0) for n in dec_nodes if n.name.startswith("xatt")]
+    boxes = [group("enc_stack", enc_nodes, title="Encoder"), group("dec_stack", dec_nodes, title="Decoder")]
+    return enc_nodes + dec_nodes, enc_edges + dec_edges + cross, boxes, len(cross)
+
+
+def test_split_keeps_cross_edges_in_main_picture():
+    nodes, edges, boxes, n_cross = _diagram()
+    parts, rest_nodes, rest_edges, rest_boxes = split_groups(nodes, edges, boxes, ["dec_stack"])
+    (dec,) = parts
+    assert [n.name for n in dec.nodes] == [n.name for n in boxes[1].nodes]
+    assert rest_boxes == [boxes[0]]
+    assert len(rest_nodes) + len(dec.nodes) == len(nodes)
+    assert len(rest_edges) + len(dec.edges) == len(edges)
+    assert sum(e.dst.startswith("(xatt") for e in rest_edges) == n_cross  # crossing the group boundary
+    with pytest.raises(ValueError, match="'nope'"):
+        split_groups(nodes, edges, boxes, ["nope"])
+
+
+def test_main_document_places_part_and_anchor_nodes(tmp_path):
+    nodes, edges, boxes, _ = _diagram()
+    out = export_tex(nodes, edges, tmp_path / "fig.tex", boxes=boxes, externalize=["dec_stack"])
+    text = out.read_text()
+    (part,) = (tmp_path / "fig-parts").glob("dec_stack-*.tex")
+    assert f"\\includegraphics{{{part.with_suffix('.pdf').as_posix()}}}" in text
+    assert "\\usepackage{graphicx}" in text
+    for n in boxes[1].nodes:  # every member keeps a same-size invisible stand-in
+        assert re.search(rf"\\node\[\w+={n.w:.2f}cm/{n.h:.2f}cm,draw=none,fill=none,text opacity=0\] \({n.name}\)", text)
+    body = part.read_text()
+    assert "border=0pt" in body and "\\useasboundingbox" in body and "(dec_stack)" in body
+    assert not [n.name for n in boxes[0].nodes if f"({n.name}" in body]  # cross edges stay in fig.tex
+
+
+def test_unchanged_group_is_not_recompiled(tmp_path, fake_tex):
+    (tmp_path / "transformer_tex").mkdir()
+    (tmp_path / "transformer_tex" / "transformer_styles.tex").write_text("% styles\n")
+    log = tmp_path / "compiles.log"
+    cmd = fake_tex(log)
+    out = tmp_path / "fig.tex"
+
+    nodes, edges, boxes, _ = _diagram()
+    export_externalized(nodes, edges, out, boxes, cache=BuildCache(tmp_path, compiler=cmd))
+    first = sorted(p.name for p in (tmp_path / "fig-parts").iterdir())
+
+    nodes, edges, boxes, _ = _diagram(dec_label="FFN*")  # edit the decoder only
+    report = []
+    cache = BuildCache(tmp_path, compiler=cmd)
+    export_externalized(nodes, edges, out, boxes, cache=cache, report=report)
+    assert [p.name.split("-")[0] for p in cache.report.hits] == ["enc_stack"]
+    assert [p.name.split("-")[0] for p in cache.report.misses] == ["dec_stack"]
+    assert [r.written for r in report] == [False, True, True]  # enc part, dec part, main document
+    second = sorted(p.name for p in (tmp_path / "fig-parts").iterdir())
+    assert [n for n in second if n.startswith("enc_stack")] == [n for n in first if n.startswith("enc_stack")]
+    assert not set(first) & {n for n in second if n.startswith("dec_stack")}  # stale decoder part pruned
+    assert len(second) == 4
+    assert log.read_text().count("dec_stack") == 2 and log.read_text().count("enc_stack") == 1
@@ -0,0 +1,78 @@
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+
+from plotnn_xt.blocks import encoder_block_factory
+from plotnn_xt.export import export_tex, stream_tex
+from plotnn_xt.fileio import atomic_open, write_text
+from plotnn_xt.layout import repeat
+from pycore import tikzeng as T
+
+
+def _age(path):
+    os.utime(path, (1_000_000_000, 1_000_000_000))
+
+
+def test_export_skips_identical_content(tmp_path):
+    nodes, edges = repeat(2, encoder_block_factory(), gap=1.5)
+    out = tmp_path / "enc.tex"
+    report = []
+    export_tex(nodes, edges, out, report=report)
+    _age(out)
+    export_tex(nodes, edges, out, report=report)
+    stream_tex(iter(nodes), iter(edges), out, report=report)
+    assert [r.written for r in report] == [True, False, False]
+    assert out.stat().st_mtime == 1_000_000_000
+
+    export_tex(nodes[:3], edges[:1], out, report=report)
+    assert report[-1].written and report[-1].size == len(out.read_bytes())
+    assert out.stat().st_mtime > 1_000_000_000
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["enc.tex"]  # no temp files left
+
+
+def test_failed_stream_leaves_old_file(tmp_path):
+    out = tmp_path / "fig.tex"
+    write_text(out, "old\n")
+    os.chmod(out, 0o640)
+    with pytest.raises(RuntimeError):
+        with atomic_open(out) as f:
+            f.write("half")
+            raise RuntimeError("renderer crashed")
+    assert out.read_text() == "old\n"
+    assert write_text(out, "new\n").written
+    assert out.stat().st_mode & 0o777 == 0o640  # permissions survive the rename
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["fig.tex"]
+
+
+def test_new_file_follows_current_umask(tmp_path):
+    old = os.umask(0o027)  # set after import: the mode must not be cached
+    try:
+        write_text(tmp_path / "fig.tex", "x\n")
+    finally:
+        os.umask(old)
+    assert (tmp_path / "fig.tex").stat().st_mode & 0o777 == 0o640
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["fig.tex"]  # probe removed
+
+
+def test_legacy_generate_reports(tmp_path):
+    arch = [T.to_head(".."), T.to_begin(), T.to_end()]
+    out = tmp_path / "legacy.tex"
+    report = []
+    T.to_generate(arch, str(out), echo=False, report=report)
+    _age(out)
+    T.to_generate(arch, str(out), echo=False, report=report)
+    assert [r.written for r in report] == [True, False]
+    assert out.stat().st_mtime == 1_000_000_000
+
+
+def test_legacy_generate_without_plotnn_xt(tmp_path):
+    shutil.copytree(os.path.dirname(T.__file__), tmp_path / "pycore")  # vendored, standalone copy
+    script = ("import sys; sys.modules['plotnn_xt'] = None\n"
+              "from pycore import tikzeng as T\n"
+              "T.to_generate([T.to_head('..'), T.to_begin(), T.to_end()], 'legacy.tex', echo=False)\n")
+    proc = subprocess.run([sys.executable, "-c", script], cwd=tmp_path, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert "\\begin{document}" in (tmp_path / "legacy.tex").read_text()
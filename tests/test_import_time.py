@@ -0,0 +1,42 @@
+import json
+import pathlib
+import subprocess
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+BUDGET_S = 0.05  # `import plotnn_xt` alone; currently ~3 ms
+
+PROBE = """
+import json, sys, time
+t0 = time.perf_counter()
+import plotnn_xt
+elapsed = time.perf_counter() - t0
+loaded = sorted(m for m in sys.modules if m.startswith(("plotnn_xt.", "jinja2")))
+plotnn_xt.layernorm("ln", 0, 0)
+after_geometry = "jinja2" in sys.modules
+print(json.dumps({"elapsed": elapsed, "loaded": loaded, "jinja_after_geometry": after_geometry}))
+"""
+
+
+def _probe():
+    proc = subprocess.run([sys.executable, "-c", PROBE], cwd=str(ROOT), capture_output=True, text=True, check=True)
+    return json.loads(proc.stdout)
+
+
+def test_import_is_lazy_and_within_budget():
+    res = min((_probe() for _ in range(3)), key=lambda r: r["elapsed"])
+    assert res["loaded"] == []
+    assert not res["jinja_after_geometry"]
+    assert res["elapsed"] < BUDGET_S, f"import plotnn_xt took {res['elapsed'] * 1e3:.1f} ms"
+
+
+def test_lazy_names_resolve():
+    import plotnn_xt
+
+    for name in plotnn_xt.__all__:
+        assert getattr(plotnn_xt, name) is not None
+    assert callable(plotnn_xt.replicate)
+    import plotnn_xt.replication as replication  # submodule import leaves the function in place
+
+    assert callable(plotnn_xt.replicate) and plotnn_xt.replicate is replication.replicate
+    assert "export_tex" in dir(plotnn_xt)
@@ -0,0 +1,38 @@
+import pickle
+
+from plotnn_xt.blocks import encoder_block_factory
+from plotnn_xt.export import export_tex
+from plotnn_xt.layout import group, repeat, stack_tag
+from plotnn_xt.nodetable import NodeTable
+from plotnn_xt.primitives import layernorm
+
+
+def test_nodetable_drop_in_for_export(tmp_path):
+    nodes, edges = repeat(2, encoder_block_factory(), start=(0.0, 0.0), gap=1.5, dir="x")
+    table = NodeTable(nodes)
+    assert len(table) == len(nodes)
+    assert table[-1] == nodes[-1]
+    assert table.find("mha1").anchors["L"] == "(mha1.west)"
+
+    ref_tag = stack_tag("tag", nodes, text="x2")
+    tag = stack_tag("tag", table, text="x2")
+    assert (tag.x, tag.y) == (ref_tag.x, ref_tag.y)
+
+    ref = export_tex(nodes, edges, tmp_path / "ref.tex", boxes=[group("g", nodes, title="Enc")])
+    out = export_tex(table, edges, tmp_path / "tbl.tex", boxes=[group("g", table, title="Enc")])
+    assert out.read_text() == ref.read_text()
+
+
+def test_anchors_cached_per_node():
+    a = layernorm("ln_x", 0, 0)
+    assert a.anchors is a.anchors and a.anchors["R"] == "(ln_x.east)"
+    assert a.anchors is not layernorm("ln_x", 5, 0).anchors  # no process-wide cache
+    assert "_anchors" not in a.__dict__ and a == layernorm("ln_x", 0, 0)  # invisible to copies and ==
+    a.name = "ln_y"
+    assert a.anchors["R"] == "(ln_y.east)"
+    assert pickle.loads(pickle.dumps(a)).anchors["R"] == "(ln_y.east)"  # cache is not pickled
+
+    table = NodeTable(repeat(2, encoder_block_factory(), gap=1.5)[0])
+    assert table[3].anchors is table[3].anchors  # separate row views share the table's column
+    assert table[3].anchors["L"] == f"({table.names[3]}.west)"
+    assert pickle.loads(pickle.dumps(table))[3] == table[3]
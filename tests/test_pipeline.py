@@ -0,0 +1,46 @@
+from plotnn_xt.blocks import decoder_block_factory
+from plotnn_xt.gpt import build_gpt_stack, iter_gpt_stack
+from plotnn_xt.layout import Box, Edge, group, repeat
+from plotnn_xt.pipeline import iter_group, iter_repeat
+
+
+def _split(items):
+    nodes, edges, boxes = [], [], []
+    for it in items:
+        (edges if isinstance(it, Edge) else boxes if isinstance(it, Box) else nodes).append(it)
+    return nodes, edges, boxes
+
+
+def test_iter_gpt_stack_matches_eager_build():
+    _, nodes, edges = build_gpt_stack(n=4)
+    lazy_nodes, lazy_edges, boxes = _split(iter_gpt_stack(n=4))
+    key = lambda n: (n.name, n.x, n.y, n.w, n.h, n.kind, n.label)  # noqa: E731
+    assert [key(n) for n in lazy_nodes] == [key(n) for n in nodes]
+    assert lazy_edges == edges
+    assert [b.name for b in boxes] == ["gpt_stack_box"]
+    assert boxes[0].bounds() == group("g", nodes[:-1]).bounds()
+
+
+def test_pipeline_builds_blocks_on_demand():
+    builder = decoder_block_factory()
+    calls = []
+
+    def counted(i, x, y):
+        calls.append(i)
+        return builder(i, x, y)
+
+    stream = iter_group(iter_repeat(1000, counted, gap=2.0), "g")
+    first = next(stream)
+    assert calls == [0] and not isinstance(first, (Edge, Box))
+    nodes, edges = repeat(1, builder)
+    for _ in range(len(nodes) + len(edges)):  # rest of block 0, then block 1's first node
+        next(stream)
+    assert calls == [0, 1]
+
+
+def test_stream_items_writes_in_arrival_order(tmp_path):
+    out = iter_gpt_stack(n=2, out_tex=str(tmp_path / "lazy.tex"))
+    tex = out.read_text()
+    assert tex.count("\\node[") == len(_split(iter_gpt_stack(n=2))[0]) + 1
+    assert tex.index("(gpt_stack_box)") > tex.rindex("\\path[")
+    assert tex.rstrip().endswith("\\end{document}")
@@ -0,0 +1,70 @@
+"""Pixel-diff regression tests against stored golden PNGs (no TeX needed).
+
+Regenerate the goldens after an intended visual change with::
+
+    PLOTNN_UPDATE_GOLDEN=1 python -m pytest tests/test_render_regression.py
+"""
+import os
+import pathlib
+
+import pytest
+from PIL import Image
+
+from plotnn_xt.blocks import decoder_block_factory, encoder_block_factory
+from plotnn_xt.gpt import build_gpt_stack
+from plotnn_xt.layout import connect, elbow, group, lane, repeat
+from plotnn_xt.primitives import Node, layernorm
+from plotnn_xt.raster import image_diff, render_png
+
+GOLDEN = pathlib.Path(__file__).parent / "golden"
+UPDATE = os.environ.get("PLOTNN_UPDATE_GOLDEN") == "1"
+MAX_CHANGED = 0.002  # fraction of pixels allowed to differ (anti-aliasing noise)
+
+
+def _encoder_stack():
+    nodes, edges = repeat(2, encoder_block_factory(), gap=2.0)
+    return dict(nodes=nodes, edges=edges, boxes=[group("enc", nodes, title="Encoder")])
+
+
+def _gpt_3d():
+    _, nodes, edges = build_gpt_stack(n=2, three_d=True)
+    return dict(nodes=nodes, edges=edges, boxes=[group("dec", nodes[:-1])])
+
+
+def _encdec_dark():
+    enc, enc_e = repeat(2, encoder_block_factory(), gap=1.6, dir="y")
+    dec, dec_e = repeat(1, decoder_block_factory(include_cross=True), start=(22.0, 0.0), dir="y")
+    cross = [elbow(enc[-1].anchors["R"], n.anchors["B"], dx=1.0) for n in dec if n.name.startswith("xatt")]
+    return dict(nodes=enc + dec, edges=enc_e + dec_e + cross, boxes=[lane("enc", enc), group("dec", dec)], theme="dark")
+
+
+CASES = {"encoder_stack": _encoder_stack, "gpt_stack_3d": _gpt_3d, "encdec_dark": _encdec_dark}
+
+
+def _check(name, img):
+    golden = GOLDEN / f"{name}.png"
+    if UPDATE or not golden.exists():
+        if not UPDATE:
+            pytest.fail(f"missing golden {golden.name}; run with PLOTNN_UPDATE_GOLDEN=1")
+        img.save(golden, optimize=True)
+        return
+    changed, mask = image_diff(img, Image.open(golden))
+    if changed > MAX_CHANGED:
+        out = golden.with_name(f"{name}.diff.png")
+        mask.save(out)
+        pytest.fail(f"{name}: {changed:.2%} of pixels differ from {golden.name} (diff mask: {out})")
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_render_matches_golden(name):
+    _check(name, render_png(**CASES[name]()))
+
+
+def test_harness_catches_layout_shift():
+    ln = layernorm("ln", 0, 0)
+    blk = Node("b", 3.0, 0.0, 2.0, 1.0, "blk", "B")
+    base = render_png([ln, blk], [connect(ln.anchors["R"], blk.anchors["L"])])
+    moved = Node("b", 3.0, 0.15, 2.0, 1.0, "blk", "B")
+    shifted = render_png([ln, moved], [connect(ln.anchors["R"], moved.anchors["L"])])
+    assert image_diff(base, base)[0] == 0.0
+    assert image_diff(base, shifted)[0] > MAX_CHANGED
@@ -0,0 +1,125 @@
+import re
+
+import pytest
+
+from plotnn_xt.blocks import decoder_block_factory, encoder_block_factory
+from plotnn_xt.export import export_tex
+from plotnn_xt.layout import Edge, connect, group, repeat, stack_tag
+from plotnn_xt.primitives import layernorm
+from plotnn_xt.replication import instance, replicate
+
+
+@pytest.mark.parametrize("dir", ["x", "y"])
+@pytest.mark.parametrize("factory", [encoder_block_factory(), decoder_block_factory(include_cross=True)])
+def test_replicate_matches_repeat(tmp_path, factory, dir):
+    ref_nodes, ref_edges = repeat(5, factory, start=(1.0, 2.0), gap=1.5, dir=dir)
+    nodes, edges = replicate(5, factory, start=(1.0, 2.0), gap=1.5, dir=dir)
+    assert [n.name for n in nodes] == [n.name for n in ref_nodes]
+    assert list(edges) == ref_edges
+    ref = export_tex(ref_nodes, ref_edges, tmp_path / "ref.tex")
+    out = export_tex(nodes, edges, tmp_path / "rep.tex")
+    assert out.read_text() == ref.read_text()
+
+
+def test_replicate_falls_back_for_index_dependent_builder():
+    def build(idx, x, y):
+        a = layernorm(f"a{idx:02d}", x, y + idx)  # geometry depends on idx
+        b = layernorm(f"b{idx:02d}", x + 3.0, y)
+        return [a, b], [connect(a.anchors["R"], b.anchors["L"])], 6.0
+
+    ref_nodes, ref_edges = repeat(3, build)
+    nodes, edges = replicate(3, build)
+    assert [(n.name, n.x, n.y) for n in nodes] == [(n.name, n.x, n.y) for n in ref_nodes]
+    assert list(edges) == ref_edges
+
+
+def test_replicate_falls_back_for_special_last_block():
+    def build(idx, x, y):
+        return [layernorm(f"a{idx}", x, y, h=2.0 if idx == 3 else 1.0)], [], 3.0
+
+    nodes, _ = replicate(4, build)
+    assert [n.h for n in nodes] == [n.h for n in repeat(4, build)[0]] == [1.0, 1.0, 1.0, 2.0]
+
+
+def _routed(bend=lambda idx: 1.0):
+    def build(idx, x, y):
+        a, b = layernorm(f"a{idx}", x, y), layernorm(f"b{idx}", x + 3.0, y)
+        path = ((x + 1.5, y + bend(idx)), (x + 2.0, y + bend(idx)))
+        return [a, b], [Edge(a.anchors["R"], b.anchors["L"], path=path)], 6.0
+    return build
+
+
+def test_replicate_translates_edge_paths():
+    build = _routed()
+    ref_nodes, ref_edges = repeat(3, build, start=(1.0, 2.0))
+    nodes, edges = replicate(3, build, start=(1.0, 2.0))
+    assert list(edges) == ref_edges and edges[-1].path == ((16.5, 3.0), (17.0, 3.0))
+    assert instance(3, build, start=(1.0, 2.0)).edges[:] == ref_edges
+    assert instance(3, build).pic_edges[0].path == ((1.5, 1.0), (2.0, 1.0))  # relative to the pic origin
+
+    bent = _routed(bend=lambda idx: 1.0 + idx)  # waypoints are not a translation
+    assert list(replicate(3, bent)[1]) == repeat(3, bent)[1]
+    with pytest.raises(ValueError, match="pure translation"):
+        instance(3, bent)
+
+
+_NODE_LINE = re.compile(r"\\node\[(\w+)=([\d.]+)cm/([\d.]+)cm\] \((.+?)\) at \((-?[\d.]+)cm,(-?[\d.]+)cm\)")
+_PIC_LINE = re.compile(r"\\pic at \((-?[\d.]+)cm,(-?[\d.]+)cm\) \{ ([\w-]+)=(\d+) \}")
+
+
+def _expand(text):
+    """Node lines of an instanced document with every pic placement expanded."""
+    head, _, rest = text.partition("% --- Block instances")
+    body = head.split(".pic={", 1)[1]
+    out = []
+    for x, y, _pic, i in _PIC_LINE.findall(rest):
+        for kind, w, h, name, nx, ny in _NODE_LINE.findall(body):
+            out.append((kind, w, h, name.replace("#1", i), float(x) + float(nx), float(y) + float(ny)))
+    return out
+
+
+@pytest.mark.parametrize("dir", ["x", "y"])
+def test_instanced_export_places_the_same_nodes(tmp_path, dir):
+    factory = decoder_block_factory(include_cross=True)
+    stack = instance(4, factory, start=(1.0, 2.0), gap=1.5, dir=dir)
+    ref_nodes, ref_edges = repeat(4, factory, start=(1.0, 2.0), gap=1.5, dir=dir)
+    assert [n.name for n in stack.nodes] == [n.name for n in ref_nodes]
+    assert list(stack.edges) == ref_edges
+
+    tag = stack_tag("tag", stack.nodes, "×4")
+    link = connect("(tag.south)", stack.nodes[0].anchors["T"])  # external edge into an instance
+    out = export_tex([tag], [link], tmp_path / "inst.tex", boxes=[group("dec", stack.nodes, title="Dec")],
+                     instances=[stack, stack])
+    text = out.read_text()
+    assert text.count(".pic={") == 1  # one definition shared by both stacks
+    assert "(dln#1_1)" in text
+    assert r"\path[conn] (tag.south) -- (dln0_1.north);" in text
+
+    rep_nodes, rep_edges = replicate(4, factory, start=(1.0, 2.0), gap=1.5, dir=dir)
+    ref = export_tex(rep_nodes + [tag], rep_edges + [link], tmp_path / "ref.tex",
+                     boxes=[group("dec", rep_nodes, title="Dec")]).read_text()
+    ref_rows = _NODE_LINE.findall(ref)
+    got = _expand(text)[:len(ref_nodes)]
+    assert [r[:4] for r in got] == [r[:4] for r in ref_rows[:len(ref_nodes)]]
+    for r, g in zip(ref_rows, got):
+        assert abs(float(r[4]) - g[4]) <= 0.011 and abs(float(r[5]) - g[5]) <= 0.011
+    # boxes come from the same geometry
+    boxes = lambda t: t.split("% --- Group")[1].split("% --- Edges")[0]  # noqa: E731
+    assert boxes(text) == boxes(ref)
+
+
+def test_instance_rejects_index_dependent_builder():
+    def build(idx, x, y):
+        a = layernorm(f"a{idx:02d}", x, y)
+        return [a], [], 3.0
+
+    with pytest.raises(ValueError, match="pure translation"):
+        instance(3, build)
+
+
+def test_instance_rejects_special_last_block():
+    def build(idx, x, y):
+        return [layernorm(f"a{idx}", x, y, h=2.0 if idx == 3 else 1.0)], [], 3.0
+
+    with pytest.raises(ValueError, match="pure translation"):
+        instance(4, build)
@@ -0,0 +1,42 @@
+from plotnn_xt.export import export_tex
+from plotnn_xt.layout import connect, elbow
+from plotnn_xt.primitives import Node, residual_add
+from plotnn_xt.resolve import OUTER_SEP, resolve_edges
+from plotnn_xt.spatial import ADD_DIAMETER
+
+
+def _nodes():
+    a = Node("a", 0.0, 0.0, 2.0, 1.0, "blk", "A")
+    b = Node("b", 4.0, 2.0, 2.0, 1.0, "blk", "B")
+    return [a, b, residual_add("s", 8.0, 0.0)]
+
+
+def test_anchors_and_elbows_resolve_to_coordinates():
+    a, b, s = _nodes()
+    plain, bent = resolve_edges([connect(a.anchors["R"], b.anchors["L"]),
+                                 elbow(a.anchors["L"], s.anchors["T"], dx=-0.5)], [a, b, s])
+    assert plain.src == f"({1.0 + OUTER_SEP:.2f}cm,0.00cm)"
+    assert plain.dst == f"({3.0 - OUTER_SEP:.2f}cm,2.00cm)"
+    top = ADD_DIAMETER / 2 + OUTER_SEP  # the circle grows around its "+" (declared 0.22cm)
+    assert bent.via is None
+    assert bent.path == ((-1.0 - OUTER_SEP - 0.5, 0.0), (-1.0 - OUTER_SEP - 0.5, top))
+    assert bent.dst == f"(8.00cm,{top:.2f}cm)"
+
+
+def test_unknown_geometry_stays_symbolic():
+    a, b, _ = _nodes()
+    wide = Node("w", 0.0, -3.0, 0.5, 0.5, "blk", "a label far too long for the box")
+    e1, e2, e3 = resolve_edges([connect(a.anchors["R"], "(ghost.west)"),
+                                connect(wide.anchors["R"], b.anchors["B"]),
+                                elbow("(ghost.east)", b.anchors["T"], dx=0.3)], [a, b, wide])
+    assert e1.src.endswith("cm)") and e1.dst == "(ghost.west)"
+    assert e2.src == "(w.east)" and e2.dst.endswith("cm)")
+    assert e3.src == "(ghost.east)" and e3.via == (0.3, 0.0) and e3.path is None
+
+
+def test_export_numeric_drops_anchor_references(tmp_path):
+    a, b, s = _nodes()
+    edges = [connect(a.anchors["R"], b.anchors["L"]), elbow(b.anchors["R"], s.anchors["T"])]
+    tex = export_tex([a, b, s], edges, tmp_path / "n.tex", numeric=True).read_text()
+    assert ".east)" not in tex and ".west)" not in tex and "|-" not in tex
+    assert "(a) at" in tex
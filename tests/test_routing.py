@@ -0,0 +1,36 @@
+from plotnn_xt.export import export_tex
+from plotnn_xt.geometry import bbox, parse_anchor
+from plotnn_xt.layout import connect
+from plotnn_xt.primitives import layernorm, mha
+from plotnn_xt.routing import route_edges
+
+
+def _crosses(p, q, box):
+    """True if the axis-aligned segment p-q passes strictly through box."""
+    x0, y0, x1, y1 = box
+    if p[1] == q[1]:
+        return y0 < p[1] < y1 and min(p[0], q[0]) < x1 and max(p[0], q[0]) > x0
+    return x0 < p[0] < x1 and min(p[1], q[1]) < y1 and max(p[1], q[1]) > y0
+
+
+def test_route_around_blocking_node(tmp_path):
+    a = layernorm("a", 0.0, 0.0)
+    wall = mha("wall", 5.0, 0.0, h=3.0)
+    b = layernorm("b", 10.0, 0.0)
+    e = connect(a.anchors["R"], b.anchors["L"])
+    (routed,) = route_edges([e], [a, wall, b], margin=0.2)
+    assert routed.path and routed.via is None
+    pts = [(1.3, 0.0), *routed.path, (8.7, 0.0)]
+    for p, q in zip(pts, pts[1:]):
+        assert p[0] == q[0] or p[1] == q[1]  # orthogonal
+        assert not _crosses(p, q, bbox(wall))
+    text = export_tex([a, wall, b], [routed], tmp_path / "r.tex").read_text()
+    assert "\\path[conn] (a.east) -- (" in text and text.count("cm) -- (") >= 3
+
+
+def test_unresolvable_edges_untouched():
+    a = layernorm("a", 0.0, 0.0)
+    e = connect("(a.east)", "(5cm,0cm)")
+    assert route_edges([e], [a]) == [e]
+    assert parse_anchor("(a.east)") == ("a", "east")
+    assert parse_anchor("(5cm,0cm)") is None
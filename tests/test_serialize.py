@@ -0,0 +1,76 @@
+import struct
+
+import pytest
+
+from plotnn_xt.blocks import decoder_block_factory, encoder_block_factory
+from plotnn_xt.export import export_tex
+from plotnn_xt.layout import group, repeat, stack_tag
+from plotnn_xt.replication import replicate
+from plotnn_xt.resolve import resolve_edges
+from plotnn_xt.serialize import MAGIC, dump, dump_json, dumps, load, load_json, loads
+
+
+def _diagram():
+    nodes, edges = repeat(3, decoder_block_factory(), start=(0.0, 0.0), gap=1.5, dir="x")
+    tag = stack_tag("tag", nodes, "×3")
+    nodes = nodes + [tag]
+    edges = list(edges) + resolve_edges(edges[:4], nodes)  # absolute waypoints
+    boxes = [group("dec", nodes[:6], title="Decoder ×"), group("all", nodes, fit=True)]
+    return nodes, edges, boxes
+
+
+def _row(n):
+    return n.name, n.x, n.y, n.w, n.h, n.kind, n.label
+
+
+def _same(d, nodes, edges, boxes):
+    assert [_row(n) for n in d.nodes] == [_row(n) for n in nodes]
+    assert list(d.edges) == list(edges)
+    assert d.edges[-1] == edges[-1] and _row(d.nodes[-1]) == _row(nodes[-1])
+    for a, b in zip(d.boxes, boxes, strict=True):
+        assert (a.name, a.kind, a.title, a.fit, a.rect) == (b.name, b.kind, b.title, b.fit, b.rect)
+        assert [n.name for n in a.nodes] == [n.name for n in b.nodes]
+
+
+def test_binary_roundtrip_reexports_identically(tmp_path):
+    nodes, edges, boxes = _diagram()
+    path = dump(tmp_path / "dec.pnx", nodes, edges, boxes)
+    assert path.read_bytes()[:8] == MAGIC
+    for d in (load(path), load(path, use_mmap=False)):
+        _same(d, nodes, edges, boxes)
+        ref = export_tex(nodes, edges, tmp_path / "ref.tex", boxes=boxes).read_text()
+        assert export_tex(d.nodes, d.edges, tmp_path / "re.tex", boxes=d.boxes).read_text() == ref
+    # a loaded diagram serializes back to the same bytes
+    d = load(path)
+    assert dumps(d.nodes, d.edges, d.boxes) == path.read_bytes()
+
+
+def test_node_table_strings_are_interned(tmp_path):
+    nodes, edges = replicate(200, encoder_block_factory(), start=(0.0, 0.0), gap=1.5)
+    data = dumps(nodes, edges)
+    n_strings = struct.unpack_from("<I", data, 12)[0]
+    assert n_strings < len(nodes) + 2 * len(edges)  # kinds, labels and shared anchors stored once
+    d = loads(data)
+    assert d.nodes.find("ln150_1") == nodes.find("ln150_1")
+    assert list(d.edges) == list(edges)
+
+
+def test_json_roundtrip(tmp_path):
+    nodes, edges, boxes = _diagram()
+    d = load_json(dump_json(tmp_path / "dec.json", nodes, edges, boxes))
+    _same(d, nodes, edges, boxes)
+
+
+def test_rejects_bad_input(tmp_path):
+    nodes, edges, boxes = _diagram()
+    with pytest.raises(ValueError, match="not among"):
+        dumps(nodes[:2], edges, boxes)
+    data = bytearray(dumps(nodes, edges, boxes))
+    with pytest.raises(ValueError, match="bad magic"):
+        loads(b"X" + bytes(data[1:]))
+    data[8] = 99  # version
+    with pytest.raises(ValueError, match="version 99"):
+        loads(bytes(data))
+    (tmp_path / "empty.pnx").write_bytes(b"")
+    with pytest.raises(ValueError):
+        load(tmp_path / "empty.pnx")
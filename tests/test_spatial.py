@@ -0,0 +1,45 @@
+from plotnn_xt.blocks import encoder_block_factory
+from plotnn_xt.layout import group
+from plotnn_xt.primitives import ffn, layernorm, mha, residual_add
+from plotnn_xt.replication import replicate
+from plotnn_xt.spatial import GridIndex, check_overlaps
+
+
+def test_overlap_pairs_reported_once():
+    a = layernorm("a", 0.0, 0.0)
+    b = mha("b", 3.2, 0.0)  # touches a exactly: not an overlap
+    c = ffn("c", 3.0, 0.3)  # overlaps b (and spans several grid cells)
+    report = check_overlaps([a, b, c], cell=0.5)
+    assert report.overlaps == [("b", "c")]
+
+
+def test_label_overflow_and_box_intrusion():
+    tight = layernorm("tight", 0.0, 0.0, w=0.6, label="LayerNorm")
+    inside = layernorm("inside", 4.0, 0.0)
+    stray = layernorm("stray", 1.5, 0.0, w=1.0, label="LN")  # not a member, but inside the group frame
+    g = group("g", [tight, inside])
+    report = check_overlaps([tight, inside, stray], boxes=[g])
+    assert [n for n, _, _ in report.label_overflows] == ["tight"]
+    assert report.box_intrusions == [("g", "stray")]
+    assert not report.ok
+
+
+def test_add_circle_grows_around_its_glyph():
+    small, roomy = residual_add("small", 0.0, 0.0), residual_add("roomy", 2.0, 0.0, r=0.4)
+    report = check_overlaps([small, roomy])
+    assert [n for n, _, _ in report.label_overflows] == ["small"]  # declared 0.22cm, drawn ~0.36cm
+
+
+def test_stacked_blocks_scale():
+    nodes, _ = replicate(2000, encoder_block_factory(), gap=2.0, dir="y")
+    report = check_overlaps(nodes)
+    # ln*_2 / ffn* of every encoder block overlap by 0.2cm (hard-coded offsets)
+    assert len(report.overlaps) == 2000
+    assert all(a.startswith("ln") and b.startswith("ffn") for a, b in report.overlaps)
+
+
+def test_grid_query():
+    grid = GridIndex(1.0)
+    grid.insert((0.0, 0.0, 1.0, 1.0))
+    grid.insert((5.0, 5.0, 6.0, 6.0))
+    assert grid.query((0.5, 0.5, 2.0, 2.0)) == [0]
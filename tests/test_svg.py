@@ -0,0 +1,50 @@
+import xml.etree.ElementTree as ET
+
+from plotnn_xt.blocks import encoder_block_factory
+from plotnn_xt.layout import connect, elbow, group, repeat, stack_tag
+from plotnn_xt.primitives import layernorm, mha, residual_add
+from plotnn_xt.scene import THEMES, build_scene, label_lines
+from plotnn_xt.svg import export_svg
+
+NS = "{http://www.w3.org/2000/svg}"
+
+
+def _count(root, tag):
+    return len(root.findall(f"{NS}{tag}"))
+
+
+def test_label_lines_from_tex():
+    top, sub = label_lines("MHA*\\\\\\scriptsize(h=8, $d_{model}=768$)", "blk")
+    assert [r.text for r in top.runs] == ["MHA*"] and top.size == "normal"
+    assert sub.size == "script"
+    assert [(r.text, r.shift) for r in sub.runs] == [("(h=8, d", 0), ("model", -1), ("=768)", 0)]
+    assert label_lines("$\\times 4$", "tagnode")[0].runs[0].text == "×4"
+
+
+def test_export_svg_shapes(tmp_path):
+    nodes, edges = repeat(2, encoder_block_factory(), gap=2.0)
+    tag = stack_tag("tag", nodes, "$\\times 2$")
+    edges = edges + [connect("(ghost.east)", nodes[0].anchors["L"])]
+    out = export_svg(nodes + [tag], edges, tmp_path / "enc.svg", boxes=[group("g", nodes, title="Encoder")])
+    root = ET.parse(out).getroot()
+    n_add = sum(n.kind == "addnode" for n in nodes)
+    assert _count(root, "circle") == n_add
+    assert _count(root, "rect") == len(nodes) - n_add + 1 + 1  # blocks, tag, group box
+    assert _count(root, "polyline") == len(edges) - 1  # ghost edge cannot be placed
+    assert _count(root, "polygon") == len(edges) - 1  # one arrow tip per edge
+    texts = [t.text or "" for t in root.iter(f"{NS}text")]
+    assert "Encoder" in texts and "LayerNorm" in texts
+    assert root.get("width").endswith("cm")
+
+
+def test_3d_dark_scene():
+    ln = layernorm("ln", 0, 0, three_d=True)
+    att = mha("att", 3.2, 0, three_d=True)
+    add = residual_add("add", 5.6, 0, three_d=True)
+    scene = build_scene([ln, att, add], [connect(ln.anchors["R"], att.anchors["L"]),
+                                         elbow(ln.anchors["L"], add.anchors["T"], dx=-0.8)], theme="dark")
+    assert scene.background == THEMES["dark"].background and not scene.skipped
+    faces = [s for s in scene.shapes if type(s).__name__ == "Poly" and s.closed and s.fill not in (THEMES["dark"].edge,)]
+    assert len(faces) == 4  # top + side face for both 3D blocks
+    elbow_line = [s for s in scene.shapes if type(s).__name__ == "Poly" and not s.closed and len(s.points) == 4]
+    assert len(elbow_line) == 1 and elbow_line[0].points[1][0] < ln.x - ln.w / 2
@@ -0,0 +1,30 @@
+import sys
+
+from plotnn_xt.texformat import FormatCache, read_preamble
+
+# Stand-in for "pdflatex -ini ... mylatexformat.ltx": copies the preamble into <outdir>/<name>.fmt.
+FAKE_DUMP = (sys.executable, "-c",
+             "import pathlib, sys; src, out, name = sys.argv[1:]; "
+             "pathlib.Path(out, name + '.fmt').write_text(pathlib.Path(src).read_text())",
+             "{preamble}", "{outdir}", "{name}")
+
+
+def test_format_reused_until_styles_change(tmp_path):
+    (tmp_path / "transformer_tex").mkdir()
+    style = tmp_path / "transformer_tex" / "transformer_styles.tex"
+    style.write_text("% v1\n")
+    fig = tmp_path / "fig.tex"
+    fig.write_text("\\documentclass{standalone}\n\\input{transformer_tex/transformer_styles.tex}\n\\begin{document}\nx\n\\end{document}\n")
+    assert read_preamble(fig).startswith("\\documentclass{standalone}")
+
+    cache = FormatCache(tmp_path, dump_cmd=FAKE_DUMP)
+    cmd = cache.compiler_for(fig)
+    fmt_arg = next(c for c in cmd if c.startswith("-fmt="))
+    assert "{tex}" in cmd and "{outdir}" in " ".join(cmd)
+    fmt = cache.ensure(read_preamble(fig))
+    assert fmt_arg == "-fmt=" + str(fmt.with_suffix(""))
+    mtime = fmt.stat().st_mtime_ns
+    assert FormatCache(tmp_path, dump_cmd=FAKE_DUMP).ensure(read_preamble(fig)).stat().st_mtime_ns == mtime
+
+    style.write_text("% v2\n")
+    assert FormatCache(tmp_path, dump_cmd=FAKE_DUMP).ensure(read_preamble(fig)) != fmt
@@ -0,0 +1,40 @@
+"""Legacy ``pycore.tikzeng`` emitter: byte-identical snippets, buffered/quiet generation."""
+import pathlib
+
+from pycore import tikzeng as T
+
+GOLDEN = pathlib.Path(__file__).parent / "golden" / "legacy_arch.tex"
+
+
+def _arch():
+    yield T.to_head("..")
+    yield T.to_cor()
+    yield T.to_begin()
+    yield T.to_input("cats.jpg", width=6, height=6.5)
+    yield T.to_ConvConvRelu("ccr1", s_filer=500, n_filer=(64, 64), width=(2, 2), height=40, depth=40, caption="C1")
+    yield T.to_Pool("pool1", to="(ccr1-east)", width=1, height=32, depth=32, opacity=0.5)
+    yield T.to_Conv("conv2", s_filer=128, n_filer=256, offset="(1,0,0)", to="(pool1-east)", height=25.5, depth=25.5)
+    yield T.to_connection("pool1", "conv2")
+    yield T.to_UnPool("unpool3", offset="(2.1,0,0)", to="(conv2-east)", caption="up")
+    yield T.to_ConvRes("res3", n_filer=128, offset="(0,0,0)", to="(unpool3-east)", opacity=0.2)
+    yield T.to_skip(of="ccr1", to="res3", pos=1.25)
+    yield T.to_ConvSoftMax("csoft", s_filer=512, offset="(0.75,0,0)", to="(res3-east)", caption="SOFT")
+    yield T.to_SoftMax("soft", s_filer=10, offset="(1,0,0)", to="(csoft-east)")
+    yield T.to_Sum("sum", offset="(1,0,0)", to="(soft-east)", radius=2.5, opacity=0.6)
+    yield T.to_end()
+
+
+def test_snippets_match_golden(tmp_path, capsys):
+    out = tmp_path / "arch.tex"
+    T.to_generate(list(_arch()), str(out))
+    text = out.read_text()
+    assert text == GOLDEN.read_text()
+    # the echo is unchanged: one print() per snippet
+    assert capsys.readouterr().out == "".join(c + "\n" for c in _arch())
+
+
+def test_generate_streams_without_echo(tmp_path, capsys):
+    out = tmp_path / "arch.tex"
+    T.to_generate(_arch(), str(out), echo=False, buffer_size=64)
+    assert out.read_text() == GOLDEN.read_text()
+    assert capsys.readouterr().out == ""
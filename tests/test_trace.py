@@ -0,0 +1,58 @@
+import json
+import shlex
+
+from click.testing import CliRunner
+
+from plotnn_xt import trace
+from plotnn_xt.blocks import encoder_block_factory
+from plotnn_xt.cli import cli
+from plotnn_xt.export import export_tex
+from plotnn_xt.layout import repeat
+
+
+def test_disabled_tracing_records_nothing(tmp_path):
+    trace.reset()
+    nodes, edges = repeat(3, encoder_block_factory(), gap=2.0)
+    export_tex(nodes, edges, tmp_path / "off.tex")
+    assert trace.events() == []
+
+
+def test_nested_spans_with_counts(tmp_path):
+    trace.reset()
+    trace.enable()
+    try:
+        nodes, edges = repeat(3, encoder_block_factory(), gap=2.0)
+        export_tex(nodes, edges, tmp_path / "on.tex")
+    finally:
+        trace.disable()
+    by_name = {}
+    for e in trace.events():
+        by_name.setdefault(e["name"], []).append(e)
+    assert len(by_name["blocks.encoder"]) == 3
+    rep = by_name["layout.repeat"][0]
+    assert rep["args"]["nodes"] == len(nodes) and rep["args"]["edges"] == len(edges)
+    # children are nested inside the parent and subtracted from its self time
+    child_us = sum(e["dur"] for e in by_name["blocks.encoder"])
+    assert rep["args"]["self_us"] <= rep["dur"] - child_us + 1e-6
+    assert all(rep["ts"] <= e["ts"] for e in by_name["blocks.encoder"])
+    assert {"export.render", "export.write"} <= set(by_name)
+
+    out = trace.write_chrome(tmp_path / "trace.json")
+    assert json.loads(out.read_text())["traceEvents"][0]["ph"] == "X"
+    table = trace.summary()
+    assert table.splitlines()[0].split()[:3] == ["span", "calls", "total"]
+    assert any(line.startswith("blocks.encoder") and " 3 " in line for line in table.splitlines())
+    trace.reset()
+
+
+def test_cli_build_trace(tmp_path, fake_tex):
+    ex = tmp_path / "examples"
+    ex.mkdir()
+    (ex / "fig_one.py").write_text("import pathlib; pathlib.Path('examples/fig_one.tex').write_text('ok')\n")
+    out = tmp_path / "build_trace.json"
+    result = CliRunner().invoke(cli, ["build", "--root", str(tmp_path), "-j", "1", "--trace", str(out),
+                                      "--compiler", shlex.join(fake_tex())])
+    assert result.exit_code == 0, result.output
+    names = {e["name"] for e in json.loads(out.read_text())["traceEvents"]}
+    assert {"figure", "figure.generate", "figure.compile", "build.cache", "build.run"} <= names
+    assert "figure.generate" in result.output
@@ -0,0 +1,61 @@
+import os
+import pathlib
+import shutil
+import subprocess
+
+import pytest
+
+from plotnn_xt.watch import Watcher, imports_of, module_name
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+SCRIPT = "import pathlib; pathlib.Path('examples/{name}.tex').write_text({body!r})\n"
+
+
+def test_import_graph_and_reload_order():
+    assert module_name(ROOT / "plotnn_xt" / "layout.py", ROOT) == "plotnn_xt.layout"
+    assert module_name(ROOT / "plotnn_xt" / "__init__.py", ROOT) == "plotnn_xt"
+    assert {"plotnn_xt.layout", "plotnn_xt.trace"} <= imports_of(ROOT / "plotnn_xt" / "blocks.py", "plotnn_xt.blocks")
+
+    w = Watcher(ROOT, [])
+    g = w.graph()
+    order = w.reload_order({"plotnn_xt.layout"}, g)
+    assert order[0] == "plotnn_xt.layout"
+    assert order.index("plotnn_xt.blocks") < order.index("plotnn_xt.gpt")
+    assert "plotnn_xt.trace" not in order and "plotnn_xt.primitives" not in order
+
+
+def _write(path, text, bump):
+    path.write_text(text)
+    st = path.stat()
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + bump))  # coarse mtime clocks
+
+
+def test_rebuilds_only_changed_script(tmp_path):
+    ex = tmp_path / "examples"
+    ex.mkdir()
+    a, b = ex / "fig_a.py", ex / "fig_b.py"
+    a.write_text(SCRIPT.format(name="fig_a", body="a1"))
+    b.write_text(SCRIPT.format(name="fig_b", body="b1"))
+    lines = []
+    w = Watcher(tmp_path, [a, b], echo=lines.append)
+    w.run(interval=0, max_cycles=0)
+    assert (ex / "fig_a.tex").read_text() == "a1" and (ex / "fig_b.tex").read_text() == "b1"
+    assert lines[0].startswith("rebuilt 2 figure(s), 0 failed")
+
+    assert w.step() is None
+    _write(a, SCRIPT.format(name="fig_a", body="a2"), 10**9)
+    res = w.step()
+    assert res.built == [a.resolve()] and not res.failed
+    assert (ex / "fig_a.tex").read_text() == "a2"
+
+    _write(b, "raise RuntimeError('broken figure')\n", 10**9)
+    res = w.step()
+    assert list(res.failed) == [b.resolve()] and "broken figure" in res.failed[b.resolve()]
+    assert "FAIL examples/fig_b.py" in lines[-1]
+
+
+@pytest.mark.skipif(shutil.which("make") is None, reason="make not installed")
+def test_make_watch_target_parses():
+    proc = subprocess.run(["make", "-n", "watch"], cwd=ROOT, capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+    assert "-m plotnn_xt.cli watch" in proc.stdout